@@ -0,0 +1,175 @@
+from pymongo import UpdateOne
+from app.config import settings
+from app.metrics import PARTIES_ARCHIVED
+from app.serialization import dumps
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import gzip
+import logging
+import os
+
+logger = logging.getLogger("Archiver")
+
+ARCHIVE_COLLECTION = "waitlist_archive"
+
+
+def parse_time(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+def archived_party(party: Dict) -> Dict:
+    """
+    Compact archive entry for a completed party: the venue and status are
+    implied by its bucket, and times are stored as dates.
+    """
+    return {
+        "_id": party["_id"],
+        "name": party.get("name"),
+        "party_size": party["party_size"],
+        "created_at": parse_time(party.get("created_at")),
+        "started_at": parse_time(party.get("started_at")),
+        "completed_at": parse_time(party["completed_at"]),
+    }
+
+
+def bucket_id(venue_id: str, day: str) -> str:
+    return f"{venue_id}:{day}"
+
+
+def write_export(directory: str, venue_id: str, day: str, parties: List[Dict]) -> None:
+    """
+    Write parties to ``<directory>/<venue>/<day>-<first party id>.jsonl.gz``.
+    The file is replaced whole, so exporting the same batch again after a
+    crash overwrites it instead of duplicating its parties.
+
+    Raises:
+        ValueError: If the venue id or party id would place the file outside
+            its venue directory under ``directory``
+    """
+    root = os.path.realpath(directory)
+    name = f"{day}-{parties[0]['_id']}.jsonl.gz"
+    path = os.path.realpath(os.path.join(root, venue_id, name))
+    if os.path.dirname(os.path.dirname(path)) != root:
+        raise ValueError(f"Export {name!r} of venue {venue_id!r} escapes its directory")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    partial = f"{path}.partial"
+    with gzip.open(partial, "wb") as export:
+        export.write(b"".join(dumps(party) + b"\n" for party in parties))
+    os.replace(partial, path)
+
+
+class PartyArchiver:
+    """
+    Moves completed parties out of the hot ``waitlist`` collection.
+
+    Parties completed more than ``archive_after`` seconds ago are copied, in
+    batches, into one ``waitlist_archive`` document per venue and day, and
+    optionally written to gzipped JSON lines files under ``export_dir``, one
+    per batch, venue and day.
+    They are then stamped ``archived_at``, and the TTL index on that field
+    removes them from the hot collection after the retention period. A run
+    stops after ``max_batches`` and pauses between batches, so it never
+    holds the event loop or the database for long. Batches are idempotent:
+    a party archived twice after a crash is only kept once in its bucket,
+    and as the next run picks the same oldest parties, their export file is
+    rewritten rather than added to.
+    """
+
+    def __init__(
+        self,
+        archive_after: int,
+        batch_size: int,
+        max_batches: int,
+        pause_seconds: float,
+        export_dir: str = "",
+    ):
+        self.archive_after = archive_after
+        self.batch_size = batch_size
+        self.max_batches = max_batches
+        self.pause_seconds = pause_seconds
+        self.export_dir = export_dir
+
+    async def archive_batch(
+        self, collection, archive, now: Optional[datetime] = None
+    ) -> int:
+        """
+        Archive the oldest batch of due parties. Returns how many were
+        archived.
+        """
+        now = now or datetime.now(timezone.utc)
+        cutoff = (now - timedelta(seconds=self.archive_after)).isoformat()
+        parties = await collection.find(
+            {
+                "status": "completed",
+                "completed_at": {"$lt": cutoff},
+                "archived_at": {"$exists": False},
+            },
+            sort=[("completed_at", 1), ("_id", 1)],
+            limit=self.batch_size,
+        ).to_list(length=self.batch_size)
+        if not parties:
+            return 0
+
+        buckets: Dict[Tuple[str, str], List[Dict]] = {}
+        for party in parties:
+            venue_id = party.get("venue_id", settings.DEFAULT_VENUE_ID)
+            entry = archived_party(party)
+            day = entry["completed_at"].date().isoformat()
+            buckets.setdefault((venue_id, day), []).append(entry)
+
+        await archive.bulk_write(
+            [
+                UpdateOne(
+                    {"_id": bucket_id(venue_id, day)},
+                    {
+                        "$setOnInsert": {"venue_id": venue_id, "day": day},
+                        "$addToSet": {"parties": {"$each": entries}},
+                    },
+                    upsert=True,
+                )
+                for (venue_id, day), entries in buckets.items()
+            ],
+            ordered=False,
+        )
+        if self.export_dir:
+            for (venue_id, day), entries in buckets.items():
+                try:
+                    await asyncio.to_thread(
+                        write_export, self.export_dir, venue_id, day, entries
+                    )
+                except ValueError as e:
+                    # The parties stay archived in MongoDB
+                    logger.error(f"Skipped export of {len(entries)} parties: {e}")
+        await collection.update_many(
+            {"_id": {"$in": [party["_id"] for party in parties]}},
+            {"$set": {"archived_at": now}},
+        )
+        PARTIES_ARCHIVED.inc(len(parties))
+        return len(parties)
+
+    async def run(self, collection, archive) -> int:
+        """
+        Archive due parties, up to ``max_batches`` batches. Returns how many
+        were archived.
+        """
+        archived = 0
+        for batch in range(self.max_batches):
+            if batch:
+                await asyncio.sleep(self.pause_seconds)
+            count = await self.archive_batch(collection, archive)
+            archived += count
+            if count < self.batch_size:
+                break
+        if archived:
+            logger.info(f"Archived {archived} completed parties.")
+        return archived
+
+
+party_archiver = PartyArchiver(
+    archive_after=settings.ARCHIVE_AFTER_SECONDS,
+    batch_size=settings.ARCHIVE_BATCH_SIZE,
+    max_batches=settings.ARCHIVE_MAX_BATCHES,
+    pause_seconds=settings.ARCHIVE_BATCH_PAUSE_SECONDS,
+    export_dir=settings.ARCHIVE_EXPORT_DIR,
+)
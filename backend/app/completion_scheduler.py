@@ -0,0 +1,148 @@
+from redis.asyncio import Redis
+from app.config import settings
+from datetime import datetime
+from typing import Dict, List, Optional
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger("CompletionScheduler")
+
+# Sorted set of party ids scored by the epoch second their service is due
+COMPLETIONS_KEY = "service_completions"
+
+# KEYS[1] = completions. ARGV[1] = now, ARGV[2] = batch size, ARGV[3] = lease.
+# Claims up to a batch of due completions by pushing their due time out by
+# the lease, so a worker that dies mid-batch leaves them to be retried.
+CLAIM_DUE_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+local retry_at = tonumber(ARGV[1]) + tonumber(ARGV[3])
+for _, party_id in ipairs(due) do
+    redis.call('ZADD', KEYS[1], retry_at, party_id)
+end
+return due
+"""
+
+
+class CompletionScheduler:
+    """
+    Durable service-completion timers.
+
+    Due times live in a Redis sorted set rather than in per-party sleeping
+    tasks, so pending completions survive restarts. One loop per process
+    sleeps until the earliest due time and completes due parties in batches.
+    """
+
+    def __init__(self, batch_size: int, lease_seconds: float, tick_seconds: float):
+        self.batch_size = batch_size
+        self.lease_seconds = lease_seconds
+        self.tick_seconds = tick_seconds
+        self._runner: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    async def schedule(self, redis_client: Redis, party_id: str, due_at: float) -> None:
+        """
+        Schedule a party's service to complete at ``due_at`` (epoch seconds).
+        """
+        await redis_client.zadd(COMPLETIONS_KEY, {party_id: due_at})
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def claim_due(self, redis_client: Redis, now: Optional[float] = None) -> List[str]:
+        """
+        Claim the next batch of completions that are due.
+        """
+        return await redis_client.register_script(CLAIM_DUE_SCRIPT)(
+            keys=[COMPLETIONS_KEY],
+            args=[time.time() if now is None else now, self.batch_size, self.lease_seconds],
+        )
+
+    async def recover(
+        self, redis_client: Redis, collection, parties: Optional[List[Dict]] = None
+    ) -> int:
+        """
+        Schedule checked-in parties that have no pending completion, such as
+        parties checked in before a restart. Reads them from MongoDB unless
+        the active parties are given. Returns the number scheduled.
+        """
+        if parties is None:
+            parties = await collection.find({"status": "checked_in"}).to_list(
+                length=None
+            )
+        scheduled = 0
+        for party in parties:
+            if party["status"] != "checked_in":
+                continue
+            started_at = datetime.fromisoformat(party["started_at"]).timestamp()
+            due_at = started_at + settings.SERVICE_TIME_PER_PERSON * party["party_size"]
+            scheduled += await redis_client.zadd(COMPLETIONS_KEY, {party["_id"]: due_at}, nx=True)
+        if scheduled:
+            logger.info(f"Recovered {scheduled} pending service completions.")
+        return scheduled
+
+    async def process_due(self, redis_client: Redis, collection) -> int:
+        """
+        Complete one batch of due parties. Returns the batch size processed.
+        """
+        from app.services.waitlist_service import WaitlistService
+
+        party_ids = await self.claim_due(redis_client)
+        for party_id in party_ids:
+            try:
+                await WaitlistService.complete_service(collection, redis_client, party_id)
+                await redis_client.zrem(COMPLETIONS_KEY, party_id)
+            except Exception as e:
+                # Left in the set; retried once the lease runs out
+                logger.error(f"Failed to complete service for party {party_id}: {e}")
+        return len(party_ids)
+
+    async def start(
+        self, redis_client: Redis, collection, parties: Optional[List[Dict]] = None
+    ) -> None:
+        """
+        Recover pending completions and start the timer loop.
+        """
+        if self._runner is not None:
+            return
+        await self.recover(redis_client, collection, parties)
+        self._wakeup = asyncio.Event()
+        self._runner = asyncio.create_task(self._run(redis_client, collection))
+        logger.info("Completion scheduler started.")
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            self._runner.cancel()
+            try:
+                await self._runner
+            except asyncio.CancelledError:
+                pass
+        self._runner = None
+        self._wakeup = None
+
+    async def _run(self, redis_client: Redis, collection) -> None:
+        while True:
+            try:
+                if await self.process_due(redis_client, collection) >= self.batch_size:
+                    continue
+                delay = self.tick_seconds
+                upcoming = await redis_client.zrange(COMPLETIONS_KEY, 0, 0, withscores=True)
+                if upcoming:
+                    delay = min(delay, max(0.0, upcoming[0][1] - time.time()))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Completion loop error: {e}")
+                delay = self.tick_seconds
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+
+completion_scheduler = CompletionScheduler(
+    batch_size=settings.COMPLETION_BATCH_SIZE,
+    lease_seconds=settings.COMPLETION_LEASE_SECONDS,
+    tick_seconds=settings.COMPLETION_TICK_SECONDS,
+)
@@ -1,5 +1,6 @@
 import os
 from pydantic_settings import BaseSettings
+from typing import Any, Dict, List, Literal
 
 
 class Settings(BaseSettings):
@@ -9,6 +10,91 @@ class Settings(BaseSettings):
     AVAILABLE_SEATS: int = 10
     LOCK_TIMEOUT: int = 10
     SERVICE_TIME_PER_PERSON: int = 3
+    # Venue used when a request does not name one, and per-venue seat counts
+    # overriding AVAILABLE_SEATS
+    DEFAULT_VENUE_ID: str = "default"
+    VENUE_SEATS: Dict[str, int] = {}
+    # Venues seated at tables instead of from a seat count: a list of
+    # {"id", "capacity", "group"} per venue, where tables sharing a group
+    # can be pushed together for larger parties
+    VENUE_TABLES: Dict[str, List[Dict[str, Any]]] = {}
+    # How seat changes are persisted: "aof" or "bgsave"
+    SEAT_DURABILITY: Literal["aof", "bgsave"] = "aof"
+    BGSAVE_DEBOUNCE_SECONDS: float = 5.0
+    # Queue advancement is event driven; this is only a safety net
+    QUEUE_SWEEP_INTERVAL_SECONDS: int = 60
+    # Only the elected leader runs the sweep; it renews its lease on this
+    # interval and another worker takes over once the lease lapses
+    LEADER_LEASE_SECONDS: float = 15.0
+    LEADER_RENEW_SECONDS: float = 5.0
+    # Distributed locks: lease renewed while held, and how long callers wait
+    # for a busy lock before giving up
+    LOCK_LEASE_SECONDS: float = 5.0
+    LOCK_WAIT_SECONDS: float = 2.0
+    # Seating pass: "fifo", "skip_ahead" or "best_fit" over the oldest parties
+    SEATING_POLICY: Literal["fifo", "skip_ahead", "best_fit"] = "fifo"
+    SEATING_WINDOW: int = 50
+    SEATING_MAX_SKIPS: int = 3
+    # skip_ahead and best_fit: a party waiting this long is no longer jumped
+    SEATING_MAX_SKIP_WAIT_SECONDS: float = 900.0
+    # Largest batch accepted by the bulk waitlist endpoints
+    BULK_INGEST_MAX_PARTIES: int = 10000
+    # Admin queue feed: changes kept for resuming clients, and the token
+    # admin sockets must send (required: admin connections are refused
+    # while it is empty)
+    QUEUE_FEED_MAX_EVENTS: int = 10000
+    ADMIN_FEED_TOKEN: str = ""
+    # How often the leader compacts the queue event log into a snapshot of
+    # queue and seat state, which startup restores from
+    STATE_SNAPSHOT_INTERVAL_SECONDS: int = 30
+    # Archival of completed parties: those completed longer ago than
+    # ARCHIVE_AFTER_SECONDS are copied to waitlist_archive in bounded
+    # batches (and to gzipped JSON lines under ARCHIVE_EXPORT_DIR when set),
+    # then expire from the hot collection after ARCHIVE_HOT_RETENTION_SECONDS.
+    # Changing the retention of an existing TTL index needs a collMod.
+    ARCHIVE_INTERVAL_SECONDS: int = 300
+    ARCHIVE_AFTER_SECONDS: int = 86400
+    ARCHIVE_HOT_RETENTION_SECONDS: int = 3600
+    ARCHIVE_BATCH_SIZE: int = 500
+    ARCHIVE_MAX_BATCHES: int = 20
+    ARCHIVE_BATCH_PAUSE_SECONDS: float = 0.1
+    ARCHIVE_EXPORT_DIR: str = ""
+    # Analytics: how often the leader folds queue events into per-minute
+    # rollups, events per batch, and the longest range a report may cover
+    ANALYTICS_INTERVAL_SECONDS: int = 10
+    ANALYTICS_BATCH_SIZE: int = 1000
+    ANALYTICS_MAX_RANGE_DAYS: int = 31
+    # Maximum users emitted to concurrently by a notification batch
+    WS_EMIT_CONCURRENCY: int = 100
+    # Service completion timers
+    COMPLETION_BATCH_SIZE: int = 100
+    COMPLETION_LEASE_SECONDS: float = 30.0
+    COMPLETION_TICK_SECONDS: float = 1.0
+    # Party status read cache
+    STATUS_CACHE_TTL_SECONDS: int = 30
+    STATUS_CACHE_NEGATIVE_TTL_SECONDS: int = 5
+    STATUS_CACHE_LOCAL_TTL_SECONDS: float = 1.0
+    STATUS_CACHE_MAX_LOCAL_ENTRIES: int = 10000
+    # How often each worker publishes its metrics for /metrics to merge
+    METRICS_PUSH_INTERVAL_SECONDS: int = 5
+    # Socket.IO packet encoding: "json", "orjson" or "msgpack" (binary; the
+    # client must use socket.io-msgpack-parser)
+    SOCKETIO_SERIALIZER: Literal["json", "orjson", "msgpack"] = "orjson"
+    # Wait-time estimates: pushed when they move by the threshold, at most
+    # once per debounce interval, rounded to the granularity
+    ETA_PUSH_THRESHOLD_SECONDS: float = 60.0
+    ETA_PUSH_DEBOUNCE_SECONDS: float = 1.0
+    ETA_GRANULARITY_SECONDS: float = 5.0
+    # Logging: "json" or "text" lines, and the fraction of each high-volume
+    # event kept (events not listed are always logged)
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: Literal["json", "text"] = "json"
+    LOG_SAMPLE_RATES: Dict[str, float] = {
+        "readiness_tick": 0.1,
+        "seats_lock": 0.01,
+        "seat_change": 0.1,
+        "notification": 0.1,
+    }
 
     class Config:
         env_file = ".env" if os.getenv("ENV") != "test" else ".env.test"
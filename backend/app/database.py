@@ -1,23 +1,66 @@
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, IndexModel
 from pymongo.collection import Collection
 from app.config import settings
+from app.metrics import MongoCommandMetrics
 import logging
-from typing import Optional
+from typing import Dict, List, Optional
 
 logger = logging.getLogger("DB")
 
+# Indexes each collection needs, created at startup by ensure_indexes
+INDEXES: Dict[str, List[IndexModel]] = {
+    "waitlist": [
+        # Readiness pass: oldest parties with a given status in a venue
+        IndexModel(
+            [("venue_id", ASCENDING), ("status", ASCENDING), ("created_at", ASCENDING)],
+            name="venue_status_created_at",
+        ),
+        # Cross-venue scans by status: waiting venues on each sweep, queue
+        # reconciliation and state snapshots
+        IndexModel(
+            [("status", ASCENDING), ("created_at", ASCENDING)],
+            name="status_created_at",
+        ),
+        # Archival: completed parties oldest first
+        IndexModel(
+            [("completed_at", ASCENDING)],
+            name="completed_at",
+            partialFilterExpression={"status": "completed"},
+        ),
+        # Archived parties leave the hot collection after the retention
+        IndexModel(
+            [("archived_at", ASCENDING)],
+            name="archived_at_ttl",
+            expireAfterSeconds=settings.ARCHIVE_HOT_RETENTION_SECONDS,
+        ),
+    ],
+    "analytics_rollups": [
+        # Report ranges: a venue's minute buckets in order
+        IndexModel(
+            [("venue_id", ASCENDING), ("minute", ASCENDING)], name="venue_minute"
+        ),
+    ],
+    "waitlist_archive": [
+        IndexModel([("venue_id", ASCENDING), ("day", ASCENDING)], name="venue_day"),
+    ],
+}
+
 
 class MongoDBManager:
-    def __init__(self, uri: str, db_name: str):
+    def __init__(self, uri: str, db_name: str, indexes: Optional[Dict[str, List[IndexModel]]] = None):
         self._uri = uri
         self._db_name = db_name
+        self._indexes = INDEXES if indexes is None else indexes
         self._client: Optional[AsyncIOMotorClient] = None
         self._db = None
 
     async def connect(self) -> None:
         if not self._client:
             try:
-                self._client = AsyncIOMotorClient(self._uri)
+                self._client = AsyncIOMotorClient(
+                    self._uri, event_listeners=[MongoCommandMetrics()]
+                )
                 self._db = self._client[self._db_name]
                 logger.info(f"Connected to {self._uri}, Database: {self._db_name}")
             except Exception as e:
@@ -31,6 +74,43 @@ class MongoDBManager:
             self._db = None
             logger.info("DB connection closed.")
 
+    async def ensure_indexes(self) -> None:
+        """
+        Create the declared indexes. Existing indexes are left untouched.
+        """
+        for name, models in self._indexes.items():
+            try:
+                created = await self.get_collection(name).create_indexes(models)
+                logger.info(f"Indexes ensured on {name}: {', '.join(created)}")
+            except Exception as e:
+                logger.error(f"Failed to create indexes on {name}: {str(e)}")
+                raise RuntimeError(f"Failed to create indexes on {name}") from e
+
+    async def uses_index(self, name: str, query: dict, sort: Optional[list] = None) -> bool:
+        """
+        Check that a query is answered by an index scan with no collection
+        scan or in-memory sort.
+        """
+        cursor = self.get_collection(name).find(query, limit=1)
+        if sort:
+            cursor = cursor.sort(sort)
+        plan = (await cursor.explain())["queryPlanner"]["winningPlan"]
+
+        stages = []
+
+        def collect(node):
+            if isinstance(node, dict):
+                if "stage" in node:
+                    stages.append(node["stage"])
+                for value in node.values():
+                    collect(value)
+            elif isinstance(node, list):
+                for value in node:
+                    collect(value)
+
+        collect(plan)
+        return "IXSCAN" in stages and not {"COLLSCAN", "SORT"} & set(stages)
+
     def get_collection(self, name: str) -> Collection:
         if self._db is None:
             raise RuntimeError("Database is not initialized")
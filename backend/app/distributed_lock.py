@@ -0,0 +1,183 @@
+from redis.asyncio import Redis
+from app.config import settings
+from typing import Optional
+import asyncio
+import logging
+import random
+import time
+import uuid
+
+logger = logging.getLogger("DistributedLock")
+
+# Waiters back off exponentially between these bounds, with full jitter
+RETRY_BASE_SECONDS = 0.01
+RETRY_MAX_SECONDS = 0.25
+
+# KEYS[1] = lock. ARGV[1] = owner token, ARGV[2] = lease ms.
+# Extends the lease only if the caller still owns the lock.
+EXTEND_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+# KEYS[1] = lock. ARGV[1] = owner token, ARGV[2] = release channel.
+# Deletes the lock only if the caller owns it, and wakes waiters.
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    redis.call('DEL', KEYS[1])
+    redis.call('PUBLISH', ARGV[2], ARGV[1])
+    return 1
+end
+return 0
+"""
+
+
+def release_channel(key: str) -> str:
+    return f"{key}:released"
+
+
+class DistributedLock:
+    """
+    Redis lock owned by a unique token.
+
+    Only the owner can extend or release it, so a worker whose lease ran out
+    cannot delete a lock another worker has since taken. While held, the
+    lease is renewed in the background, so a critical section may outlast
+    ``lease_seconds`` as long as its worker is alive; ``held`` turns false
+    if a renewal finds the lock lost.
+
+    ``acquire`` waits up to ``timeout`` seconds. Waiters sleep with jittered
+    exponential backoff and are woken early by a publish on release.
+    """
+
+    def __init__(
+        self,
+        redis_client: Redis,
+        key: str,
+        lease_seconds: float = settings.LOCK_LEASE_SECONDS,
+    ):
+        self.redis_client = redis_client
+        self.key = key
+        self.lease_seconds = lease_seconds
+        self.token = uuid.uuid4().hex
+        self.held = False
+        self._renewer: Optional[asyncio.Task] = None
+
+    @property
+    def _lease_ms(self) -> int:
+        return int(self.lease_seconds * 1000)
+
+    async def _try_acquire(self) -> bool:
+        return bool(
+            await self.redis_client.set(
+                self.key, self.token, px=self._lease_ms, nx=True
+            )
+        )
+
+    async def acquire(self, timeout: float = 0) -> bool:
+        """
+        Take the lock, waiting up to ``timeout`` seconds. Returns whether
+        it was acquired.
+        """
+        if self.held:
+            return True
+        deadline = time.monotonic() + timeout
+        pubsub = None
+        polling = False
+        attempt = 0
+        try:
+            while not await self._try_acquire():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                if pubsub is None and not polling:
+                    # Subscribe, then retry at once so a release between the
+                    # failed attempt and the subscription is not missed
+                    pubsub = await self._subscribe()
+                    polling = pubsub is None
+                    continue
+                delay = min(
+                    remaining,
+                    random.uniform(
+                        0, min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2**attempt)
+                    ),
+                )
+                attempt += 1
+                if pubsub is not None:
+                    await pubsub.get_message(
+                        ignore_subscribe_messages=True, timeout=delay
+                    )
+                else:
+                    await asyncio.sleep(delay)
+        finally:
+            if pubsub is not None:
+                await self._unsubscribe(pubsub)
+
+        self.held = True
+        self._renewer = asyncio.create_task(self._renew())
+        return True
+
+    async def _subscribe(self):
+        """
+        A pub/sub connection listening for releases, or None if pub/sub is
+        unavailable and waiters should fall back to polling.
+        """
+        try:
+            pubsub = self.redis_client.pubsub()
+            await pubsub.subscribe(release_channel(self.key))
+            return pubsub
+        except Exception as e:
+            logger.warning(f"Lock {self.key} waiting without release wakeups: {e}")
+            return None
+
+    async def _unsubscribe(self, pubsub) -> None:
+        try:
+            await pubsub.unsubscribe()
+            await pubsub.aclose()
+        except Exception as e:
+            logger.warning(f"Failed to close pub/sub for lock {self.key}: {e}")
+
+    async def extend(self) -> bool:
+        """
+        Reset the lease to ``lease_seconds``. Returns False if the lock is no
+        longer ours.
+        """
+        extended = await self.redis_client.register_script(EXTEND_SCRIPT)(
+            keys=[self.key], args=[self.token, self._lease_ms]
+        )
+        return bool(int(extended))
+
+    async def _renew(self) -> None:
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                if await self.extend():
+                    continue
+                logger.error(f"Lock {self.key} was lost before it was released.")
+                self.held = False
+                return
+            except Exception as e:
+                logger.error(f"Failed to renew lock {self.key}: {e}")
+
+    async def release(self) -> bool:
+        """
+        Release the lock if this owner still holds it. Returns whether it did.
+        """
+        if self._renewer is not None:
+            self._renewer.cancel()
+            try:
+                await self._renewer
+            except asyncio.CancelledError:
+                pass
+            self._renewer = None
+        if not self.held:
+            return False
+        self.held = False
+        released = await self.redis_client.register_script(RELEASE_SCRIPT)(
+            keys=[self.key], args=[self.token, release_channel(self.key)]
+        )
+        if not int(released):
+            logger.warning(f"Lock {self.key} had expired before it was released.")
+        return bool(int(released))
@@ -0,0 +1,64 @@
+from redis.asyncio import Redis
+from redis.exceptions import ResponseError
+from app.config import settings
+from typing import Optional
+import asyncio
+import logging
+
+logger = logging.getLogger("DurabilityManager")
+
+
+class DurabilityManager:
+    """
+    Persists seat changes according to the configured durability mode.
+
+    - ``aof``: rely on Redis' append-only file; nothing extra is done.
+    - ``bgsave``: trigger a background RDB snapshot, debounced so a burst of
+      seat changes results in a single BGSAVE.
+    """
+
+    def __init__(self, mode: str, debounce_seconds: float):
+        self.mode = mode
+        self.debounce_seconds = debounce_seconds
+        self._pending_save: Optional[asyncio.Task] = None
+
+    async def record(
+        self,
+        redis_client: Redis,
+        delta: int,
+        party_id: Optional[str] = None,
+        venue_id: str = settings.DEFAULT_VENUE_ID,
+    ) -> None:
+        """
+        Record a seat change that has already been applied in Redis.
+        """
+        if self.mode == "bgsave":
+            self._schedule_bgsave(redis_client)
+
+    def _schedule_bgsave(self, redis_client: Redis) -> None:
+        if self._pending_save and not self._pending_save.done():
+            return
+        self._pending_save = asyncio.create_task(self._bgsave(redis_client))
+
+    async def _bgsave(self, redis_client: Redis) -> None:
+        await asyncio.sleep(self.debounce_seconds)
+        try:
+            await redis_client.bgsave()
+            logger.info("Background save triggered.")
+        except ResponseError as e:
+            # A save already in progress will pick up our changes.
+            logger.warning(f"Background save skipped: {e}")
+        except Exception as e:
+            logger.error(f"Error triggering background save: {e}")
+
+    async def flush(self) -> None:
+        """
+        Wait for any pending background save to be triggered.
+        """
+        if self._pending_save and not self._pending_save.done():
+            await self._pending_save
+
+
+durability_manager = DurabilityManager(
+    mode=settings.SEAT_DURABILITY, debounce_seconds=settings.BGSAVE_DEBOUNCE_SECONDS
+)
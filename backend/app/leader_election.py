@@ -0,0 +1,201 @@
+from redis.asyncio import Redis
+from app.config import settings
+from typing import Dict, Optional
+import asyncio
+import logging
+import time
+import uuid
+
+logger = logging.getLogger("LeaderElection")
+
+LEADER_KEY = "scheduler:leader"
+FENCING_TOKEN_KEY = "scheduler:fencing_token"
+
+# KEYS[1] = leader, KEYS[2] = fencing token. ARGV[1] = node id, ARGV[2] = lease ms.
+# Renews the lease if this node holds it, takes it with a new fencing token
+# if nobody does. Returns {1 if leader else 0, fencing token}.
+ACQUIRE_SCRIPT = """
+local holder = redis.call('GET', KEYS[1])
+if holder == ARGV[1] then
+    redis.call('PEXPIRE', KEYS[1], ARGV[2])
+    return {1, tonumber(redis.call('GET', KEYS[2]) or '0')}
+end
+if not holder then
+    redis.call('SET', KEYS[1], ARGV[1], 'PX', ARGV[2])
+    return {1, redis.call('INCR', KEYS[2])}
+end
+return {0, tonumber(redis.call('GET', KEYS[2]) or '0')}
+"""
+
+# KEYS[1] = leader, KEYS[2] = fencing token. ARGV[1] = node id, ARGV[2] = token.
+# Returns 1 if this node still holds the lease under the given token.
+CHECK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1]
+    and redis.call('GET', KEYS[2]) == ARGV[2] then
+    return 1
+end
+return 0
+"""
+
+# KEYS[1] = leader. ARGV[1] = node id. Gives up the lease if held.
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class LeadershipLost(Exception):
+    """
+    Raised by ``check_term`` when this node's term has ended.
+    """
+
+
+class LeaderElector:
+    """
+    Elects one worker to run the periodic scheduler jobs.
+
+    The leader holds a Redis key with a lease and renews it every
+    ``renew_seconds``; if it dies the key expires and another worker takes
+    over within ``lease_seconds``. Each new term increments a fencing token,
+    and ``still_leader`` confirms both the holder and the token. Jobs
+    confirm before each phase of writes, but the writes themselves do not
+    carry the token: a leader that pauses in the middle of a phase can still
+    finish it alongside its successor. A leader that cannot reach Redis
+    steps down once its lease may have expired.
+    """
+
+    def __init__(self, lease_seconds: float, renew_seconds: float):
+        self.lease_seconds = lease_seconds
+        self.renew_seconds = renew_seconds
+        self.node_id = uuid.uuid4().hex
+        self.is_leader = False
+        self.fencing_token: Optional[int] = None
+        self.leader_since: Optional[float] = None
+        self._renewed_at: Optional[float] = None
+        self._redis: Optional[Redis] = None
+        self._runner: Optional[asyncio.Task] = None
+
+    async def campaign(self, redis_client: Redis) -> bool:
+        """
+        Take or renew the lease once. Returns whether this node leads.
+        """
+        try:
+            leader, token = await redis_client.register_script(ACQUIRE_SCRIPT)(
+                keys=[LEADER_KEY, FENCING_TOKEN_KEY],
+                args=[self.node_id, int(self.lease_seconds * 1000)],
+            )
+        except Exception as e:
+            logger.error(f"Leader election failed: {e}")
+            if (
+                self.is_leader
+                and time.monotonic() - self._renewed_at >= self.lease_seconds
+            ):
+                self._step_down()
+            return self.is_leader
+
+        if int(leader):
+            self._renewed_at = time.monotonic()
+            if not self.is_leader or self.fencing_token != int(token):
+                self.is_leader = True
+                self.fencing_token = int(token)
+                self.leader_since = time.time()
+                logger.info(
+                    f"Node {self.node_id} elected leader with token {self.fencing_token}."
+                )
+        elif self.is_leader:
+            self._step_down()
+        return self.is_leader
+
+    async def still_leader(self, redis_client: Redis) -> bool:
+        """
+        Confirm in Redis that this node's term is still current.
+        """
+        if not self.is_leader:
+            return False
+        try:
+            current = await redis_client.register_script(CHECK_SCRIPT)(
+                keys=[LEADER_KEY, FENCING_TOKEN_KEY],
+                args=[self.node_id, self.fencing_token],
+            )
+        except Exception as e:
+            # Unconfirmed terms do no work; the renewal loop decides on stepping down
+            logger.error(f"Failed to confirm leadership: {e}")
+            return False
+        if not int(current):
+            self._step_down()
+        return self.is_leader
+
+    async def check_term(self, redis_client: Redis) -> None:
+        """
+        Raise ``LeadershipLost`` unless this node's term is still current.
+        """
+        if not await self.still_leader(redis_client):
+            raise LeadershipLost(
+                f"Node {self.node_id} no longer leads (token {self.fencing_token})."
+            )
+
+    def _step_down(self) -> None:
+        logger.warning(
+            f"Node {self.node_id} lost leadership (token {self.fencing_token})."
+        )
+        self.is_leader = False
+        self.leader_since = None
+
+    async def status(self, redis_client: Redis) -> Dict:
+        """
+        Leadership as seen by this node and by Redis.
+        """
+        leader = await redis_client.get(LEADER_KEY)
+        lease_ms = await redis_client.pttl(LEADER_KEY)
+        return {
+            "node_id": self.node_id,
+            "is_leader": self.is_leader,
+            "leader": leader,
+            "fencing_token": self.fencing_token,
+            "leader_since": self.leader_since,
+            "lease_remaining_seconds": max(lease_ms, 0) / 1000 if leader else None,
+        }
+
+    async def start(self, redis_client: Redis) -> None:
+        """
+        Campaign now and keep renewing in the background.
+        """
+        if self._runner is not None:
+            return
+        self._redis = redis_client
+        await self.campaign(redis_client)
+        self._runner = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Stop renewing and hand the lease back so another worker takes over
+        without waiting for it to expire.
+        """
+        if self._runner is not None:
+            self._runner.cancel()
+            try:
+                await self._runner
+            except asyncio.CancelledError:
+                pass
+            self._runner = None
+        if self.is_leader and self._redis is not None:
+            try:
+                await self._redis.register_script(RELEASE_SCRIPT)(
+                    keys=[LEADER_KEY], args=[self.node_id]
+                )
+            except Exception as e:
+                logger.error(f"Failed to release leadership: {e}")
+            self._step_down()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.renew_seconds)
+            await self.campaign(self._redis)
+
+
+leader_elector = LeaderElector(
+    lease_seconds=settings.LEADER_LEASE_SECONDS,
+    renew_seconds=settings.LEADER_RENEW_SECONDS,
+)
@@ -0,0 +1,125 @@
+from logging.handlers import QueueHandler, QueueListener
+from collections import defaultdict
+from queue import SimpleQueue
+from typing import Dict, Optional, TextIO
+import atexit
+import json
+import logging
+import sys
+
+TEXT_FORMAT = "%(asctime)s - %(name)s | %(message)s"
+
+# Attributes every LogRecord carries; anything else was passed via ``extra``
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+_listener: Optional[QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per line, with ``extra`` fields as top-level keys.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": record.created,
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps one in N records of each high-volume event.
+
+    Records opt in by passing ``extra={"event": name}``; events without a
+    configured rate, and anything at WARNING or above, always pass. Kept
+    records carry ``sampled_every`` so counts can be scaled back up.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self._every = {
+            event: round(1 / rate) if rate > 0 else 0 for event, rate in rates.items()
+        }
+        self._seen: Dict[str, int] = defaultdict(int)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        event = getattr(record, "event", None)
+        if event is None or record.levelno >= logging.WARNING:
+            return True
+        every = self._every.get(event)
+        if every is None or every == 1:
+            return True
+        if every == 0:
+            return False
+        seen = self._seen[event]
+        self._seen[event] = seen + 1
+        if seen % every:
+            return False
+        record.sampled_every = every
+        return True
+
+
+class LazyQueueHandler(QueueHandler):
+    """
+    Enqueues records without formatting them.
+
+    The stock QueueHandler renders the message on the calling thread; here
+    that work, and the write, happen on the listener thread instead. Log
+    arguments must therefore not be mutated after the call.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def configure_logging(
+    level: str = "INFO",
+    fmt: str = "json",
+    sample_rates: Optional[Dict[str, float]] = None,
+    stream: Optional[TextIO] = None,
+) -> QueueListener:
+    """
+    Route the root logger through a queue to a background writer thread.
+    """
+    global _listener
+    stop_logging()
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(
+        JsonFormatter() if fmt == "json" else logging.Formatter(TEXT_FORMAT)
+    )
+
+    queue = SimpleQueue()
+    handler = LazyQueueHandler(queue)
+    handler.addFilter(SamplingFilter(sample_rates or {}))
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        if isinstance(existing, LazyQueueHandler):
+            root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level)
+
+    _listener = QueueListener(queue, output)
+    _listener.start()
+    return _listener
+
+
+@atexit.register
+def stop_logging():
+    """
+    Flush queued records and stop the writer thread.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -2,35 +2,178 @@ from fastapi import FastAPI
 from socketio import AsyncServer, ASGIApp
 from app.socket_io import setup_socketio_events
 from fastapi.middleware.cors import CORSMiddleware
-from app.routes import api_router
+from fastapi.responses import ORJSONResponse
+from app.routes import api_router, metrics_router
 from app.database import db_manager
 from app.redis_client import get_redis_client
+from app.queue_advancer import queue_advancer
+from app.websocket_manager import websocket_manager
+from app.completion_scheduler import completion_scheduler
+from app.wait_time_estimator import wait_time_estimator
+from app.leader_election import LeadershipLost, leader_elector
+from app.queue_feed import queue_feed
+from app.state_snapshots import active_parties, state_snapshotter
+from app.archiver import ARCHIVE_COLLECTION, party_archiver
+from app.services.analytics_service import ANALYTICS_COLLECTION, AnalyticsService
+from app.metrics import registry
+from app.logging_config import configure_logging
+from app.serialization import socketio_serializer_options
+from app.config import settings
 from contextlib import asynccontextmanager
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 import logging
 import asyncio
+import functools
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s | %(message)s",
+configure_logging(
+    level=settings.LOG_LEVEL,
+    fmt=settings.LOG_FORMAT,
+    sample_rates=settings.LOG_SAMPLE_RATES,
 )
 logger = logging.getLogger("WaitlistApp")
 
 scheduler = AsyncIOScheduler()
 
 
-def setup_scheduler():
+async def restore_parties(redis_client) -> list:
     """
-    Setup the scheduler for periodic tasks.
+    Rebuild the active parties from the latest queue state snapshot and the
+    event log since, and reload the wait-time estimator from them.
+    """
+    state = await state_snapshotter.restore(
+        redis_client, db_manager.get_collection("waitlist")
+    )
+    parties = active_parties(state)
+    wait_time_estimator.load(parties, state["seq"])
+    return parties
+
+
+async def sweep_queue():
+    """
+    Safety sweep of every venue with waiting parties, in case a queue event
+    was missed. Runs on the elected leader only, which confirms its term
+    again before each phase of writes and stops once it has lost it. The
+    writes are not fenced themselves, so a leader paused within a phase may
+    finish it alongside its successor: queue repairs are idempotent, and
+    seating passes reserve seats atomically as they do on every worker.
+    Every worker first reloads its wait-time estimates if they are stale.
     """
     from app.services.waitlist_service import WaitlistService
 
+    redis_client = await get_redis_client()
+    if wait_time_estimator.stale:
+        # This worker missed event log entries its estimates depend on
+        await restore_parties(redis_client)
+    if not await leader_elector.still_leader(redis_client):
+        return
+    logger.info(
+        "Running queue sweep under fencing token %s", leader_elector.fencing_token
+    )
+    fence = functools.partial(leader_elector.check_term, redis_client)
+    try:
+        await WaitlistService.reconcile_queues(fence=fence)
+        await fence()
+        venue_ids = await WaitlistService.get_waiting_venues()
+        await queue_advancer.advance_all(venue_ids, "sweep")
+    except LeadershipLost as e:
+        logger.warning(f"Queue sweep stopped: {e}")
+
+
+async def snapshot_queue_state():
+    """
+    Compact the queue event log into a new state snapshot. Runs on the
+    elected leader only.
+    """
+    redis_client = await get_redis_client()
+    if not await leader_elector.still_leader(redis_client):
+        return
+    try:
+        await state_snapshotter.take(
+            redis_client, db_manager.get_collection("waitlist")
+        )
+    except Exception as e:
+        logger.error(f"Failed to snapshot queue state: {e}")
+
+
+async def archive_parties():
+    """
+    Move completed parties to the archive in bounded batches. Runs on the
+    elected leader only.
+    """
+    if not await leader_elector.still_leader(await get_redis_client()):
+        return
+    try:
+        await party_archiver.run(
+            db_manager.get_collection("waitlist"),
+            db_manager.get_collection(ARCHIVE_COLLECTION),
+        )
+    except Exception as e:
+        logger.error(f"Failed to archive completed parties: {e}")
+
+
+async def roll_up_analytics():
+    """
+    Fold new queue events into the per-minute analytics rollups. Runs on the
+    elected leader only.
+    """
+    redis_client = await get_redis_client()
+    if not await leader_elector.still_leader(redis_client):
+        return
+    try:
+        await AnalyticsService.consume(
+            redis_client, db_manager.get_collection(ANALYTICS_COLLECTION)
+        )
+    except Exception as e:
+        logger.error(f"Failed to roll up analytics: {e}")
+
+
+async def push_metrics():
+    """
+    Publish this worker's metrics so any worker can serve /metrics.
+    """
+    try:
+        # Expires if this worker stops pushing without shutting down cleanly
+        await registry.push(
+            await get_redis_client(), ttl=3 * settings.METRICS_PUSH_INTERVAL_SECONDS
+        )
+    except Exception as e:
+        logger.error(f"Failed to push metrics: {e}")
+
+
+def setup_scheduler():
+    """
+    Setup the scheduler for periodic tasks.
+    """
     scheduler.add_job(
-        WaitlistService.check_queue_readiness,
+        sweep_queue,
         trigger="interval",
-        seconds=5,
+        seconds=settings.QUEUE_SWEEP_INTERVAL_SECONDS,
         id="check_queue_readiness",
     )
+    scheduler.add_job(
+        push_metrics,
+        trigger="interval",
+        seconds=settings.METRICS_PUSH_INTERVAL_SECONDS,
+        id="push_metrics",
+    )
+    scheduler.add_job(
+        snapshot_queue_state,
+        trigger="interval",
+        seconds=settings.STATE_SNAPSHOT_INTERVAL_SECONDS,
+        id="snapshot_queue_state",
+    )
+    scheduler.add_job(
+        archive_parties,
+        trigger="interval",
+        seconds=settings.ARCHIVE_INTERVAL_SECONDS,
+        id="archive_parties",
+    )
+    scheduler.add_job(
+        roll_up_analytics,
+        trigger="interval",
+        seconds=settings.ANALYTICS_INTERVAL_SECONDS,
+        id="roll_up_analytics",
+    )
     loop = asyncio.get_event_loop()
     if loop.is_running():
         loop.create_task(start_scheduler())
@@ -41,7 +184,10 @@ async def start_scheduler():
     Starts the scheduler in an asyncio event loop
     """
     scheduler.start()
-    logger.info("Scheduler started with job: check_queue_readiness")
+    logger.info(
+        "Scheduler started with jobs: check_queue_readiness, push_metrics, "
+        "snapshot_queue_state, archive_parties, roll_up_analytics"
+    )
 
 
 @asynccontextmanager
@@ -52,19 +198,56 @@ async def app_lifespan(app: FastAPI):
     try:
         logger.info("Starting Waitlist Manager API...")
         await db_manager.connect()
+        await db_manager.ensure_indexes()
+        # Parties created before venues existed belong to the default venue
+        await db_manager.get_collection("waitlist").update_many(
+            {"venue_id": {"$exists": False}},
+            {"$set": {"venue_id": settings.DEFAULT_VENUE_ID}},
+        )
+        if not await db_manager.uses_index(
+            "waitlist",
+            {"venue_id": settings.DEFAULT_VENUE_ID, "status": "waiting"},
+            [("created_at", 1)],
+        ):
+            logger.warning("Readiness query is not served by an index.")
         await setup_socketio_events(sio)
 
         # Initialize seats in Redis on app start
         redis_client = await get_redis_client()
         from app.services.seat_management_service import SeatManagementService
+        from app.services.waitlist_service import WaitlistService
 
         await SeatManagementService.initialize_seats(redis_client)
+        # Rebuild from the last snapshot and the event log, not a full scan
+        await WaitlistService.reconcile_queues(from_log=True)
+        parties = await restore_parties(redis_client)
+        for venue_id in sorted(
+            {party["venue_id"] for party in parties if party["status"] == "waiting"}
+        ):
+            queue_advancer.notify(venue_id, "seats_changed")
+
+        # Relay notifications to sockets connected to other workers
+        await websocket_manager.start_fanout(sio, redis_client)
+        # Estimates follow the event log from where the restored state ends
+        await queue_feed.start(sio, redis_client, since=wait_time_estimator.seq)
+        await completion_scheduler.start(
+            redis_client, db_manager.get_collection("waitlist"), parties
+        )
 
+        await leader_elector.start(redis_client)
         setup_scheduler()
         yield
     finally:
         logger.info("Shutting down Waitlist Manager API...")
         scheduler.shutdown()
+        await websocket_manager.stop_fanout()
+        await queue_feed.stop()
+        await completion_scheduler.stop()
+        await leader_elector.stop()
+        try:
+            await registry.remove(await get_redis_client())
+        except Exception as e:
+            logger.error(f"Failed to remove worker metrics: {e}")
         await db_manager.close()
 
 
@@ -73,10 +256,15 @@ app = FastAPI(
     description="API for managing restaurant waitlists with real-time updates",
     version="1.0.0",
     lifespan=app_lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # Mount socket server
-sio = AsyncServer(async_mode="asgi", cors_allowed_origins="http://localhost:5173")
+sio = AsyncServer(
+    async_mode="asgi",
+    cors_allowed_origins="http://localhost:5173",
+    **socketio_serializer_options(settings.SOCKETIO_SERIALIZER),
+)
 app.mount("/ws", ASGIApp(sio))
 
 app.add_middleware(
@@ -88,3 +276,4 @@ app.add_middleware(
 )
 
 app.include_router(api_router, prefix="/api/v1")
+app.include_router(metrics_router)
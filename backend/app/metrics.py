@@ -0,0 +1,377 @@
+from pymongo import monitoring
+from redis.asyncio import Redis
+from bisect import bisect_left
+from typing import Dict, List, Optional, Sequence, Tuple
+import json
+import logging
+import math
+import threading
+import time
+import uuid
+
+logger = logging.getLogger("Metrics")
+
+# Default latency buckets, in seconds
+LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+)
+
+# Prefix of the key holding each worker's latest snapshot, which expires
+# unless the worker keeps pushing
+WORKER_SNAPSHOT_PREFIX = "metrics:worker:"
+
+
+def worker_key(node_id: str) -> str:
+    return f"{WORKER_SNAPSHOT_PREFIX}{node_id}"
+
+
+class _Value:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def snapshot(self):
+        return self.value
+
+
+class _HistogramValue:
+    __slots__ = ("buckets", "counts", "sum")
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def snapshot(self):
+        return {"counts": list(self.counts), "sum": self.sum}
+
+
+class Metric:
+    """
+    A named metric with optional labels.
+
+    Children are created once per label combination and cached, so the hot
+    path is a dict lookup plus an in-place add: no locks and no string
+    formatting. Rendering happens only when /metrics is scraped.
+
+    A metric updated off the event loop thread takes a ``lock``: its writers
+    hold it around each update, and snapshots are taken under it.
+    """
+
+    kind = "untyped"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        lock: Optional[threading.Lock] = None,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.lock = lock
+        self._children: Dict[Tuple[str, ...], object] = {}
+        if not self.labelnames:
+            self._default = self.labels()
+
+    def _new_child(self):
+        return _Value()
+
+    def labels(self, *values: str):
+        child = self._children.get(values)
+        if child is None:
+            child = self._children[values] = self._new_child()
+        return child
+
+    def snapshot(self) -> dict:
+        if self.lock is None:
+            return self._snapshot()
+        with self.lock:
+            return self._snapshot()
+
+    def _snapshot(self) -> dict:
+        return {
+            "kind": self.kind,
+            "help": self.documentation,
+            "labelnames": list(self.labelnames),
+            "samples": [
+                [list(labels), child.snapshot()]
+                for labels, child in self._children.items()
+            ],
+        }
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default.inc(amount)
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default.inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._default.dec(amount)
+
+    def set(self, value: float) -> None:
+        self._default.set(value)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+        lock: Optional[threading.Lock] = None,
+    ):
+        self.buckets = tuple(buckets)
+        super().__init__(name, documentation, labelnames, lock)
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._default.observe(value)
+
+    def _snapshot(self) -> dict:
+        snapshot = super()._snapshot()
+        snapshot["buckets"] = list(self.buckets)
+        return snapshot
+
+
+class MetricsRegistry:
+    """
+    Holds this worker's metrics and gathers snapshots from every worker.
+
+    Each worker pushes its snapshot to its own expiring Redis key on an
+    interval, and deletes it on shutdown. A scrape reports every live
+    worker's series under a ``node`` label, so any worker can serve
+    /metrics for the whole deployment. Counters are never summed across
+    workers: a worker leaving would look like a counter reset.
+    """
+
+    def __init__(self):
+        self.node_id = uuid.uuid4().hex
+        self._metrics: List[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def snapshot(self) -> Dict[str, dict]:
+        return {metric.name: metric.snapshot() for metric in self._metrics}
+
+    async def push(self, redis_client: Redis, ttl: float) -> None:
+        """
+        Publish this worker's snapshot for other workers to report. It
+        expires after ``ttl`` seconds unless pushed again.
+        """
+        await redis_client.set(
+            worker_key(self.node_id),
+            json.dumps(self.snapshot()),
+            ex=max(1, math.ceil(ttl)),
+        )
+
+    async def remove(self, redis_client: Redis) -> None:
+        """
+        Withdraw this worker's snapshot, on shutdown.
+        """
+        await redis_client.delete(worker_key(self.node_id))
+
+    async def collect(self, redis_client: Optional[Redis]) -> Dict[str, dict]:
+        """
+        Gather the snapshots of every live worker, using this worker's live
+        values for itself.
+        """
+        snapshots = {self.node_id: self.snapshot()}
+        if redis_client is not None:
+            try:
+                keys = [
+                    key
+                    async for key in redis_client.scan_iter(
+                        match=f"{WORKER_SNAPSHOT_PREFIX}*"
+                    )
+                    if key != worker_key(self.node_id)
+                ]
+                payloads = await redis_client.mget(keys) if keys else []
+            except Exception as e:
+                logger.error(f"Failed to read worker metrics: {e}")
+                keys, payloads = [], []
+            for key, payload in zip(keys, payloads):
+                if payload is not None:
+                    snapshots[key[len(WORKER_SNAPSHOT_PREFIX) :]] = json.loads(payload)
+        return merge_snapshots(snapshots)
+
+
+def merge_snapshots(snapshots: Dict[str, Dict[str, dict]]) -> Dict[str, dict]:
+    """
+    Combine worker snapshots, keyed by node id, into one set of metrics
+    where each worker's samples carry a ``node`` label.
+    """
+    merged: Dict[str, dict] = {}
+    for node_id, snapshot in sorted(snapshots.items()):
+        for name, metric in snapshot.items():
+            target = merged.setdefault(
+                name,
+                {
+                    **metric,
+                    "labelnames": [*metric["labelnames"], "node"],
+                    "samples": {},
+                },
+            )
+            for labels, value in metric["samples"]:
+                target["samples"][(*labels, node_id)] = value
+    return merged
+
+
+def _format_labels(
+    labelnames: Sequence[str], values: Sequence[str], extra: str = ""
+) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def render(metrics: Dict[str, dict]) -> str:
+    """
+    Render merged metrics in the Prometheus text exposition format.
+    """
+    lines = []
+    for name, metric in metrics.items():
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['kind']}")
+        labelnames = metric["labelnames"]
+        for labels, value in metric["samples"].items():
+            if metric["kind"] == "histogram":
+                cumulative = 0
+                for bound, count in zip(
+                    list(metric["buckets"]) + ["+Inf"], value["counts"]
+                ):
+                    cumulative += count
+                    le = _format_labels(labelnames, labels, f'le="{bound}"')
+                    lines.append(f"{name}_bucket{le} {cumulative}")
+                label_text = _format_labels(labelnames, labels)
+                lines.append(f"{name}_sum{label_text} {value['sum']}")
+                lines.append(f"{name}_count{label_text} {cumulative}")
+            else:
+                lines.append(f"{name}{_format_labels(labelnames, labels)} {value}")
+    return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+SEATS_LOCK_ATTEMPTS = registry.register(
+    Counter(
+        "rwm_seats_lock_attempts_total", "Attempts to acquire a venue's seats lock."
+    )
+)
+SEATS_LOCK_FAILURES = registry.register(
+    Counter(
+        "rwm_seats_lock_failures_total", "Seats lock attempts that found the lock held."
+    )
+)
+READINESS_CHECK_SECONDS = registry.register(
+    Histogram("rwm_readiness_check_seconds", "Time spent in one readiness pass.")
+)
+REDIS_CALL_SECONDS = registry.register(
+    Histogram("rwm_redis_call_seconds", "Redis command latency.", ["command"])
+)
+# Observed from pymongo's driver threads
+MONGO_CALL_SECONDS = registry.register(
+    Histogram(
+        "rwm_mongo_call_seconds",
+        "MongoDB command latency.",
+        ["command"],
+        lock=threading.Lock(),
+    )
+)
+CONNECTED_SOCKETS = registry.register(
+    Gauge("rwm_connected_sockets", "Socket.IO connections held by the workers.")
+)
+PARTIES_ARCHIVED = registry.register(
+    Counter("rwm_parties_archived_total", "Completed parties moved to the archive.")
+)
+NOTIFICATION_EMIT_SECONDS = registry.register(
+    Histogram(
+        "rwm_notification_emit_seconds", "Time to emit a notification to one user."
+    )
+)
+
+
+def instrument_redis(client: Redis) -> Redis:
+    """
+    Time every command sent through a Redis client.
+    """
+    execute_command = client.execute_command
+
+    async def timed_execute_command(*args, **options):
+        start = time.perf_counter()
+        try:
+            return await execute_command(*args, **options)
+        finally:
+            REDIS_CALL_SECONDS.labels(args[0]).observe(time.perf_counter() - start)
+
+    client.execute_command = timed_execute_command
+    return client
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """
+    Records MongoDB command latency from the driver's command events, which
+    pymongo delivers on its own threads.
+    """
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        self._observe(event)
+
+    def failed(self, event):
+        self._observe(event)
+
+    @staticmethod
+    def _observe(event) -> None:
+        with MONGO_CALL_SECONDS.lock:
+            MONGO_CALL_SECONDS.labels(event.command_name).observe(
+                event.duration_micros / 1e6
+            )
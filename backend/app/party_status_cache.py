@@ -0,0 +1,158 @@
+from redis.asyncio import Redis
+from app.config import settings
+from app.serialization import dumps, loads
+import orjson
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+import hashlib
+import logging
+import time
+
+logger = logging.getLogger("PartyStatusCache")
+
+
+def status_key(user_id: str) -> str:
+    return f"party_status:{user_id}"
+
+
+def generation_key(user_id: str) -> str:
+    return f"party_status_gen:{user_id}"
+
+
+# Generation counters must outlive any read that started before them, so they
+# are kept far longer than the cached statuses themselves.
+GENERATION_TTL_SECONDS = 3600
+
+# KEYS[1] = status key, KEYS[2] = generation key.
+# ARGV[1] = generation read before the database ("" if none), ARGV[2] = payload,
+# ARGV[3] = ttl. Returns 1 if the status was cached, 0 if it was invalidated since.
+SET_IF_GENERATION_SCRIPT = """
+if (redis.call('GET', KEYS[2]) or '') ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+return 1
+"""
+
+# KEYS = status key, generation key, status key, generation key, ...
+# ARGV[1] = generation ttl.
+INVALIDATE_SCRIPT = """
+for i = 1, #KEYS, 2 do
+    redis.call('DEL', KEYS[i])
+    redis.call('INCR', KEYS[i + 1])
+    redis.call('EXPIRE', KEYS[i + 1], ARGV[1])
+end
+return #KEYS / 2
+"""
+
+
+class PartyStatusCache:
+    """
+    Two-level read-through cache for party status responses.
+
+    Entries are held briefly in process and for longer in Redis. Status
+    changes delete the Redis entry and bump a per-party generation; a read
+    only caches what it loaded if the generation is unchanged, so a slow read
+    cannot write back a status that was invalidated while it ran. Other
+    workers may serve their local copy for at most ``local_ttl`` seconds
+    after a change. Unknown parties (``"na"``) are cached with a shorter TTL.
+    """
+
+    def __init__(self, ttl: float, negative_ttl: float, local_ttl: float, max_local_entries: int):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.local_ttl = local_ttl
+        self.max_local_entries = max_local_entries
+        # user_id -> (expires_at, status, etag), oldest first
+        self._local: OrderedDict[str, Tuple[float, Dict, str]] = OrderedDict()
+
+    @staticmethod
+    def make_etag(status: Dict) -> str:
+        body = orjson.dumps(status, default=str, option=orjson.OPT_SORT_KEYS)
+        return '"' + hashlib.sha1(body).hexdigest() + '"'
+
+    async def get(self, redis_client: Redis, user_id: str) -> Optional[Tuple[Dict, str]]:
+        """
+        Return the cached ``(status, etag)`` for a user, or None on a miss.
+        """
+        entry = self._local.get(user_id)
+        if entry is not None:
+            expires_at, status, etag = entry
+            if expires_at > time.monotonic():
+                return status, etag
+            del self._local[user_id]
+
+        try:
+            cached = await redis_client.get(status_key(user_id))
+        except Exception as e:
+            logger.error(f"Failed to read status cache for user {user_id}: {e}")
+            return None
+        if cached is None:
+            return None
+        entry = loads(cached)
+        self._store_local(user_id, entry["status"], entry["etag"])
+        return entry["status"], entry["etag"]
+
+    async def generation(self, redis_client: Redis, user_id: str) -> Optional[str]:
+        """
+        Return the user's current cache generation, to be read before loading
+        the status and passed back to ``set``. None if Redis is unavailable.
+        """
+        try:
+            return await redis_client.get(generation_key(user_id)) or ""
+        except Exception as e:
+            logger.error(f"Failed to read status cache generation for user {user_id}: {e}")
+            return None
+
+    async def set(self, redis_client: Redis, user_id: str, status: Dict, generation: Optional[str]) -> str:
+        """
+        Cache a status response and return its ETag. Nothing is cached if the
+        user was invalidated since ``generation`` was read.
+        """
+        etag = self.make_etag(status)
+        if generation is None:
+            return etag
+        ttl = self.negative_ttl if status["status"] == "na" else self.ttl
+        try:
+            payload = dumps({"status": status, "etag": etag})
+            stored = await redis_client.register_script(SET_IF_GENERATION_SCRIPT)(
+                keys=[status_key(user_id), generation_key(user_id)],
+                args=[generation, payload, int(ttl) or 1],
+            )
+        except Exception as e:
+            logger.error(f"Failed to write status cache for user {user_id}: {e}")
+            return etag
+        if stored:
+            self._store_local(user_id, status, etag)
+        return etag
+
+    async def invalidate(self, redis_client: Redis, *user_ids: str) -> None:
+        """
+        Drop cached statuses after a status change.
+        """
+        for user_id in user_ids:
+            self._local.pop(user_id, None)
+        if not user_ids:
+            return
+        keys = []
+        for user_id in user_ids:
+            keys += [status_key(user_id), generation_key(user_id)]
+        try:
+            await redis_client.register_script(INVALIDATE_SCRIPT)(keys=keys, args=[GENERATION_TTL_SECONDS])
+        except Exception as e:
+            logger.error(f"Failed to invalidate status cache for {len(user_ids)} users: {e}")
+
+    def _store_local(self, user_id: str, status: Dict, etag: str) -> None:
+        ttl = min(self.local_ttl, self.negative_ttl if status["status"] == "na" else self.ttl)
+        self._local[user_id] = (time.monotonic() + ttl, status, etag)
+        self._local.move_to_end(user_id)
+        while len(self._local) > self.max_local_entries:
+            self._local.popitem(last=False)
+
+
+party_status_cache = PartyStatusCache(
+    ttl=settings.STATUS_CACHE_TTL_SECONDS,
+    negative_ttl=settings.STATUS_CACHE_NEGATIVE_TTL_SECONDS,
+    local_ttl=settings.STATUS_CACHE_LOCAL_TTL_SECONDS,
+    max_local_entries=settings.STATUS_CACHE_MAX_LOCAL_ENTRIES,
+)
@@ -0,0 +1,73 @@
+from typing import Dict, List, Optional
+import asyncio
+import logging
+
+logger = logging.getLogger("QueueAdvancer")
+
+
+class _VenueQueue:
+    def __init__(self):
+        self.dirty = False
+        self.runner: Optional[asyncio.Task] = None
+        self.waiters: List[asyncio.Future] = []
+
+
+class QueueAdvancer:
+    """
+    Advances each venue's waitlist in response to events (party joined,
+    service completed, seats changed) instead of on a fixed poll.
+
+    Every venue has its own evaluation task, so venues advance in parallel
+    and a busy venue never delays another. Events that arrive while a
+    venue's evaluation is running are collapsed into a single follow-up
+    evaluation, so a burst of N events costs at most two passes.
+    """
+
+    def __init__(self):
+        self._venues: Dict[str, _VenueQueue] = {}
+
+    def notify(self, venue_id: str, event: str) -> None:
+        """
+        Schedule an evaluation of a venue's queue without waiting for it.
+        """
+        logger.debug(f"Queue event for venue {venue_id}: {event}")
+        queue = self._venues.setdefault(venue_id, _VenueQueue())
+        queue.dirty = True
+        if queue.runner is None or queue.runner.done():
+            queue.runner = asyncio.create_task(self._run(venue_id, queue))
+
+    async def advance(self, venue_id: str, event: str) -> None:
+        """
+        Schedule an evaluation of a venue's queue and wait until one that
+        started after this event has finished.
+        """
+        waiter = asyncio.get_running_loop().create_future()
+        self._venues.setdefault(venue_id, _VenueQueue()).waiters.append(waiter)
+        self.notify(venue_id, event)
+        await waiter
+
+    async def advance_all(self, venue_ids: List[str], event: str) -> None:
+        """
+        Evaluate several venues concurrently.
+        """
+        await asyncio.gather(*(self.advance(venue_id, event) for venue_id in venue_ids))
+
+    async def _run(self, venue_id: str, queue: _VenueQueue) -> None:
+        from app.services.waitlist_service import WaitlistService
+
+        while queue.dirty:
+            queue.dirty = False
+            waiters, queue.waiters = queue.waiters, []
+            try:
+                # Keep seating until a pass makes no progress
+                while await WaitlistService.check_queue_readiness(venue_id):
+                    pass
+            except Exception as e:
+                logger.error(f"Queue evaluation failed for venue {venue_id}: {e}")
+            finally:
+                for waiter in waiters:
+                    if not waiter.done():
+                        waiter.set_result(None)
+
+
+queue_advancer = QueueAdvancer()
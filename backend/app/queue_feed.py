@@ -0,0 +1,263 @@
+from redis.asyncio import Redis
+from app.config import settings
+from app.serialization import CLIENT_PARTY_FIELDS, client_party, dumps, loads
+from app.services.seat_management_service import AVAILABLE_SEATS_KEY, venue_key
+from app.wait_time_estimator import wait_time_estimator
+from typing import Dict, Iterable, List, Optional
+import asyncio
+import logging
+
+logger = logging.getLogger("QueueFeed")
+
+ADMIN_NAMESPACE = "/admin"
+
+# Stream of queue changes for every venue, with entry ids "<seq>-0"
+QUEUE_EVENTS_KEY = "queue_events"
+QUEUE_EVENTS_SEQ_KEY = "queue_events_seq"
+
+# Party fields kept in the stream: what clients see, plus the times needed
+# to rebuild queue state and analytics from it
+LOG_PARTY_FIELDS = (
+    *CLIENT_PARTY_FIELDS,
+    "created_at",
+    "ready_at",
+    "started_at",
+    "completed_at",
+)
+
+# KEYS[1] = events stream, KEYS[2] = sequence, KEYS[3] = available seats.
+# ARGV[1] = stream length, ARGV[2] = venue id, ARGV[3...] = encoded events.
+# Numbers the events and appends them with the venue's free seats at the
+# time of the change. Returns the last sequence number.
+PUBLISH_SCRIPT = """
+local seats = redis.call('GET', KEYS[3]) or '0'
+local seq = 0
+for i = 3, #ARGV do
+    seq = redis.call('INCR', KEYS[2])
+    redis.call('XADD', KEYS[1], 'MAXLEN', '~', ARGV[1], seq .. '-0',
+        'venue', ARGV[2], 'seats', seats, 'event', ARGV[i])
+end
+return seq
+"""
+
+
+def log_party(party: Dict) -> Dict:
+    return {field: party[field] for field in LOG_PARTY_FIELDS if field in party}
+
+
+def entry_seq(entry_id: str) -> int:
+    return int(entry_id.split("-", 1)[0])
+
+
+def make_diff(entry_id: str, fields: Dict) -> Dict:
+    return {
+        "seq": entry_seq(entry_id),
+        "venue_id": fields["venue"],
+        "available_seats": int(fields["seats"]),
+        **loads(fields["event"]),
+    }
+
+
+class _Subscriber:
+    __slots__ = ("venue_id", "cursor", "live")
+
+    def __init__(self, venue_id: str):
+        self.venue_id = venue_id
+        # Sequence number of the last change this client has seen
+        self.cursor = 0
+        # Whether the reader delivers new changes, once caught up
+        self.live = False
+
+
+class QueueFeed:
+    """
+    Live view of whole venue queues for staff, on the admin Socket.IO
+    namespace.
+
+    Queue changes (joined, ready, checked_in, completed, seats) are numbered
+    and appended to a Redis stream by whichever worker makes them. Each
+    worker reads the stream and forwards changes to its admin clients as
+    ``queue_diff`` events. A client subscribes to a venue and gets a
+    ``queue_snapshot`` followed by every later change in sequence order. It
+    can instead pass the last sequence number it saw to resume with only
+    the changes it missed, as long as they are still in the stream.
+    """
+
+    def __init__(self, max_events: int):
+        self.max_events = max_events
+        self._subscribers: Dict[str, _Subscriber] = {}
+        # Last sequence number the reader has delivered
+        self._reader_seq = 0
+        self._reader: Optional[asyncio.Task] = None
+
+    async def publish(
+        self,
+        redis_client: Redis,
+        venue_id: str,
+        event_type: str,
+        parties: Iterable[Dict] = (),
+    ) -> None:
+        """
+        Record a change to a venue's queue. Without parties, records that
+        only its free seats changed.
+        """
+        events = [
+            dumps({"type": event_type, "party": log_party(party)}) for party in parties
+        ] or [dumps({"type": event_type})]
+        try:
+            await redis_client.register_script(PUBLISH_SCRIPT)(
+                keys=[
+                    QUEUE_EVENTS_KEY,
+                    QUEUE_EVENTS_SEQ_KEY,
+                    venue_key(AVAILABLE_SEATS_KEY, venue_id),
+                ],
+                args=[self.max_events, venue_id, *events],
+            )
+        except Exception as e:
+            logger.error(f"Failed to publish {event_type} for venue {venue_id}: {e}")
+
+    async def snapshot(self, redis_client: Redis, collection, venue_id: str) -> Dict:
+        """
+        Active parties and free seats of a venue, as of the returned
+        sequence number. Changes after it may already be reflected; applying
+        them again leaves the same state.
+        """
+        seq = int(await redis_client.get(QUEUE_EVENTS_SEQ_KEY) or 0)
+        parties = await collection.find(
+            {
+                "venue_id": venue_id,
+                "status": {"$in": ["waiting", "ready", "checked_in"]},
+            },
+            sort=[("created_at", 1)],
+        ).to_list(length=None)
+        seats = await redis_client.get(venue_key(AVAILABLE_SEATS_KEY, venue_id))
+        return {
+            "seq": seq,
+            "venue_id": venue_id,
+            "available_seats": int(seats or 0),
+            "parties": [client_party(party) for party in parties],
+        }
+
+    async def can_resume(self, redis_client: Redis, since: int) -> bool:
+        """
+        Whether every change after ``since`` is still in the stream.
+        """
+        current = int(await redis_client.get(QUEUE_EVENTS_SEQ_KEY) or 0)
+        if since > current:
+            return False
+        if since == current:
+            return True
+        first = await redis_client.xrange(QUEUE_EVENTS_KEY, count=1)
+        return bool(first) and entry_seq(first[0][0]) <= since + 1
+
+    async def subscribe(
+        self, sio, sid: str, redis_client: Redis, collection, venue_id: str, since=None
+    ) -> None:
+        """
+        Bring an admin client up to date on a venue and start streaming its
+        changes.
+        """
+        subscriber = self._subscribers[sid] = _Subscriber(venue_id)
+        if isinstance(since, int) and await self.can_resume(redis_client, since):
+            subscriber.cursor = since
+        else:
+            await self._send_snapshot(sio, sid, subscriber, redis_client, collection)
+
+        # Replay from the stream until the reader takes over: it delivers
+        # every change after the one it last handled
+        while subscriber.cursor < self._reader_seq:
+            entries = await redis_client.xrange(
+                QUEUE_EVENTS_KEY, min=f"{subscriber.cursor + 1}-0", count=500
+            )
+            if self._subscribers.get(sid) is not subscriber:
+                return
+            if not entries or entry_seq(entries[0][0]) > subscriber.cursor + 1:
+                # The changes after the cursor were trimmed meanwhile
+                await self._send_snapshot(
+                    sio, sid, subscriber, redis_client, collection
+                )
+                continue
+            for entry_id, fields in entries:
+                await self._send(sio, sid, subscriber, entry_id, fields)
+        subscriber.live = True
+
+    async def _send_snapshot(
+        self, sio, sid: str, subscriber: _Subscriber, redis_client: Redis, collection
+    ) -> None:
+        snapshot = await self.snapshot(redis_client, collection, subscriber.venue_id)
+        await sio.emit("queue_snapshot", snapshot, to=sid, namespace=ADMIN_NAMESPACE)
+        subscriber.cursor = snapshot["seq"]
+
+    def unsubscribe(self, sid: str) -> None:
+        self._subscribers.pop(sid, None)
+
+    async def _send(
+        self, sio, sid: str, subscriber: _Subscriber, entry_id: str, fields: Dict
+    ) -> None:
+        seq = entry_seq(entry_id)
+        if seq <= subscriber.cursor:
+            return
+        subscriber.cursor = seq
+        if fields["venue"] != subscriber.venue_id:
+            return
+        try:
+            await sio.emit(
+                "queue_diff",
+                make_diff(entry_id, fields),
+                to=sid,
+                namespace=ADMIN_NAMESPACE,
+            )
+        except Exception as e:
+            logger.error(f"Failed to send queue change to SID={sid}: {e}")
+
+    async def deliver(self, sio, entries: List) -> None:
+        """
+        Forward stream entries to the live admin clients.
+        """
+        for entry_id, fields in entries:
+            self._reader_seq = entry_seq(entry_id)
+            for sid, subscriber in list(self._subscribers.items()):
+                if subscriber.live:
+                    await self._send(sio, sid, subscriber, entry_id, fields)
+
+    async def start(
+        self, sio, redis_client: Redis, since: Optional[int] = None
+    ) -> None:
+        """
+        Start reading the stream for this worker's admin clients and its
+        wait-time estimator, after sequence number ``since`` (by default,
+        the latest change).
+        """
+        if self._reader is not None:
+            return
+        if since is None:
+            since = int(await redis_client.get(QUEUE_EVENTS_SEQ_KEY) or 0)
+        self._reader_seq = since
+        self._reader = asyncio.create_task(self._run(sio, redis_client))
+
+    async def stop(self) -> None:
+        if self._reader is not None:
+            self._reader.cancel()
+            try:
+                await self._reader
+            except asyncio.CancelledError:
+                pass
+            self._reader = None
+
+    async def _run(self, sio, redis_client: Redis) -> None:
+        while True:
+            try:
+                streams = await redis_client.xread(
+                    {QUEUE_EVENTS_KEY: f"{self._reader_seq}-0"}, count=500, block=5000
+                )
+                for _, entries in streams:
+                    wait_time_estimator.apply(entries)
+                    await self.deliver(sio, entries)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Failed to read queue changes: {e}")
+                await asyncio.sleep(1)
+
+
+queue_feed = QueueFeed(max_events=settings.QUEUE_FEED_MAX_EVENTS)
@@ -1,6 +1,7 @@
 from redis.asyncio import Redis
 from redis import asyncio as aioredis
 from app.config import settings
+from app.metrics import instrument_redis
 import logging
 
 logger = logging.getLogger("RedisManager")
@@ -14,7 +15,9 @@ class RedisManager:
     async def connect(self):
         if self._redis is None:
             try:
-                self._redis = aioredis.from_url(self._redis_url, decode_responses=True)
+                self._redis = instrument_redis(
+                    aioredis.from_url(self._redis_url, decode_responses=True)
+                )
                 logger.info("Connected to Redis.")
             except Exception as e:
                 logger.error(f"Failed to connect to Redis: {str(e)}")
@@ -1,5 +1,10 @@
 from fastapi import APIRouter
 from app.routes.waitlist import router as waitlist_router
+from app.routes.metrics import router as metrics_router
+from app.routes.scheduler import router as scheduler_router
+from app.routes.analytics import router as analytics_router
 
 api_router = APIRouter()
 api_router.include_router(waitlist_router)
+api_router.include_router(scheduler_router)
+api_router.include_router(analytics_router)
@@ -0,0 +1,35 @@
+from fastapi import APIRouter, HTTPException, Query
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from app.config import settings
+from app.database import get_collection
+from app.services.analytics_service import (
+    ANALYTICS_COLLECTION,
+    AnalyticsService,
+    as_utc,
+)
+
+router = APIRouter()
+
+
+@router.get("/analytics")
+async def get_analytics(
+    venue_id: str = Query(settings.DEFAULT_VENUE_ID),
+    start: Optional[datetime] = Query(None),
+    end: Optional[datetime] = Query(None),
+):
+    """
+    Throughput per hour, average wait by party size and seat utilization of
+    a venue, over the last day unless a range is given.
+    """
+    end = as_utc(end) if end else datetime.now(timezone.utc)
+    start = as_utc(start) if start else end - timedelta(days=1)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    if end - start > timedelta(days=settings.ANALYTICS_MAX_RANGE_DAYS):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Range is limited to {settings.ANALYTICS_MAX_RANGE_DAYS} days",
+        )
+    collection = await get_collection(ANALYTICS_COLLECTION)
+    return await AnalyticsService.summary(collection, venue_id, start, end)
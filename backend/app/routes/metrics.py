@@ -0,0 +1,23 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.metrics import registry, render
+from app.redis_client import get_redis_client
+from app.services.waitlist_service import WaitlistService
+
+router = APIRouter()
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    redis_client = await get_redis_client()
+    metrics = await registry.collect(redis_client)
+
+    # Queue depth is global state, read once per scrape rather than merged
+    depths = await WaitlistService.get_queue_depths()
+    metrics["rwm_queue_depth"] = {
+        "kind": "gauge",
+        "help": "Parties in the waitlist by venue and status.",
+        "labelnames": ["venue", "status"],
+        "samples": depths,
+    }
+    return PlainTextResponse(render(metrics), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,10 @@
+from fastapi import APIRouter
+from app.leader_election import leader_elector
+from app.redis_client import get_redis_client
+
+router = APIRouter()
+
+
+@router.get("/scheduler/leader")
+async def get_scheduler_leader():
+    return await leader_elector.status(await get_redis_client())
@@ -1,19 +1,52 @@
-from fastapi import APIRouter, Body
+from fastapi import APIRouter, Body, Header, Response
+from fastapi.responses import ORJSONResponse
+from typing import Any, Dict, List, Optional
+from app.config import settings
 from app.services.waitlist_service import WaitlistService
 
 router = APIRouter()
 
 
 @router.get("/waitlist/{user_id}/status")
-async def get_waitlist_status(user_id: str):
-    return await WaitlistService.get_party_status(user_id)
+async def get_waitlist_status(user_id: str, if_none_match: Optional[str] = Header(None)):
+    status, etag = await WaitlistService.get_party_status_with_etag(user_id)
+    if if_none_match == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return ORJSONResponse(status, headers={"ETag": etag})
 
 
 @router.post("/waitlist")
 async def add_party_to_waitlist(
-    name: str = Body(...), party_size: int = Body(...), user_id: str = Body(...)
+    name: str = Body(...),
+    party_size: int = Body(...),
+    user_id: str = Body(...),
+    venue_id: str = Body(settings.DEFAULT_VENUE_ID),
 ):
-    return await WaitlistService.add_to_waitlist(name, party_size, user_id)
+    return await WaitlistService.add_to_waitlist(name, party_size, user_id, venue_id)
+
+
+@router.post("/venues/{venue_id}/waitlist")
+async def add_party_to_venue_waitlist(
+    venue_id: str,
+    name: str = Body(...),
+    party_size: int = Body(...),
+    user_id: str = Body(...),
+):
+    return await WaitlistService.add_to_waitlist(name, party_size, user_id, venue_id)
+
+
+@router.post("/waitlist/bulk")
+async def add_parties_to_waitlist(
+    parties: List[Dict[str, Any]] = Body(..., embed=True)
+):
+    return await WaitlistService.add_parties_to_waitlist(parties)
+
+
+@router.post("/venues/{venue_id}/waitlist/bulk")
+async def add_parties_to_venue_waitlist(
+    venue_id: str, parties: List[Dict[str, Any]] = Body(..., embed=True)
+):
+    return await WaitlistService.add_parties_to_waitlist(parties, venue_id)
 
 
 @router.post("/waitlist/{user_id}/check-in")
@@ -0,0 +1,54 @@
+from typing import Any, Dict
+import orjson
+
+# Party fields the client reads from status responses and notifications
+CLIENT_PARTY_FIELDS = ("_id", "name", "party_size", "status")
+
+
+def dumps(obj: Any) -> bytes:
+    return orjson.dumps(obj, default=str)
+
+
+def loads(data: Any) -> Any:
+    return orjson.loads(data)
+
+
+def client_party(party: Dict) -> Dict:
+    """
+    Trim a waitlist document to the fields the client uses.
+    """
+    return {field: party[field] for field in CLIENT_PARTY_FIELDS if field in party}
+
+
+def party_message(party: Dict, status: str) -> Dict:
+    return {"status": status, "party": client_party(party)}
+
+
+class OrjsonSocketJson:
+    """
+    Stand-in for the ``json`` module used by python-socketio packets.
+    """
+
+    @staticmethod
+    def dumps(obj: Any, **kwargs) -> str:
+        return orjson.dumps(obj, default=str).decode()
+
+    @staticmethod
+    def loads(data: Any, **kwargs) -> Any:
+        return orjson.loads(data)
+
+
+def socketio_serializer_options(name: str) -> Dict[str, Any]:
+    """
+    AsyncServer keyword arguments for a packet serializer.
+
+    ``msgpack`` sends binary packets and needs the msgpack package on the
+    server and socket.io-msgpack-parser on the client.
+    """
+    if name == "json":
+        return {}
+    if name == "orjson":
+        return {"json": OrjsonSocketJson}
+    if name == "msgpack":
+        return {"serializer": "msgpack"}
+    raise ValueError(f"Unknown Socket.IO serializer: {name}")
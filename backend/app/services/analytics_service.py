@@ -0,0 +1,219 @@
+from redis.asyncio import Redis
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from app.config import settings
+from app.queue_feed import QUEUE_EVENTS_KEY, entry_seq
+from app.serialization import loads
+from app.services.seat_management_service import seat_capacity
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger("Analytics")
+
+ANALYTICS_COLLECTION = "analytics_rollups"
+# Sequence number of the last queue event folded into the rollups, and of
+# the last event of the batch being folded
+ANALYTICS_CURSOR_KEY = "analytics_cursor"
+ANALYTICS_PENDING_KEY = "analytics_pending"
+
+DUPLICATE_KEY_ERROR = 11000
+
+# Party time each event is counted at
+EVENT_TIMES = {
+    "joined": "created_at",
+    "ready": "ready_at",
+    "checked_in": "started_at",
+    "completed": "completed_at",
+}
+EVENT_COUNTERS = {
+    "joined": "joined",
+    "ready": "seated",
+    "checked_in": "checked_in",
+    "completed": "completed",
+}
+
+
+def parse_time(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+def minute_of(moment: datetime) -> datetime:
+    return moment.astimezone(timezone.utc).replace(second=0, microsecond=0)
+
+
+def rollup_id(venue_id: str, minute: datetime) -> str:
+    return f"{venue_id}:{minute.strftime('%Y-%m-%dT%H:%M')}"
+
+
+def as_utc(moment: datetime) -> datetime:
+    # MongoDB hands dates back naive, in UTC; so may API callers
+    return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+
+
+class AnalyticsService:
+    """
+    Queue analytics over per-minute rollups.
+
+    The leader folds the queue event log into one ``analytics_rollups``
+    document per venue and minute, with counters for joined, seated,
+    checked-in and completed parties, wait time per party size and occupied
+    seat-seconds. Reports read only those buckets, through an index on the
+    venue and the bucket's minute (a native date), never the raw waitlist.
+    """
+
+    @staticmethod
+    def rollup(entries: List) -> Dict[Tuple[str, datetime], Dict[str, float]]:
+        """
+        Counter increments per (venue, minute) for queue event log entries.
+        """
+        buckets: Dict[Tuple[str, datetime], Dict[str, float]] = {}
+        for _, fields in entries:
+            event = loads(fields["event"])
+            party = event.get("party")
+            time_field = EVENT_TIMES.get(event["type"])
+            if party is None or time_field is None:
+                continue
+            moment = parse_time(party.get(time_field))
+            if moment is None:
+                continue
+            counters = buckets.setdefault((fields["venue"], minute_of(moment)), {})
+
+            def add(name: str, amount: float = 1) -> None:
+                counters[name] = counters.get(name, 0) + amount
+
+            add(EVENT_COUNTERS[event["type"]])
+            size = party.get("party_size", 0)
+            if event["type"] == "ready":
+                joined_at = parse_time(party.get("created_at"))
+                if joined_at is not None:
+                    add(f"by_size.{size}.seated")
+                    add(
+                        f"by_size.{size}.wait_seconds",
+                        (moment - joined_at).total_seconds(),
+                    )
+            elif event["type"] == "completed":
+                seated_at = parse_time(party.get("ready_at") or party.get("started_at"))
+                if seated_at is not None:
+                    add("seat_seconds", size * (moment - seated_at).total_seconds())
+        return buckets
+
+    @staticmethod
+    async def apply(collection, entries: List) -> int:
+        """
+        Add a batch of consecutive log entries to the rollups. Each bucket
+        records the last sequence number applied to it, so applying a batch
+        again after a crash changes nothing. Returns the buckets updated.
+        """
+        if not entries:
+            return 0
+        last_seq = entry_seq(entries[-1][0])
+        buckets = AnalyticsService.rollup(entries)
+        if not buckets:
+            return 0
+        try:
+            await collection.bulk_write(
+                [
+                    UpdateOne(
+                        {"_id": rollup_id(venue_id, minute), "seq": {"$lt": last_seq}},
+                        {
+                            "$setOnInsert": {"venue_id": venue_id, "minute": minute},
+                            "$set": {"seq": last_seq},
+                            "$inc": counters,
+                        },
+                        upsert=True,
+                    )
+                    for (venue_id, minute), counters in buckets.items()
+                ],
+                ordered=False,
+            )
+        except BulkWriteError as e:
+            # A duplicate key means the bucket exists with this batch applied
+            errors = e.details.get("writeErrors", [])
+            if any(error.get("code") != DUPLICATE_KEY_ERROR for error in errors):
+                raise
+        return len(buckets)
+
+    @staticmethod
+    async def consume(redis_client: Redis, collection) -> int:
+        """
+        Fold the queue events logged since the last call into the rollups.
+        Returns the number of events consumed.
+        """
+        cursor, pending = await redis_client.mget(
+            ANALYTICS_CURSOR_KEY, ANALYTICS_PENDING_KEY
+        )
+        cursor, pending = int(cursor or 0), int(pending or 0)
+        consumed = 0
+        while True:
+            if pending > cursor:
+                # Redo the interrupted batch exactly, so buckets it already
+                # updated recognize it
+                entries = await redis_client.xrange(
+                    QUEUE_EVENTS_KEY, min=f"{cursor + 1}-0", max=f"{pending}-0"
+                )
+            else:
+                entries = await redis_client.xrange(
+                    QUEUE_EVENTS_KEY,
+                    min=f"{cursor + 1}-0",
+                    count=settings.ANALYTICS_BATCH_SIZE,
+                )
+            if not entries:
+                return consumed
+            first, last = entry_seq(entries[0][0]), entry_seq(entries[-1][0])
+            if cursor and first > cursor + 1:
+                logger.warning(
+                    f"Queue events {cursor + 1}-{first - 1} were trimmed before "
+                    "analytics read them."
+                )
+            await redis_client.set(ANALYTICS_PENDING_KEY, last)
+            await AnalyticsService.apply(collection, entries)
+            await redis_client.set(ANALYTICS_CURSOR_KEY, last)
+            cursor = pending = last
+            consumed += len(entries)
+
+    @staticmethod
+    async def summary(
+        collection, venue_id: str, start: datetime, end: datetime
+    ) -> Dict[str, Any]:
+        """
+        Hourly throughput, average wait by party size and seat utilization
+        of a venue between ``start`` and ``end``, from the rollups.
+
+        Occupied seat-seconds are counted when a party completes, so
+        utilization near the range edges is approximate.
+        """
+        hours: Dict[datetime, Dict[str, int]] = {}
+        sizes: Dict[str, Dict[str, float]] = {}
+        seat_seconds = 0.0
+        async for bucket in collection.find(
+            {"venue_id": venue_id, "minute": {"$gte": start, "$lt": end}},
+            sort=[("minute", 1)],
+        ):
+            hour = as_utc(bucket["minute"]).replace(minute=0)
+            throughput = hours.setdefault(
+                hour, {"joined": 0, "seated": 0, "checked_in": 0, "completed": 0}
+            )
+            for counter in throughput:
+                throughput[counter] += int(bucket.get(counter, 0))
+            for size, counters in bucket.get("by_size", {}).items():
+                totals = sizes.setdefault(size, {"seated": 0, "wait_seconds": 0.0})
+                totals["seated"] += counters.get("seated", 0)
+                totals["wait_seconds"] += counters.get("wait_seconds", 0.0)
+            seat_seconds += bucket.get("seat_seconds", 0.0)
+
+        available = seat_capacity(venue_id) * (end - start).total_seconds()
+        return {
+            "venue_id": venue_id,
+            "start": start,
+            "end": end,
+            "throughput": [
+                {"hour": hour, **counters} for hour, counters in hours.items()
+            ],
+            "average_wait_by_party_size": {
+                size: totals["wait_seconds"] / totals["seated"]
+                for size, totals in sorted(sizes.items(), key=lambda item: int(item[0]))
+                if totals["seated"]
+            },
+            "seat_utilization": seat_seconds / available if available > 0 else 0.0,
+        }
@@ -1,62 +1,216 @@
 from redis.asyncio import Redis
 from fastapi import HTTPException
+from app.config import settings
+from app.distributed_lock import DistributedLock
+from app.durability_manager import durability_manager
+from app.metrics import SEATS_LOCK_ATTEMPTS, SEATS_LOCK_FAILURES
 import logging
 import json
 from datetime import datetime, timezone
+from typing import List, Optional, Tuple
 
 logger = logging.getLogger("SeatManagement")
 
+AVAILABLE_SEATS_KEY = "available_seats"
+SEAT_RESERVATIONS_KEY = "seat_reservations"
+SEATS_METADATA_KEY = "seats_metadata"
+SEATS_LOCK_KEY = "seats_lock"
+
+
+def venue_key(name: str, venue_id: str) -> str:
+    """
+    Redis key for a per-venue value. The default venue keeps the original
+    unsuffixed keys so existing data carries over.
+    """
+    if venue_id == settings.DEFAULT_VENUE_ID:
+        return name
+    return f"{name}:{venue_id}"
+
+
+def has_tables(venue_id: str) -> bool:
+    return bool(settings.VENUE_TABLES.get(venue_id))
+
+
+def seat_capacity(venue_id: str) -> int:
+    if has_tables(venue_id):
+        return sum(table["capacity"] for table in settings.VENUE_TABLES[venue_id])
+    return settings.VENUE_SEATS.get(venue_id, settings.AVAILABLE_SEATS)
+
+
+def largest_party(venue_id: str) -> int:
+    """
+    Largest party the venue can ever seat: its seat capacity, or at a venue
+    with tables, its largest table or combinable group of tables.
+    """
+    if not has_tables(venue_id):
+        return seat_capacity(venue_id)
+    largest, groups = 0, {}
+    for table in settings.VENUE_TABLES[venue_id]:
+        largest = max(largest, table["capacity"])
+        if table.get("group"):
+            groups[table["group"]] = groups.get(table["group"], 0) + table["capacity"]
+    return max(largest, *groups.values()) if groups else largest
+
+
+# KEYS[1] = available seats. ARGV[1] = seats requested.
+# Returns the remaining seats, or -1 if there were not enough.
+CHECK_AND_DECREMENT_SCRIPT = """
+local available = tonumber(redis.call('GET', KEYS[1]) or '0')
+local requested = tonumber(ARGV[1])
+if available < requested then
+    return -1
+end
+return redis.call('DECRBY', KEYS[1], requested)
+"""
+
+# KEYS[1] = available seats, KEYS[2] = reservations hash.
+# ARGV[1] = party id, ARGV[2] = party size.
+# Returns {status, available}; a party that already holds a reservation is
+# never charged twice.
+RESERVE_SEATS_SCRIPT = """
+local available = tonumber(redis.call('GET', KEYS[1]) or '0')
+if redis.call('HEXISTS', KEYS[2], ARGV[1]) == 1 then
+    return {0, available}
+end
+local size = tonumber(ARGV[2])
+if available < size then
+    return {-1, available}
+end
+redis.call('HSET', KEYS[2], ARGV[1], size)
+return {1, redis.call('DECRBY', KEYS[1], size)}
+"""
+
+# KEYS[1] = available seats, KEYS[2] = reservations hash.
+# ARGV = party id, party size, party id, party size, ...
+# Returns one reserve status per party, in order.
+RESERVE_PARTIES_SCRIPT = """
+local available = tonumber(redis.call('GET', KEYS[1]) or '0')
+local reserved = 0
+local results = {}
+for i = 1, #ARGV, 2 do
+    local size = tonumber(ARGV[i + 1])
+    if redis.call('HEXISTS', KEYS[2], ARGV[i]) == 1 then
+        results[#results + 1] = 0
+    elseif available - reserved < size then
+        results[#results + 1] = -1
+    else
+        redis.call('HSET', KEYS[2], ARGV[i], size)
+        reserved = reserved + size
+        results[#results + 1] = 1
+    end
+end
+if reserved > 0 then
+    redis.call('DECRBY', KEYS[1], reserved)
+end
+return results
+"""
+
+# KEYS[1] = available seats, KEYS[2] = reservations hash. ARGV[1] = party id.
+# Returns the number of seats handed back (0 if the party held none).
+RELEASE_SEATS_SCRIPT = """
+local size = redis.call('HGET', KEYS[2], ARGV[1])
+if not size then
+    return 0
+end
+redis.call('HDEL', KEYS[2], ARGV[1])
+redis.call('INCRBY', KEYS[1], size)
+return tonumber(size)
+"""
+
 
 class SeatManagementService:
     """
     Service layer for managing seat availability and concurrency locks.
-    Uses Redis with persistence for seat management.
+    Uses Redis with persistence for seat management; how seat changes reach
+    disk is governed by ``settings.SEAT_DURABILITY``.
+
+    Seat changes run as server-side Lua scripts so each check-and-update is a
+    single atomic round trip and does not need ``seats_lock``.
     """
 
+    # reserve_seats outcomes
+    RESERVED = 1
+    ALREADY_RESERVED = 0
+    INSUFFICIENT_SEATS = -1
+
     @staticmethod
-    async def initialize_seats(redis_client: Redis) -> None:
+    async def initialize_seats(
+        redis_client: Redis, venue_id: str = settings.DEFAULT_VENUE_ID
+    ) -> None:
         """
         Initialize available seats in Redis if not present.
         This should be called during application startup.
         """
         try:
             # Check if seats are already set in Redis
-            seats = await redis_client.get("available_seats")
+            seats = await redis_client.get(venue_key(AVAILABLE_SEATS_KEY, venue_id))
             if seats is not None:
                 logger.info(f"Available seats already initialized: {seats}")
                 return
 
-            # Initialize with default value
-            initial_seats = 10  # Default value
-            await redis_client.set("available_seats", initial_seats)
+            # Workers starting together would each write the full capacity
+            # over seats another worker has already reserved
+            lock = await SeatManagementService.acquire_seats_lock(
+                redis_client, venue_id
+            )
+            try:
+                seats = await redis_client.get(venue_key(AVAILABLE_SEATS_KEY, venue_id))
+                if seats is not None:
+                    return
+                if lock is None:
+                    raise HTTPException(
+                        status_code=503, detail="Seats are being initialized."
+                    )
 
-            # Save metadata about initialization
-            metadata = {
-                "initialized_at": datetime.now(timezone.utc).isoformat(),
-                "initial_seats": initial_seats,
-            }
-            await redis_client.set("seats_metadata", json.dumps(metadata))
+                # Initialize with default value
+                if has_tables(venue_id):
+                    from app.services.table_service import TableService
 
-            # Force Redis to save the data to disk
-            await redis_client.save()
+                    initial_seats = await TableService.initialize(
+                        redis_client, venue_id
+                    )
+                else:
+                    initial_seats = seat_capacity(venue_id)
+                await redis_client.set(
+                    venue_key(AVAILABLE_SEATS_KEY, venue_id), initial_seats
+                )
 
-            logger.info(f"Initialized available seats: {initial_seats}")
+                # Save metadata about initialization
+                metadata = {
+                    "initialized_at": datetime.now(timezone.utc).isoformat(),
+                    "initial_seats": initial_seats,
+                }
+                await redis_client.set(
+                    venue_key(SEATS_METADATA_KEY, venue_id), json.dumps(metadata)
+                )
+                await durability_manager.record(
+                    redis_client, initial_seats, venue_id=venue_id
+                )
 
+                logger.info(f"Initialized available seats: {initial_seats}")
+            finally:
+                if lock is not None:
+                    await SeatManagementService.release_seats_lock(lock)
+
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Error initializing seats: {e}")
             raise HTTPException(status_code=500, detail="Failed to initialize seats")
 
     @staticmethod
-    async def get_available_seats(redis_client: Redis) -> int:
+    async def get_available_seats(
+        redis_client: Redis, venue_id: str = settings.DEFAULT_VENUE_ID
+    ) -> int:
         """
         Retrieve the current number of available seats from Redis.
         """
         try:
-            seats = await redis_client.get("available_seats")
+            seats = await redis_client.get(venue_key(AVAILABLE_SEATS_KEY, venue_id))
             if seats is None:
                 # If seats not found, initialize them
-                await SeatManagementService.initialize_seats(redis_client)
-                seats = await redis_client.get("available_seats")
+                await SeatManagementService.initialize_seats(redis_client, venue_id)
+                seats = await redis_client.get(venue_key(AVAILABLE_SEATS_KEY, venue_id))
 
             return int(seats)
 
@@ -67,24 +221,32 @@ class SeatManagementService:
             )
 
     @staticmethod
-    async def decrement_available_seats(redis_client: Redis, party_size: int):
+    async def decrement_available_seats(
+        redis_client: Redis, party_size: int, venue_id: str = settings.DEFAULT_VENUE_ID
+    ):
         """
         Decrement available seats by the party size.
         """
         try:
-            available_seats = int(await redis_client.get("available_seats"))
-            logger.info(f"Available seats before decrement: {available_seats}")
-            if available_seats < party_size:
-                logger.warning(
-                    f"Not enough available seats. Requested: {party_size}, Available: {available_seats}"
-                )
+            remaining = await redis_client.register_script(CHECK_AND_DECREMENT_SCRIPT)(
+                keys=[venue_key(AVAILABLE_SEATS_KEY, venue_id)], args=[party_size]
+            )
+            if int(remaining) < 0:
+                logger.warning(f"Not enough available seats. Requested: {party_size}")
                 raise HTTPException(
                     status_code=400, detail="Not enough available seats."
                 )
 
-            await redis_client.decrby("available_seats", party_size)
-            await redis_client.save()  # Force save to disk
-            logger.info(f"Decremented available seats by {party_size}.")
+            await durability_manager.record(
+                redis_client, -party_size, venue_id=venue_id
+            )
+            logger.info(
+                "Decremented available seats by %s.",
+                party_size,
+                extra={"event": "seat_change", "venue_id": venue_id},
+            )
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Error decrementing available seats: {e}")
             raise HTTPException(
@@ -92,14 +254,22 @@ class SeatManagementService:
             )
 
     @staticmethod
-    async def increment_available_seats(redis_client: Redis, party_size: int):
+    async def increment_available_seats(
+        redis_client: Redis, party_size: int, venue_id: str = settings.DEFAULT_VENUE_ID
+    ):
         """
         Increment available seats by the party size.
         """
         try:
-            await redis_client.incrby("available_seats", party_size)
-            await redis_client.save()  # Force save to disk
-            logger.info(f"Incremented available seats by {party_size}.")
+            await redis_client.incrby(
+                venue_key(AVAILABLE_SEATS_KEY, venue_id), party_size
+            )
+            await durability_manager.record(redis_client, party_size, venue_id=venue_id)
+            logger.info(
+                "Incremented available seats by %s.",
+                party_size,
+                extra={"event": "seat_change", "venue_id": venue_id},
+            )
         except Exception as e:
             logger.error(f"Error incrementing available seats: {e}")
             raise HTTPException(
@@ -107,31 +277,156 @@ class SeatManagementService:
             )
 
     @staticmethod
-    async def acquire_seats_lock(redis_client: Redis) -> bool:
+    async def reserve_seats(
+        redis_client: Redis,
+        party_id: str,
+        party_size: int,
+        venue_id: str = settings.DEFAULT_VENUE_ID,
+    ) -> Tuple[int, int]:
         """
-        Acquire a Redis lock for updating seats.
+        Atomically reserve seats for a party.
+
+        Returns a ``(status, available_seats)`` tuple where status is one of
+        RESERVED, ALREADY_RESERVED or INSUFFICIENT_SEATS. Retrying for the same
+        party id never takes seats twice.
+        """
+        try:
+            status, available = await redis_client.register_script(
+                RESERVE_SEATS_SCRIPT
+            )(
+                keys=[
+                    venue_key(AVAILABLE_SEATS_KEY, venue_id),
+                    venue_key(SEAT_RESERVATIONS_KEY, venue_id),
+                ],
+                args=[party_id, party_size],
+            )
+            if int(status) == SeatManagementService.RESERVED:
+                await durability_manager.record(
+                    redis_client, -party_size, party_id, venue_id
+                )
+            return int(status), int(available)
+        except Exception as e:
+            logger.error(f"Error reserving seats for party {party_id}: {e}")
+            raise HTTPException(status_code=500, detail="Failed to reserve seats.")
+
+    @staticmethod
+    async def reserve_parties(
+        redis_client: Redis,
+        parties: List[Tuple[str, int]],
+        venue_id: str = settings.DEFAULT_VENUE_ID,
+    ) -> List[int]:
         """
+        Atomically reserve seats for several ``(party_id, party_size)`` pairs
+        in one round trip, in order.
+
+        Returns one reserve_seats status per party.
+        """
+        if not parties:
+            return []
         try:
-            lock_acquired = await redis_client.set(
-                "seats_lock", "locked", ex=5, nx=True
+            args = [value for party in parties for value in party]
+            statuses = await redis_client.register_script(RESERVE_PARTIES_SCRIPT)(
+                keys=[
+                    venue_key(AVAILABLE_SEATS_KEY, venue_id),
+                    venue_key(SEAT_RESERVATIONS_KEY, venue_id),
+                ],
+                args=args,
             )
-            if lock_acquired:
-                logger.info("Seats lock acquired.")
-            else:
-                logger.warning("Failed to acquire seats lock.")
-            return lock_acquired
+            statuses = [int(status) for status in statuses]
+            reserved = sum(
+                size
+                for (_, size), status in zip(parties, statuses)
+                if status == SeatManagementService.RESERVED
+            )
+            if reserved:
+                await durability_manager.record(
+                    redis_client, -reserved, venue_id=venue_id
+                )
+            return statuses
+        except Exception as e:
+            logger.error(f"Error reserving seats for {len(parties)} parties: {e}")
+            raise HTTPException(status_code=500, detail="Failed to reserve seats.")
+
+    @staticmethod
+    async def release_seats(
+        redis_client: Redis, party_id: str, venue_id: str = settings.DEFAULT_VENUE_ID
+    ) -> int:
+        """
+        Atomically return the seats reserved by a party.
+
+        Returns the number of seats released; releasing twice is a no-op.
+        At a venue with tables, the party's tables are freed as well.
+        """
+        try:
+            keys = [
+                venue_key(AVAILABLE_SEATS_KEY, venue_id),
+                venue_key(SEAT_RESERVATIONS_KEY, venue_id),
+            ]
+            script = RELEASE_SEATS_SCRIPT
+            if has_tables(venue_id):
+                from app.services.table_service import (
+                    RELEASE_TABLES_SCRIPT,
+                    TableService,
+                )
+
+                script = RELEASE_TABLES_SCRIPT
+                keys += [
+                    *TableService.table_keys(venue_id),
+                    TableService.assignments_key(venue_id),
+                ]
+            released = await redis_client.register_script(script)(
+                keys=keys, args=[party_id]
+            )
+            if int(released):
+                await durability_manager.record(
+                    redis_client, int(released), party_id, venue_id
+                )
+            logger.info(
+                "Released %s seats for party %s.",
+                released,
+                party_id,
+                extra={"event": "seat_change", "venue_id": venue_id},
+            )
+            return int(released)
+        except Exception as e:
+            logger.error(f"Error releasing seats for party {party_id}: {e}")
+            raise HTTPException(status_code=500, detail="Failed to release seats.")
+
+    @staticmethod
+    async def acquire_seats_lock(
+        redis_client: Redis,
+        venue_id: str = settings.DEFAULT_VENUE_ID,
+        timeout: float = settings.LOCK_WAIT_SECONDS,
+    ) -> Optional[DistributedLock]:
+        """
+        Acquire a venue's seats lock, waiting up to ``timeout`` seconds.
+        Returns the held lock, or None if it stayed busy.
+        """
+        SEATS_LOCK_ATTEMPTS.inc()
+        lock = DistributedLock(redis_client, venue_key(SEATS_LOCK_KEY, venue_id))
+        try:
+            if await lock.acquire(timeout):
+                logger.info(
+                    "Seats lock acquired.",
+                    extra={"event": "seats_lock", "venue_id": venue_id},
+                )
+                return lock
+            SEATS_LOCK_FAILURES.inc()
+            logger.warning(f"Seats lock of venue {venue_id} busy for {timeout}s.")
+            return None
         except Exception as e:
             logger.error(f"Error acquiring seats lock: {e}")
             raise HTTPException(status_code=500, detail="Failed to acquire lock.")
 
     @staticmethod
-    async def release_seats_lock(redis_client: Redis):
+    async def release_seats_lock(lock: DistributedLock) -> None:
         """
-        Release the Redis lock for seat management.
+        Release a seats lock taken with ``acquire_seats_lock``. A lock that
+        has since passed to another owner is left alone.
         """
         try:
-            await redis_client.delete("seats_lock")
-            logger.info("Seats lock released.")
+            await lock.release()
+            logger.info("Seats lock released.", extra={"event": "seats_lock"})
         except Exception as e:
             logger.error(f"Error releasing seats lock: {e}")
             raise HTTPException(status_code=500, detail="Failed to release lock.")
@@ -0,0 +1,127 @@
+from typing import Dict, List, Optional
+import logging
+import time
+
+logger = logging.getLogger("SeatingPolicy")
+
+
+class SeatingPolicy:
+    """
+    Chooses which waiting parties to seat from a window of the queue.
+
+    ``parties`` are ordered oldest first, with their join time in
+    ``joined_at`` when known; implementations return the parties to seat,
+    whose combined size must not exceed ``available_seats``. ``now``
+    defaults to the current time.
+    """
+
+    def select(
+        self, parties: List[Dict], available_seats: int, now: Optional[float] = None
+    ) -> List[Dict]:
+        raise NotImplementedError
+
+
+class StrictFifoPolicy(SeatingPolicy):
+    """
+    Seat parties strictly in arrival order, stopping at the first that
+    does not fit.
+    """
+
+    def select(
+        self, parties: List[Dict], available_seats: int, now: Optional[float] = None
+    ) -> List[Dict]:
+        chosen = []
+        for party in parties:
+            if party["party_size"] > available_seats:
+                break
+            chosen.append(party)
+            available_seats -= party["party_size"]
+        return chosen
+
+
+class SkipAheadPolicy(SeatingPolicy):
+    """
+    Seat parties in arrival order, letting smaller parties behind jump a
+    party that does not fit, at most ``max_skips`` times per pass.
+
+    A party that has waited ``max_skip_wait`` seconds can no longer be
+    jumped: the pass stops at it, so seats freed from then on are held for
+    it instead of going to the parties behind.
+    """
+
+    def __init__(self, max_skips: int, max_skip_wait: float):
+        self.max_skips = max_skips
+        self.max_skip_wait = max_skip_wait
+
+    def select(
+        self, parties: List[Dict], available_seats: int, now: Optional[float] = None
+    ) -> List[Dict]:
+        now = time.time() if now is None else now
+        chosen = []
+        skipped = 0
+        for party in parties:
+            if party["party_size"] <= available_seats:
+                chosen.append(party)
+                available_seats -= party["party_size"]
+            elif (
+                skipped < self.max_skips
+                and now - party.get("joined_at", now) < self.max_skip_wait
+            ):
+                skipped += 1
+            else:
+                break
+        return chosen
+
+
+class BestFitPolicy(SeatingPolicy):
+    """
+    Seat the combination of parties that fills the most seats, preferring
+    older parties when several combinations fill the same number.
+
+    Once the oldest party has waited ``max_skip_wait`` seconds it is seated
+    first, and the rest are packed around it; if it does not fit, the pass
+    stops so seats freed from then on are held for it.
+    """
+
+    def __init__(self, max_skip_wait: float):
+        self.max_skip_wait = max_skip_wait
+
+    def select(
+        self, parties: List[Dict], available_seats: int, now: Optional[float] = None
+    ) -> List[Dict]:
+        now = time.time() if now is None else now
+        if parties and now - parties[0].get("joined_at", now) >= self.max_skip_wait:
+            head = parties[0]
+            if head["party_size"] > available_seats:
+                return []
+            return [head] + self._pack(
+                parties[1:], available_seats - head["party_size"]
+            )
+        return self._pack(parties, available_seats)
+
+    @staticmethod
+    def _pack(parties: List[Dict], available_seats: int) -> List[Dict]:
+        # best[c] holds the indices of the earliest parties that seat exactly c
+        best: Dict[int, List[int]] = {0: []}
+        for index, party in enumerate(parties):
+            size = party["party_size"]
+            for seats, indices in list(best.items()):
+                total = seats + size
+                if total <= available_seats and total not in best:
+                    best[total] = indices + [index]
+        return [parties[i] for i in best[max(best)]]
+
+
+def get_seating_policy(
+    name: str, max_skips: int = 3, max_skip_wait: float = 900.0
+) -> SeatingPolicy:
+    """
+    Build the seating policy configured by name.
+    """
+    if name == "fifo":
+        return StrictFifoPolicy()
+    if name == "skip_ahead":
+        return SkipAheadPolicy(max_skips, max_skip_wait)
+    if name == "best_fit":
+        return BestFitPolicy(max_skip_wait)
+    raise ValueError(f"Unknown seating policy: {name}")
@@ -0,0 +1,259 @@
+from redis.asyncio import Redis
+from app.config import settings
+from app.services.seat_management_service import venue_key
+from typing import Dict, List
+import logging
+
+logger = logging.getLogger("TableService")
+
+# Table inventory of a venue with tables, each key suffixed per venue:
+# tables              hash   table id -> "capacity:group"
+# free_tables         zset   free table ids scored by capacity
+# free_table_groups   zset   "group:capacity:table id" of free combinable
+#                            tables, all scored 0 so they sort by group and
+#                            then capacity
+# free_group_capacity zset   group -> free capacity of its tables
+# table_assignments   hash   party id -> comma-separated table ids
+TABLES_KEY = "tables"
+FREE_TABLES_KEY = "free_tables"
+FREE_TABLE_GROUPS_KEY = "free_table_groups"
+FREE_GROUP_CAPACITY_KEY = "free_group_capacity"
+TABLE_ASSIGNMENTS_KEY = "table_assignments"
+
+# Lua helpers shared by the table scripts. ``tkeys`` holds the tables, free
+# tables, free table groups and free group capacity keys, in that order.
+TABLE_FUNCTIONS = """
+local function table_info(tkeys, id)
+    local capacity, group = string.match(
+        redis.call('HGET', tkeys[1], id), '^(%d+):(.*)$')
+    return tonumber(capacity), group
+end
+
+local function group_member(group, capacity, id)
+    return string.format('%s:%04d:%s', group, capacity, id)
+end
+
+local function take_table(tkeys, id)
+    local capacity, group = table_info(tkeys, id)
+    redis.call('ZREM', tkeys[2], id)
+    if group ~= '' then
+        redis.call('ZREM', tkeys[3], group_member(group, capacity, id))
+        redis.call('ZINCRBY', tkeys[4], -capacity, group)
+    end
+    return capacity
+end
+
+local function free_table(tkeys, id)
+    local capacity, group = table_info(tkeys, id)
+    redis.call('ZADD', tkeys[2], capacity, id)
+    if group ~= '' then
+        redis.call('ZADD', tkeys[3], 0, group_member(group, capacity, id))
+        redis.call('ZINCRBY', tkeys[4], capacity, group)
+    end
+    return capacity
+end
+
+-- Takes tables from a combinable group until ``size`` is seated: the
+-- smallest table covering what is left, else the largest. The group must
+-- have at least ``size`` free. Returns the table ids and their capacity.
+local function take_from_group(tkeys, group, size)
+    local last = '[' .. group .. ':\\255'
+    local ids, total, need = {}, 0, size
+    while need > 0 do
+        local member = redis.call('ZRANGEBYLEX', tkeys[3],
+            '[' .. group_member(group, need, ''), last, 'LIMIT', 0, 1)[1]
+        if not member then
+            member = redis.call('ZREVRANGEBYLEX', tkeys[3],
+                last, '[' .. group .. ':', 'LIMIT', 0, 1)[1]
+        end
+        local id = string.sub(member, #group + 7)
+        local capacity = take_table(tkeys, id)
+        ids[#ids + 1] = id
+        total = total + capacity
+        need = need - capacity
+    end
+    return ids, total
+end
+
+-- Seats ``size`` at the smallest free table that fits, or at tables from
+-- the combinable group with the least free capacity that fits, whichever
+-- leaves fewer seats empty (the single table on a tie). Returns the table
+-- ids and their total capacity, or nil.
+local function allocate(tkeys, size)
+    local single = redis.call('ZRANGEBYSCORE', tkeys[2], size, '+inf', 'LIMIT', 0, 1)[1]
+    local single_capacity = single and tonumber(redis.call('ZSCORE', tkeys[2], single))
+    if single_capacity == size then
+        return {single}, take_table(tkeys, single)
+    end
+    local group = redis.call('ZRANGEBYSCORE', tkeys[4], size, '+inf', 'LIMIT', 0, 1)[1]
+    if group then
+        local ids, total = take_from_group(tkeys, group, size)
+        if not single or total < single_capacity then
+            return ids, total
+        end
+        for _, id in ipairs(ids) do
+            free_table(tkeys, id)
+        end
+    end
+    if single then
+        return {single}, take_table(tkeys, single)
+    end
+    return nil, 0
+end
+"""
+
+# KEYS[1] = tables, KEYS[2] = free tables, KEYS[3] = free table groups,
+# KEYS[4] = free group capacity, KEYS[5] = assignments.
+# ARGV = table id, capacity, group, table id, capacity, group, ...
+# Replaces the venue's inventory with every table free. Returns the total
+# capacity.
+INITIALIZE_TABLES_SCRIPT = TABLE_FUNCTIONS + """
+local tkeys = {KEYS[1], KEYS[2], KEYS[3], KEYS[4]}
+redis.call('DEL', KEYS[1], KEYS[2], KEYS[3], KEYS[4], KEYS[5])
+local total = 0
+for i = 1, #ARGV, 3 do
+    redis.call('HSET', KEYS[1], ARGV[i], ARGV[i + 1] .. ':' .. ARGV[i + 2])
+    total = total + free_table(tkeys, ARGV[i])
+end
+return total
+"""
+
+# KEYS[1] = available seats, KEYS[2] = reservations hash, KEYS[3] = queue,
+# KEYS[4] = party sizes, KEYS[5..8] = table keys, KEYS[9] = assignments.
+# ARGV[1] = 1 to stop at the first party without a table, ARGV[2...] =
+# party ids, in seating order.
+# Each party still in the queue that gets a table (or group of tables) is
+# dequeued and holds the tables' capacity as its reservation. A queued party
+# that already holds a reservation is dropped from the queue instead. Returns
+# the seats reserved followed by one status per party.
+SEAT_AT_TABLES_SCRIPT = TABLE_FUNCTIONS + """
+local tkeys = {KEYS[5], KEYS[6], KEYS[7], KEYS[8]}
+local reserved = 0
+local blocked = false
+local results = {0}
+for i = 2, #ARGV do
+    local id = ARGV[i]
+    local size = redis.call('HGET', KEYS[4], id)
+    if not size then
+        results[#results + 1] = -2
+    elseif redis.call('HEXISTS', KEYS[2], id) == 1 then
+        redis.call('ZREM', KEYS[3], id)
+        redis.call('HDEL', KEYS[4], id)
+        results[#results + 1] = -3
+    elseif blocked then
+        results[#results + 1] = -1
+    else
+        local ids, capacity = allocate(tkeys, tonumber(size))
+        if ids then
+            redis.call('ZREM', KEYS[3], id)
+            redis.call('HDEL', KEYS[4], id)
+            redis.call('HSET', KEYS[2], id, capacity)
+            redis.call('HSET', KEYS[9], id, table.concat(ids, ','))
+            reserved = reserved + capacity
+            results[#results + 1] = 1
+        else
+            results[#results + 1] = -1
+            blocked = ARGV[1] == '1'
+        end
+    end
+end
+if reserved > 0 then
+    redis.call('DECRBY', KEYS[1], reserved)
+end
+results[1] = reserved
+return results
+"""
+
+# KEYS[1] = available seats, KEYS[2] = reservations hash, KEYS[3..6] = table
+# keys, KEYS[7] = assignments. ARGV[1] = party id.
+# Frees the party's tables and returns the seats it held (0 if none).
+RELEASE_TABLES_SCRIPT = TABLE_FUNCTIONS + """
+local tkeys = {KEYS[3], KEYS[4], KEYS[5], KEYS[6]}
+local assigned = redis.call('HGET', KEYS[7], ARGV[1])
+if assigned then
+    redis.call('HDEL', KEYS[7], ARGV[1])
+    for id in string.gmatch(assigned, '[^,]+') do
+        free_table(tkeys, id)
+    end
+end
+local size = redis.call('HGET', KEYS[2], ARGV[1])
+if not size then
+    return 0
+end
+redis.call('HDEL', KEYS[2], ARGV[1])
+redis.call('INCRBY', KEYS[1], size)
+return tonumber(size)
+"""
+
+
+def venue_tables(venue_id: str) -> List[Dict]:
+    return settings.VENUE_TABLES.get(venue_id, [])
+
+
+def validate_tables(tables: List[Dict]) -> None:
+    """
+    Check a venue's table configuration.
+
+    Raises:
+        ValueError: If a table is malformed
+    """
+    seen = set()
+    for table in tables:
+        table_id, capacity = str(table.get("id", "")), table.get("capacity")
+        group = str(table.get("group", ""))
+        if not table_id or "," in table_id or table_id in seen:
+            raise ValueError(f"Invalid or duplicate table id: {table_id!r}")
+        if not isinstance(capacity, int) or not 0 < capacity < 10000:
+            raise ValueError(f"Invalid capacity for table {table_id}: {capacity!r}")
+        if ":" in group:
+            raise ValueError(f"Invalid group for table {table_id}: {group!r}")
+        seen.add(table_id)
+
+
+class TableService:
+    """
+    Table inventory of venues configured with ``VENUE_TABLES``.
+
+    Free tables are indexed by capacity, and combinable tables additionally
+    by group, so seating a party finds the smallest table that fits, or the
+    best group of tables, in O(log n) per table taken instead of scanning
+    the floor. A party's reservation is the capacity of the tables it got,
+    so ``available_seats`` stays the venue's free table capacity.
+    """
+
+    @staticmethod
+    def table_keys(venue_id: str) -> List[str]:
+        """
+        Tables, free tables, free table groups and free group capacity keys.
+        """
+        return [
+            venue_key(TABLES_KEY, venue_id),
+            venue_key(FREE_TABLES_KEY, venue_id),
+            venue_key(FREE_TABLE_GROUPS_KEY, venue_id),
+            venue_key(FREE_GROUP_CAPACITY_KEY, venue_id),
+        ]
+
+    @staticmethod
+    def assignments_key(venue_id: str) -> str:
+        return venue_key(TABLE_ASSIGNMENTS_KEY, venue_id)
+
+    @staticmethod
+    async def initialize(redis_client: Redis, venue_id: str) -> int:
+        """
+        Load a venue's configured tables with every table free. Returns the
+        total capacity.
+        """
+        tables = venue_tables(venue_id)
+        validate_tables(tables)
+        args = []
+        for table in tables:
+            args.extend((str(table["id"]), table["capacity"], table.get("group", "")))
+        total = await redis_client.register_script(INITIALIZE_TABLES_SCRIPT)(
+            keys=[
+                *TableService.table_keys(venue_id),
+                TableService.assignments_key(venue_id),
+            ],
+            args=args,
+        )
+        logger.info(f"Initialized {len(tables)} tables at venue {venue_id}.")
+        return int(total)
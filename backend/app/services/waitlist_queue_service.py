@@ -0,0 +1,357 @@
+from redis.asyncio import Redis
+from fastapi import HTTPException
+from app.config import settings
+from app.durability_manager import durability_manager
+from app.services.seat_management_service import (
+    AVAILABLE_SEATS_KEY,
+    SEAT_RESERVATIONS_KEY,
+    SeatManagementService,
+    has_tables,
+    venue_key,
+)
+from app.services.table_service import SEAT_AT_TABLES_SCRIPT, TableService
+from app.state_snapshots import active_parties, state_snapshotter
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger("WaitlistQueue")
+
+WAITLIST_QUEUE_KEY = "waitlist_queue"
+WAITLIST_SIZES_KEY = "waitlist_party_sizes"
+
+# KEYS[1] = queue, KEYS[2] = party sizes.
+# ARGV[1] = party id, ARGV[2] = score, ARGV[3] = party size.
+# Returns 1 if the party was queued, 0 if it already was.
+ENQUEUE_SCRIPT = """
+if redis.call('ZADD', KEYS[1], 'NX', ARGV[2], ARGV[1]) == 0 then
+    return 0
+end
+redis.call('HSET', KEYS[2], ARGV[1], ARGV[3])
+return 1
+"""
+
+# KEYS[1] = queue, KEYS[2] = party sizes.
+# ARGV = party id, score, party size, party id, score, party size, ...
+# Returns the number of parties newly queued.
+ENQUEUE_MANY_SCRIPT = """
+local added = 0
+for i = 1, #ARGV, 3 do
+    if redis.call('ZADD', KEYS[1], 'NX', ARGV[i + 1], ARGV[i]) == 1 then
+        redis.call('HSET', KEYS[2], ARGV[i], ARGV[i + 2])
+        added = added + 1
+    end
+end
+return added
+"""
+
+# KEYS[1] = available seats, KEYS[2] = queue, KEYS[3] = party sizes.
+# ARGV[1] = window size.
+# Returns {available, party id, party size, join time, party id, ...}, with
+# available -1 if the venue's seats were never initialized.
+PEEK_SCRIPT = """
+local seats = redis.call('GET', KEYS[1])
+local result = {seats and tonumber(seats) or -1}
+local queued = redis.call('ZRANGE', KEYS[2], 0, tonumber(ARGV[1]) - 1, 'WITHSCORES')
+for i = 1, #queued, 2 do
+    result[#result + 1] = queued[i]
+    result[#result + 1] = tonumber(redis.call('HGET', KEYS[3], queued[i]) or '0')
+    result[#result + 1] = queued[i + 1]
+end
+return result
+"""
+
+# KEYS[1] = available seats, KEYS[2] = reservations hash, KEYS[3] = queue,
+# KEYS[4] = party sizes. ARGV = party ids, in seating order.
+# Each party still in the queue that fits is removed from the queue and its
+# seats reserved. A queued party that already holds a reservation (queued
+# again by a repair racing its seating) is dropped from the queue instead.
+# Returns one status per party.
+SEAT_SCRIPT = """
+local available = tonumber(redis.call('GET', KEYS[1]) or '0')
+local reserved = 0
+local results = {}
+for i, id in ipairs(ARGV) do
+    local size = redis.call('HGET', KEYS[4], id)
+    if not size then
+        results[i] = -2
+    elseif redis.call('HEXISTS', KEYS[2], id) == 1 then
+        redis.call('ZREM', KEYS[3], id)
+        redis.call('HDEL', KEYS[4], id)
+        results[i] = -3
+    elseif available - reserved < tonumber(size) then
+        results[i] = -1
+    else
+        redis.call('ZREM', KEYS[3], id)
+        redis.call('HDEL', KEYS[4], id)
+        redis.call('HSET', KEYS[2], id, size)
+        reserved = reserved + tonumber(size)
+        results[i] = 1
+    end
+end
+if reserved > 0 then
+    redis.call('DECRBY', KEYS[1], reserved)
+end
+return results
+"""
+
+# KEYS[1] = queue, KEYS[2] = party sizes. ARGV = party ids.
+DEQUEUE_SCRIPT = """
+for _, id in ipairs(ARGV) do
+    redis.call('ZREM', KEYS[1], id)
+    redis.call('HDEL', KEYS[2], id)
+end
+return #ARGV
+"""
+
+
+def queue_score(created_at: str) -> float:
+    return datetime.fromisoformat(created_at).timestamp()
+
+
+class WaitlistQueueService:
+    """
+    Redis mirror of each venue's waiting queue: a sorted set of party ids
+    scored by join time and a hash of their sizes.
+
+    The mirror is authoritative for seating. A seating pass reads the queue
+    head and free seats in one round trip and then dequeues and reserves the
+    chosen parties in one atomic script, so no MongoDB call sits between the
+    decision and the reservation. MongoDB stays the system of record and is
+    updated after the seats are taken; ``reconcile`` repairs any difference
+    left by a crash in between.
+    """
+
+    # seat outcomes
+    SEATED = 1
+    INSUFFICIENT_SEATS = -1
+    NOT_QUEUED = -2
+    ALREADY_SEATED = -3
+
+    @staticmethod
+    def _keys(venue_id: str) -> Tuple[str, str]:
+        return (
+            venue_key(WAITLIST_QUEUE_KEY, venue_id),
+            venue_key(WAITLIST_SIZES_KEY, venue_id),
+        )
+
+    @staticmethod
+    async def enqueue(redis_client: Redis, party: Dict) -> bool:
+        """
+        Add a waiting party to its venue's queue. Queuing twice is a no-op.
+        """
+        venue_id = party.get("venue_id", settings.DEFAULT_VENUE_ID)
+        try:
+            added = await redis_client.register_script(ENQUEUE_SCRIPT)(
+                keys=list(WaitlistQueueService._keys(venue_id)),
+                args=[
+                    party["_id"],
+                    queue_score(party["created_at"]),
+                    party["party_size"],
+                ],
+            )
+            return bool(int(added))
+        except Exception as e:
+            logger.error(f"Error queuing party {party['_id']}: {e}")
+            raise HTTPException(status_code=500, detail="Failed to queue party.")
+
+    @staticmethod
+    async def enqueue_many(redis_client: Redis, parties: List[Dict]) -> int:
+        """
+        Queue a batch of waiting parties with one script call per venue.
+        Returns how many were newly queued.
+        """
+        by_venue: Dict[str, List] = {}
+        for party in parties:
+            by_venue.setdefault(
+                party.get("venue_id", settings.DEFAULT_VENUE_ID), []
+            ).extend(
+                (party["_id"], queue_score(party["created_at"]), party["party_size"])
+            )
+        try:
+            added = 0
+            for venue_id, args in by_venue.items():
+                added += int(
+                    await redis_client.register_script(ENQUEUE_MANY_SCRIPT)(
+                        keys=list(WaitlistQueueService._keys(venue_id)), args=args
+                    )
+                )
+            return added
+        except Exception as e:
+            logger.error(f"Error queuing {len(parties)} parties: {e}")
+            raise HTTPException(status_code=500, detail="Failed to queue parties.")
+
+    @staticmethod
+    async def dequeue(redis_client: Redis, venue_id: str, party_ids: List[str]) -> None:
+        if party_ids:
+            await redis_client.register_script(DEQUEUE_SCRIPT)(
+                keys=list(WaitlistQueueService._keys(venue_id)), args=party_ids
+            )
+
+    @staticmethod
+    async def peek(
+        redis_client: Redis, venue_id: str, window: int
+    ) -> Tuple[int, List[Dict]]:
+        """
+        Return the free seats and the oldest ``window`` waiting parties of a
+        venue, with their join times (epoch seconds), as a consistent
+        snapshot.
+        """
+        keys = [
+            venue_key(AVAILABLE_SEATS_KEY, venue_id),
+            *WaitlistQueueService._keys(venue_id),
+        ]
+        try:
+            peek = redis_client.register_script(PEEK_SCRIPT)
+            result = await peek(keys=keys, args=[window])
+            if int(result[0]) < 0:
+                await SeatManagementService.initialize_seats(redis_client, venue_id)
+                result = await peek(keys=keys, args=[window])
+            available, rest = int(result[0]), result[1:]
+            parties = [
+                {
+                    "_id": party_id,
+                    "party_size": int(size),
+                    "status": "waiting",
+                    "joined_at": float(joined_at),
+                }
+                for party_id, size, joined_at in zip(rest[::3], rest[1::3], rest[2::3])
+            ]
+            return available, parties
+        except Exception as e:
+            logger.error(f"Error reading queue of venue {venue_id}: {e}")
+            raise HTTPException(status_code=500, detail="Failed to read queue.")
+
+    @staticmethod
+    async def seat(
+        redis_client: Redis,
+        venue_id: str,
+        parties: List[Dict],
+        in_order: bool = False,
+    ) -> List[int]:
+        """
+        Atomically dequeue and reserve seats for the given parties, in order.
+        At a venue with tables each party must also get a table or group of
+        tables; with ``in_order`` no party is seated after one that did not.
+
+        Returns one status per party: SEATED, INSUFFICIENT_SEATS,
+        NOT_QUEUED when another pass already seated it, or ALREADY_SEATED
+        when it was queued again while holding a reservation (it is dropped
+        from the queue and keeps the seats it holds).
+        """
+        if not parties:
+            return []
+        keys = [
+            venue_key(AVAILABLE_SEATS_KEY, venue_id),
+            venue_key(SEAT_RESERVATIONS_KEY, venue_id),
+            *WaitlistQueueService._keys(venue_id),
+        ]
+        party_ids = [party["_id"] for party in parties]
+        try:
+            if has_tables(venue_id):
+                reserved, *statuses = await redis_client.register_script(
+                    SEAT_AT_TABLES_SCRIPT
+                )(
+                    keys=[
+                        *keys,
+                        *TableService.table_keys(venue_id),
+                        TableService.assignments_key(venue_id),
+                    ],
+                    args=[int(in_order), *party_ids],
+                )
+                reserved = int(reserved)
+                statuses = [int(status) for status in statuses]
+            else:
+                statuses = await redis_client.register_script(SEAT_SCRIPT)(
+                    keys=keys, args=party_ids
+                )
+                statuses = [int(status) for status in statuses]
+                reserved = sum(
+                    party["party_size"]
+                    for party, status in zip(parties, statuses)
+                    if status == WaitlistQueueService.SEATED
+                )
+            if reserved:
+                await durability_manager.record(
+                    redis_client, -reserved, venue_id=venue_id
+                )
+            return statuses
+        except Exception as e:
+            logger.error(f"Error seating {len(parties)} parties: {e}")
+            raise HTTPException(status_code=500, detail="Failed to seat parties.")
+
+    @staticmethod
+    async def reconcile(
+        redis_client: Redis,
+        collection,
+        from_log: bool = False,
+        fence: Optional[Callable[[], Awaitable[None]]] = None,
+    ) -> Dict[str, List[str]]:
+        """
+        Bring the mirror in line with MongoDB's waiting parties, or with
+        those of the state restored from the queue event log.
+
+        Waiting parties missing from the mirror are queued again, unless
+        they already hold seats (seated, but MongoDB was not updated), in
+        which case they are returned per venue for the caller to mark ready.
+        Mirror entries that MongoDB confirms are no longer waiting are
+        dropped. ``fence``, if given, is awaited before each venue's writes
+        and raises to stop the reconcile.
+        """
+        # Snapshot the mirror before reading MongoDB: a party is written to
+        # MongoDB before it is queued, so everything seen here is visible there
+        queued: Dict[str, List[str]] = {}
+        async for key in redis_client.scan_iter(match=f"{WAITLIST_QUEUE_KEY}*"):
+            venue_id = key.split(":", 1)[1] if ":" in key else settings.DEFAULT_VENUE_ID
+            queued[venue_id] = await redis_client.zrange(key, 0, -1)
+
+        if from_log:
+            state = await state_snapshotter.restore(redis_client, collection)
+            parties = active_parties(state)
+        else:
+            parties = await collection.find(
+                {"status": "waiting"},
+                {"venue_id": 1, "party_size": 1, "created_at": 1, "status": 1},
+            ).to_list(length=None)
+        waiting: Dict[str, List[Dict]] = {}
+        for party in parties:
+            if party["status"] != "waiting":
+                continue
+            venue_id = party.get("venue_id", settings.DEFAULT_VENUE_ID)
+            waiting.setdefault(venue_id, []).append(party)
+
+        to_mark_ready: Dict[str, List[str]] = {}
+        for venue_id in set(queued) | set(waiting):
+            in_mirror = set(queued.get(venue_id, []))
+            parties = waiting.get(venue_id, [])
+            waiting_ids = {party["_id"] for party in parties}
+
+            if fence is not None:
+                await fence()
+            reservations = venue_key(SEAT_RESERVATIONS_KEY, venue_id)
+            for party in parties:
+                if party["_id"] in in_mirror:
+                    continue
+                if await redis_client.hexists(reservations, party["_id"]):
+                    to_mark_ready.setdefault(venue_id, []).append(party["_id"])
+                else:
+                    await WaitlistQueueService.enqueue(
+                        redis_client, {**party, "venue_id": venue_id}
+                    )
+
+            stale = [party_id for party_id in in_mirror if party_id not in waiting_ids]
+            if stale and from_log:
+                # A join can be queued but missing from the log (a failed or
+                # interrupted publish), so only MongoDB can rule a party out
+                still_waiting = await collection.distinct(
+                    "_id", {"_id": {"$in": stale}, "status": "waiting"}
+                )
+                stale = [
+                    party_id for party_id in stale if party_id not in still_waiting
+                ]
+            await WaitlistQueueService.dequeue(redis_client, venue_id, stale)
+            if stale:
+                logger.warning(
+                    f"Dropped {len(stale)} stale parties from the queue of venue {venue_id}."
+                )
+        return to_mark_ready
@@ -2,15 +2,32 @@ from app.database import get_collection
 from app.redis_client import get_redis_client
 from app.config import settings
 from app.services.websocket_service import WebSocketService
-from app.services.seat_management_service import SeatManagementService
+from app.services.seat_management_service import SeatManagementService, largest_party
+from app.services.waitlist_queue_service import WaitlistQueueService
+from app.services.seating_policy import get_seating_policy
+from app.queue_advancer import queue_advancer
+from app.completion_scheduler import completion_scheduler
+from app.party_status_cache import party_status_cache
+from app.metrics import READINESS_CHECK_SECONDS
+from app.serialization import client_party
+from app.wait_time_estimator import wait_time_estimator
+from app.queue_feed import queue_feed
 from fastapi import HTTPException
-from datetime import datetime, timezone
-import asyncio
+from pymongo.errors import BulkWriteError
+from datetime import datetime, timedelta, timezone
 import logging
-from typing import Dict, Any
+import re
+import time
+import uuid
+from typing import Dict, Any, List, Tuple, Optional, Callable, Awaitable
 
 logger = logging.getLogger("WaitlistService")
 
+DUPLICATE_KEY_ERROR = 11000
+MAX_PARTY_SIZE = 10
+# Venue ids end up in Redis keys and archive export paths
+VENUE_ID_PATTERN = re.compile(r"[A-Za-z0-9_-]{1,64}")
+
 
 class WaitlistService:
     """
@@ -19,162 +36,428 @@ class WaitlistService:
     """
     
     @staticmethod
-    def validate_party_size(party_size: int) -> None:
+    def validate_party_size(
+        party_size: int, venue_id: str = settings.DEFAULT_VENUE_ID
+    ) -> None:
         """
-        Validate party size.
-        
+        Validate party size. A party larger than the venue's capacity, or at
+        a venue with tables than its largest table or group of tables, could
+        never be seated, and would hold up everyone behind it.
+
         Args:
             party_size: Number of people in party
+            venue_id: Venue the party joins
         Raises:
             HTTPException: If validation fails
         """
-        if party_size < 1 or party_size > 10:
+        limit = min(MAX_PARTY_SIZE, largest_party(venue_id))
+        if party_size < 1 or party_size > limit:
             raise HTTPException(
-                status_code=400,
-                detail="Party size must be between 1 and 10"
+                status_code=400, detail=f"Party size must be between 1 and {limit}"
             )
     
+    @staticmethod
+    def validate_venue_id(venue_id: str) -> None:
+        """
+        Validate a venue id: 1 to 64 letters, digits, underscores or dashes.
+
+        Raises:
+            HTTPException: If validation fails
+        """
+        if not isinstance(venue_id, str) or not VENUE_ID_PATTERN.fullmatch(venue_id):
+            raise HTTPException(
+                status_code=400,
+                detail="Venue id must be 1-64 letters, digits, '_' or '-'",
+            )
+
     @staticmethod
     async def get_party_status(user_id: str):
         """
         Retrieve the current status of a party in the waitlist by user_id.
         """
+        status, _ = await WaitlistService.get_party_status_with_etag(user_id)
+        return status
+
+    @staticmethod
+    async def get_party_status_with_etag(user_id: str) -> Tuple[Dict[str, Any], str]:
+        """
+        Retrieve a party's status and its ETag, reading through the status
+        cache before falling back to the database. Waiting parties also get
+        their current position and estimated ready time.
+        """
         try:
-            collection = await get_collection("waitlist")
-            party = await collection.find_one({"_id": user_id})
-            if not party:
-                return {"status": "na"}
+            redis_client = await get_redis_client()
+            cached = await party_status_cache.get(redis_client, user_id)
+            if cached is None:
+                generation = await party_status_cache.generation(redis_client, user_id)
+                collection = await get_collection("waitlist")
+                party = await collection.find_one({"_id": user_id})
+                status = {"status": party["status"], "party": client_party(party)} if party else {"status": "na"}
+                etag = await party_status_cache.set(redis_client, user_id, status, generation)
+            else:
+                status, etag = cached
 
-            return {"status": party["status"], "party": party}
+            if status["status"] == "waiting":
+                estimate = wait_time_estimator.estimate(user_id)
+                if estimate is not None:
+                    status = {**status, "wait": estimate}
+                    etag = party_status_cache.make_etag(status)
+            return status, etag
 
         except Exception as e:
             logger.error(f"Error retrieving party status for user {user_id}: {e}")
             raise HTTPException(status_code=500, detail="Internal server error")
 
     @staticmethod
-    async def add_to_waitlist(name: str, party_size: int, user_id: str) -> Dict[str, Any]:
-        """Add a new entry to the waitlist."""
+    async def add_to_waitlist(
+        name: str, party_size: int, user_id: str, venue_id: str = settings.DEFAULT_VENUE_ID
+    ) -> Dict[str, Any]:
+        """Add a new entry to a venue's waitlist."""
         
-        # Validate party size
-        WaitlistService.validate_party_size(party_size)
+        # Validate venue and party size
+        WaitlistService.validate_venue_id(venue_id)
+        WaitlistService.validate_party_size(party_size, venue_id)
         
         try:
             collection = await get_collection("waitlist")
             new_party = {
                 "_id": user_id,
+                "venue_id": venue_id,
                 "name": name.strip(),
                 "party_size": party_size,
                 "status": "waiting",
                 "created_at": datetime.now(timezone.utc).isoformat(),
             }
             await collection.insert_one(new_party)
-            logger.info(f"Party added to waitlist: {new_party['name']} ({new_party['party_size']} people)")
+            redis_client = await get_redis_client()
+            await WaitlistQueueService.enqueue(redis_client, new_party)
+            await party_status_cache.invalidate(redis_client, user_id)
+            await queue_feed.publish(redis_client, venue_id, "joined", [new_party])
+            logger.info("Party added to waitlist of venue %s: %s (%s people)", venue_id, new_party["name"], party_size,
+                        extra={"event": "party_joined", "venue_id": venue_id, "party_id": user_id})
 
             return {"message": "Party added to the waitlist.", "party": new_party}
         except Exception as e:
             logger.error(f"Error adding party to waitlist: {e}")
             raise HTTPException(status_code=500, detail="Internal server error")
         finally:
-            # Trigger readiness check outside of scheduler for immediate feedback
-            await WaitlistService.check_queue_readiness()
+            # Advance the queue right away for immediate feedback
+            await queue_advancer.advance(venue_id, "party_joined")
             
 
     @staticmethod
-    async def check_queue_readiness():
+    def validate_bulk_party(
+        party: Any, venue_id: str = settings.DEFAULT_VENUE_ID
+    ) -> None:
         """
-        Check the waitlist queue for the next party that can be seated.
-        If seats are available, notify the party and mark them as ready.
+        Validate one entry of a bulk request, joining ``venue_id`` unless it
+        names its own venue.
+
+        Raises:
+            HTTPException: If validation fails
         """
-        redis_client = await get_redis_client()
-        lock_acquired = await SeatManagementService.acquire_seats_lock(redis_client)
-        if not lock_acquired:
-            logger.info("Another process is already handling the readiness check.")
-            return
-        
+        if not isinstance(party, dict):
+            raise HTTPException(status_code=400, detail="Party must be an object")
+        for field in ("name", "user_id"):
+            if not isinstance(party.get(field), str) or not party[field].strip():
+                raise HTTPException(status_code=400, detail=f"Party {field} is required")
+        if not isinstance(party.get("venue_id", ""), str):
+            raise HTTPException(status_code=400, detail="Party venue_id must be a string")
+        if party.get("venue_id"):
+            WaitlistService.validate_venue_id(party["venue_id"])
+        party_size = party.get("party_size")
+        if not isinstance(party_size, int) or isinstance(party_size, bool):
+            raise HTTPException(status_code=400, detail="Party size must be an integer")
+        WaitlistService.validate_party_size(
+            party_size, party.get("venue_id") or venue_id
+        )
+
+    @staticmethod
+    async def add_parties_to_waitlist(
+        parties: List[Any], venue_id: str = settings.DEFAULT_VENUE_ID
+    ) -> Dict[str, Any]:
+        """
+        Add a batch of parties to the waitlist.
+
+        Valid parties are written with one unordered insert, so a duplicate
+        does not stop the rest of the batch. Each party gets a result, in
+        request order: "added", "duplicate" if its user_id is already on the
+        waitlist, or "invalid"/"failed" with the reason. Each venue's queue
+        is advanced once for the whole batch.
+        """
+        if len(parties) > settings.BULK_INGEST_MAX_PARTIES:
+            raise HTTPException(
+                status_code=413,
+                detail=f"At most {settings.BULK_INGEST_MAX_PARTIES} parties per request"
+            )
+        WaitlistService.validate_venue_id(venue_id)
+
+        results: List[Dict[str, Any]] = []
+        new_parties, positions = [], []
+        # Consecutive timestamps keep the batch in request order in the queue
+        joined_at = datetime.now(timezone.utc)
+        for position, party in enumerate(parties):
+            try:
+                WaitlistService.validate_bulk_party(party, venue_id)
+            except HTTPException as e:
+                user_id = party.get("user_id") if isinstance(party, dict) else None
+                results.append({"user_id": user_id, "status": "invalid", "detail": e.detail})
+                continue
+            results.append({"user_id": party["user_id"], "status": "added"})
+            positions.append(position)
+            new_parties.append({
+                "_id": party["user_id"],
+                "venue_id": party.get("venue_id") or venue_id,
+                "name": party["name"].strip(),
+                "party_size": party["party_size"],
+                "status": "waiting",
+                "created_at": (joined_at + timedelta(microseconds=len(new_parties))).isoformat(),
+            })
+
+        failed = set()
+        try:
+            if new_parties:
+                collection = await get_collection("waitlist")
+                try:
+                    await collection.insert_many(new_parties, ordered=False)
+                except BulkWriteError as e:
+                    for error in e.details.get("writeErrors", []):
+                        failed.add(error["index"])
+                        result = results[positions[error["index"]]]
+                        if error.get("code") == DUPLICATE_KEY_ERROR:
+                            result.update(status="duplicate", detail="Party is already on the waitlist")
+                        else:
+                            result.update(status="failed", detail=error.get("errmsg", "Insert failed"))
+            added = [party for index, party in enumerate(new_parties) if index not in failed]
+
+            if added:
+                redis_client = await get_redis_client()
+                await WaitlistQueueService.enqueue_many(redis_client, added)
+                await party_status_cache.invalidate(redis_client, *(party["_id"] for party in added))
+                by_venue: Dict[str, List[Dict]] = {}
+                for party in added:
+                    by_venue.setdefault(party["venue_id"], []).append(party)
+                for party_venue_id, venue_parties in by_venue.items():
+                    await queue_feed.publish(redis_client, party_venue_id, "joined", venue_parties)
+            logger.info("Bulk add of %s parties: %s added.", len(parties), len(added),
+                        extra={"event": "parties_joined"})
+        except Exception as e:
+            logger.error(f"Error adding {len(new_parties)} parties to waitlist: {e}")
+            raise HTTPException(status_code=500, detail="Internal server error")
+        finally:
+            # One evaluation per venue for the whole batch
+            venue_ids = {party["venue_id"] for index, party in enumerate(new_parties) if index not in failed}
+            await queue_advancer.advance_all(sorted(venue_ids), "parties_joined")
+
+        counts = {"added": 0, "duplicate": 0, "invalid": 0, "failed": 0}
+        for result in results:
+            counts[result["status"]] += 1
+        return {"message": f"{counts['added']} parties added to the waitlist.", **counts, "results": results}
+
+    @staticmethod
+    async def check_queue_readiness(venue_id: str = settings.DEFAULT_VENUE_ID) -> int:
+        """
+        Run one seating pass over a venue's waitlist queue.
+
+        Reads the free seats and a window of the oldest waiting parties from
+        the Redis queue mirror in one round trip, lets the configured seating
+        policy choose who fits, then dequeues them and reserves their seats
+        in one atomic script. MongoDB is updated afterwards, outside the
+        decision. Returns the number of parties marked ready.
+
+        Concurrent passes need no lock: a party can only be dequeued once,
+        so only the pass that seats it marks it ready and notifies it.
+        """
+        started = time.perf_counter()
         try:
-            collection = await get_collection("waitlist")
             redis_client = await get_redis_client()
-            available_seats = await SeatManagementService.get_available_seats(redis_client)
-            logger.info(f"Available seats: {available_seats}")
-            
-            next_party = await collection.find_one({"status": "waiting"}, sort=[("created_at", 1)])
-            if not next_party:
-                logger.info("No parties waiting in queue.")
-                return
-                
-            logger.info(f"Next party in queue: {next_party['_id']} (size: {next_party['party_size']})")
-            
-            if available_seats < next_party["party_size"]:
-                logger.info(f"Insufficient seats for party {next_party['_id']}. Required: {next_party['party_size']}, Available: {available_seats}")
-                await WebSocketService.notify_party_status(next_party["_id"], next_party, "waiting")
-                return
-            
-            # Mark the party as ready and notify
-            updated_party = await collection.find_one_and_update(
-                {"_id": next_party["_id"]},
-                {"$set": {"status": "ready"}},
-                return_document=True
+            available_seats, waiting = await WaitlistQueueService.peek(
+                redis_client, venue_id, settings.SEATING_WINDOW
             )
-            await SeatManagementService.decrement_available_seats(redis_client, next_party["party_size"])
-            await WebSocketService.notify_party_status(next_party["_id"], updated_party, "ready")
-            logger.info(f"Party {next_party['_id']} marked as ready and notified.")
-            
+            logger.info("Available seats at venue %s: %s", venue_id, available_seats,
+                        extra={"event": "readiness_tick", "venue_id": venue_id})
+            if not waiting:
+                logger.info("No parties waiting in queue at venue %s.", venue_id,
+                            extra={"event": "readiness_tick", "venue_id": venue_id})
+                return 0
+
+            policy = get_seating_policy(settings.SEATING_POLICY, settings.SEATING_MAX_SKIPS,
+                                        settings.SEATING_MAX_SKIP_WAIT_SECONDS)
+            chosen = policy.select(waiting, available_seats, time.time())
+            if not chosen:
+                head = waiting[0]
+                logger.info("Insufficient seats for party %s. Required: %s, Available: %s",
+                            head['_id'], head['party_size'], available_seats,
+                            extra={"event": "readiness_tick", "venue_id": venue_id})
+                await WebSocketService.notify_party_status(head["_id"], head, "waiting")
+                return 0
+
+            statuses = await WaitlistQueueService.seat(
+                redis_client, venue_id, chosen, in_order=settings.SEATING_POLICY == "fifo"
+            )
+            seated = [
+                party["_id"] for party, status in zip(chosen, statuses)
+                if status == WaitlistQueueService.SEATED
+            ]
+            if not seated:
+                return 0
+
+            ready_parties = await WaitlistService.mark_ready(venue_id, seated)
+            logger.info("Marked %s parties at venue %s as ready and notified.", len(ready_parties), venue_id,
+                        extra={"event": "readiness_tick", "venue_id": venue_id})
+            return len(seated)
+
         except Exception as e:
-            logger.error(f"Error during readiness check: {str(e)}", exc_info=True)
+            logger.error(f"Error during readiness check for venue {venue_id}: {str(e)}", exc_info=True)
             raise HTTPException(status_code=500, detail="Failed to check queue readiness")
         finally:
-            await SeatManagementService.release_seats_lock(redis_client)
+            READINESS_CHECK_SECONDS.observe(time.perf_counter() - started)
+
+    @staticmethod
+    async def mark_ready(venue_id: str, party_ids: List[str]) -> List[Dict]:
+        """
+        Record seated parties as ready in MongoDB and notify them.
+        Only parties this call moves out of ``waiting`` are notified.
+        """
+        collection = await get_collection("waitlist")
+        redis_client = await get_redis_client()
+
+        # Tag the update so only this call's parties are read back
+        pass_id = uuid.uuid4().hex
+        await collection.update_many(
+            {"_id": {"$in": party_ids}, "status": "waiting"},
+            {"$set": {"status": "ready", "seating_pass": pass_id, "ready_at": datetime.now(timezone.utc).isoformat()}},
+        )
+        ready_parties = await collection.find(
+            {"_id": {"$in": party_ids}, "seating_pass": pass_id}
+        ).to_list(length=len(party_ids))
+        if not ready_parties:
+            return []
+
+        await party_status_cache.invalidate(redis_client, *(party["_id"] for party in ready_parties))
+        await queue_feed.publish(redis_client, venue_id, "ready", ready_parties)
+        await WebSocketService.notify_parties(ready_parties, "ready")
+        return ready_parties
+
+    @staticmethod
+    async def reconcile_queues(from_log: bool = False, fence: Optional[Callable[[], Awaitable[None]]] = None) -> None:
+        """
+        Repair differences between the queue mirror and MongoDB, such as
+        parties seated just before a crash but never marked ready. With
+        ``from_log``, waiting parties come from the queue event log instead
+        of a collection scan. ``fence``, if given, is awaited before each
+        phase of writes and raises to stop the repair.
+        """
+        collection = await get_collection("waitlist")
+        redis_client = await get_redis_client()
+        to_mark_ready = await WaitlistQueueService.reconcile(redis_client, collection, from_log, fence)
+        for venue_id, party_ids in to_mark_ready.items():
+            if fence is not None:
+                await fence()
+            ready_parties = await WaitlistService.mark_ready(venue_id, party_ids)
+            logger.warning(f"Marked {len(ready_parties)} seated parties at venue {venue_id} as ready.")
 
     @staticmethod
     async def check_in_party(user_id: str):
         """
-        Check in a party, update seats, and start the service.
+        Check in a party that has been marked ready and schedule the end of
+        its service. A party still waiting is refused: it is still in the
+        queue mirror, and a later seating pass would hold seats for it that
+        nothing releases.
+
+        Raises:
+            HTTPException: 404 if the party is unknown, 409 if it is not ready
         """
         redis_client = await get_redis_client()
         collection = await get_collection("waitlist")
         try:
             updated_party = await collection.find_one_and_update(
-            {"_id": user_id},
+            {"_id": user_id, "status": "ready"},
             {"$set": {"status": "checked_in", "started_at": datetime.now(timezone.utc).isoformat()}}, return_document=True)
+            if updated_party is None:
+                party = await collection.find_one({"_id": user_id}, {"status": 1})
+                if party is None:
+                    raise HTTPException(status_code=404, detail="Party not found")
+                raise HTTPException(
+                    status_code=409,
+                    detail=f"Party cannot check in while {party['status']}",
+                )
+            due_at = time.time() + settings.SERVICE_TIME_PER_PERSON * updated_party["party_size"]
+            await completion_scheduler.schedule(redis_client, user_id, due_at)
+            await party_status_cache.invalidate(redis_client, user_id)
+            await queue_feed.publish(redis_client, updated_party.get("venue_id", settings.DEFAULT_VENUE_ID), "checked_in", [updated_party])
             await WebSocketService.notify_party_status(user_id,updated_party,"checked_in")
             return {"message": "Party checked in successfully"}
         
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Error during check-in for party {user_id}: {e}")
             raise HTTPException(status_code=500, detail="Internal server error")
-        finally:
-            asyncio.create_task(WaitlistService.simulate_service(collection, redis_client, updated_party))
 
     @staticmethod
-    async def simulate_service(collection, redis_client, party: dict):
+    async def complete_service(collection, redis_client, party_id: str):
         """
-        Simulate the service process and update the party's status after completion.
+        Mark a checked-in party's service as completed and return its seats.
+        Safe to repeat: a party that is already completed is not notified
+        again and its seats are only released once.
         """
-        logger.info(f"Simulating service for party {party['_id']} ({party['party_size']} people).")
         try:
-            # Simulate service duration
-            await asyncio.sleep(settings.SERVICE_TIME_PER_PERSON * party["party_size"])
-
             # Mark the party as completed
-            updated_party = await collection.find_one_and_update({"_id": party["_id"]}, {"$set": {"status": "completed", "completed_at": datetime.now(timezone.utc).isoformat()}}, return_document=True)
-            await WebSocketService.notify_party_status(party["_id"], updated_party, "completed")
-            
-            logger.info(f"Party {party['_id']} service completed.")
+            updated_party = await collection.find_one_and_update({"_id": party_id, "status": "checked_in"}, {"$set": {"status": "completed", "completed_at": datetime.now(timezone.utc).isoformat()}}, return_document=True)
+            if updated_party:
+                await party_status_cache.invalidate(redis_client, party_id)
+                await WebSocketService.notify_party_status(party_id, updated_party, "completed")
+                logger.info(f"Party {party_id} service completed.")
+                party = updated_party
+            else:
+                party = await collection.find_one({"_id": party_id}, {"venue_id": 1}) or {}
+            venue_id = party.get("venue_id", settings.DEFAULT_VENUE_ID)
 
-            lock_acquired = await SeatManagementService.acquire_seats_lock(redis_client)
-            if not lock_acquired:
-                logger.error("Failed to acquire lock during simulate_service for seat update.")
-                raise HTTPException(status_code=429, detail="Seats are being updated. Try again shortly.")
-            
-            await SeatManagementService.increment_available_seats(redis_client, party["party_size"])
-            logger.info(f"Seats updated after party {party['_id']} service.")
+            released = await SeatManagementService.release_seats(redis_client, party_id, venue_id)
+            if updated_party:
+                await queue_feed.publish(redis_client, venue_id, "completed", [updated_party])
+            elif released:
+                await queue_feed.publish(redis_client, venue_id, "seats")
+            if released:
+                logger.info(f"Seats updated after party {party_id} service.")
+                queue_advancer.notify(venue_id, "service_completed")
        
         except Exception as e:
-            logger.error(f"Error during simulate_service for party {party['_id']}: {e}")
+            logger.error(f"Error completing service for party {party_id}: {e}")
             raise HTTPException(status_code=500, detail="Internal server error")
-        
-        finally:
-            await SeatManagementService.release_seats_lock(redis_client)
 
-        
+    @staticmethod
+    async def get_waiting_venues() -> List[str]:
+        """
+        List the venues that currently have parties waiting.
+        """
+        collection = await get_collection("waitlist")
+        return await collection.distinct("venue_id", {"status": "waiting"})
 
+    @staticmethod
+    async def get_queue_depths() -> Dict[Tuple[str, str], int]:
+        """
+        Count active parties per (venue, status) in one aggregation. Venues
+        with any active party report zero for their other statuses.
+        """
+        statuses = ("waiting", "ready", "checked_in")
+        collection = await get_collection("waitlist")
+        counts = await collection.aggregate(
+            [
+                {"$match": {"status": {"$in": list(statuses)}}},
+                {
+                    "$group": {
+                        "_id": {"venue_id": "$venue_id", "status": "$status"},
+                        "count": {"$sum": 1},
+                    }
+                },
+            ]
+        ).to_list(length=None)
+        depths = {}
+        for venue_id in {count["_id"]["venue_id"] for count in counts}:
+            for status in statuses:
+                depths[(venue_id, status)] = 0
+        for count in counts:
+            depths[(count["_id"]["venue_id"], count["_id"]["status"])] = count["count"]
+        return depths
@@ -1,5 +1,6 @@
 from app.websocket_manager import websocket_manager
-from typing import Dict
+from app.serialization import party_message
+from typing import Dict, List, Tuple
 
 import logging
 
@@ -17,8 +18,13 @@ class WebSocketService:
         Notify a specific party of their waitlist status.
         """
         try:
-            message = {"status": status, "party": party}
-            logger.info(f"Notifying party {user_id}. Status: {status}")
+            message = party_message(party, status)
+            logger.info(
+                "Notifying party %s. Status: %s",
+                user_id,
+                status,
+                extra={"event": "notification"},
+            )
 
             from app.main import sio
 
@@ -28,3 +34,51 @@ class WebSocketService:
 
         except Exception as e:
             logger.error(f"Failed to notify party {user_id}: {e}")
+
+    @staticmethod
+    async def notify_parties(parties: List[Dict], status: str):
+        """
+        Notify several parties of the same status change in one batch.
+        """
+        try:
+            messages = {party["_id"]: party_message(party, status) for party in parties}
+            logger.info(
+                "Notifying %s parties. Status: %s",
+                len(messages),
+                status,
+                extra={"event": "notification"},
+            )
+
+            from app.main import sio
+
+            await websocket_manager.send_to_users(sio=sio, messages=messages)
+
+        except Exception as e:
+            logger.error(f"Failed to notify {len(parties)} parties: {e}")
+
+    @staticmethod
+    async def notify_wait_times(updates: List[Tuple[Dict, Dict]]):
+        """
+        Send waiting parties connected to this worker their updated position
+        and estimated ready time. Every worker holds the same estimates, so
+        they are not fanned out.
+        """
+        try:
+            messages = {
+                party["_id"]: {**party_message(party, "waiting"), "wait": estimate}
+                for party, estimate in updates
+            }
+            logger.info(
+                "Pushing wait times to %s parties.",
+                len(messages),
+                extra={"event": "notification"},
+            )
+
+            from app.main import sio
+
+            await websocket_manager.send_to_users(
+                sio=sio, messages=messages, fanout=False
+            )
+
+        except Exception as e:
+            logger.error(f"Failed to push wait times to {len(updates)} parties: {e}")
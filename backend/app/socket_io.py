@@ -1,5 +1,10 @@
 from app.websocket_manager import websocket_manager
+from app.queue_feed import ADMIN_NAMESPACE, queue_feed
+from app.config import settings
+from app.database import db_manager
+from app.redis_client import get_redis_client
 from urllib.parse import parse_qs
+import hmac
 import logging
 
 logger = logging.getLogger("SocketIO")
@@ -21,14 +26,50 @@ async def setup_socketio_events(sio):
             logger.error("Connection rejected: Missing user_id in query params.")
             return False
 
-        logger.info(f"Socket.IO client connected: SID={sid}, User ID={user_id}")
+        logger.info("Socket.IO client connected: SID=%s, User ID=%s", sid, user_id)
         await websocket_manager.save_user_connection(sio, sid, user_id)
 
     @sio.event
     async def disconnect(sid):
-        logger.info(f"Socket.IO client disconnected: SID={sid}")
+        logger.info("Socket.IO client disconnected: SID=%s", sid)
         await websocket_manager.remove_user_connection(sio, sid)
 
     @sio.event
     async def user_message(sid, data):
-        logger.info(f"Message from SID={sid}: {data}")
+        logger.debug("Message from SID=%s: %s", sid, data)
+
+    @sio.on("connect", namespace=ADMIN_NAMESPACE)
+    async def admin_connect(sid, environ, auth=None):
+        if not settings.ADMIN_FEED_TOKEN:
+            logger.warning(
+                "Admin connection rejected: no token configured. SID=%s", sid
+            )
+            return False
+        token = (auth or {}).get("token", "") if isinstance(auth, dict) else ""
+        if not hmac.compare_digest(str(token), settings.ADMIN_FEED_TOKEN):
+            logger.warning("Admin connection rejected: bad token. SID=%s", sid)
+            return False
+        logger.info("Admin client connected: SID=%s", sid)
+
+    @sio.on("disconnect", namespace=ADMIN_NAMESPACE)
+    async def admin_disconnect(sid):
+        logger.info("Admin client disconnected: SID=%s", sid)
+        queue_feed.unsubscribe(sid)
+
+    @sio.on("subscribe", namespace=ADMIN_NAMESPACE)
+    async def admin_subscribe(sid, data=None):
+        """
+        Follow a venue's queue: ``{"venue_id": ..., "since": <seq>}``, with
+        ``since`` set to resume after a reconnect.
+        """
+        data = data if isinstance(data, dict) else {}
+        venue_id = data.get("venue_id") or settings.DEFAULT_VENUE_ID
+        logger.info("Admin SID=%s following venue %s", sid, venue_id)
+        await queue_feed.subscribe(
+            sio,
+            sid,
+            await get_redis_client(),
+            db_manager.get_collection("waitlist"),
+            venue_id,
+            since=data.get("since"),
+        )
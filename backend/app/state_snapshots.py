@@ -0,0 +1,152 @@
+from redis.asyncio import Redis
+from app.config import settings
+from app.queue_feed import QUEUE_EVENTS_KEY, QUEUE_EVENTS_SEQ_KEY, entry_seq, queue_feed
+from app.serialization import dumps, loads
+from app.services.seat_management_service import AVAILABLE_SEATS_KEY, venue_key
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+import logging
+
+logger = logging.getLogger("StateSnapshots")
+
+# Latest compact snapshot of every venue's active parties and free seats
+QUEUE_STATE_SNAPSHOT_KEY = "queue_state_snapshot"
+
+ACTIVE_STATUSES = ("waiting", "ready", "checked_in")
+
+
+def empty_state(seq: int = 0) -> Dict:
+    return {"seq": seq, "venues": {}}
+
+
+def apply_entries(state: Dict, entries: List) -> Dict:
+    """
+    Apply queue event log entries (from the queue feed stream) to a state,
+    in place. Entries at or before the state's sequence number are skipped,
+    and replaying a change the state already reflects leaves it unchanged.
+    """
+    for entry_id, fields in entries:
+        seq = entry_seq(entry_id)
+        if seq <= state["seq"]:
+            continue
+        state["seq"] = seq
+        venue = state["venues"].setdefault(
+            fields["venue"], {"available_seats": 0, "parties": {}}
+        )
+        venue["available_seats"] = int(fields["seats"])
+        event = loads(fields["event"])
+        party = event.get("party")
+        if party is None:
+            continue
+        if event["type"] == "completed":
+            venue["parties"].pop(party["_id"], None)
+        elif event["type"] == "joined":
+            venue["parties"][party["_id"]] = party
+        else:
+            venue["parties"][party["_id"]] = {
+                **venue["parties"].get(party["_id"], {}),
+                **party,
+            }
+    return state
+
+
+def active_parties(state: Dict) -> List[Dict]:
+    """
+    Active parties of every venue, oldest first, as waitlist documents.
+    """
+    parties = [
+        {**party, "venue_id": venue_id}
+        for venue_id, venue in state["venues"].items()
+        for party in venue["parties"].values()
+    ]
+    parties.sort(key=lambda party: party.get("created_at", ""))
+    return parties
+
+
+class StateSnapshotter:
+    """
+    Compact snapshots of queue and seat state over the queue event log.
+
+    Every transition (joined, ready, checked_in, completed) and seat change
+    is already appended, in order, to the queue feed's Redis stream. The
+    leader periodically snapshots the active parties and free seats as of a
+    sequence number, so the stream only needs to keep the tail after it.
+    Startup and followers rebuild their state from the snapshot plus that
+    tail, and only read MongoDB when there is no snapshot yet or the tail
+    was trimmed.
+
+    Snapshots are read from MongoDB, the source of truth, rather than folded
+    from the log: an event lost in a crash then skews restored state until
+    the next snapshot at most.
+    """
+
+    async def load(self, redis_client: Redis) -> Optional[Dict]:
+        """
+        The latest snapshot brought up to date with the event log, or None
+        if the log no longer covers the changes since the snapshot.
+        """
+        raw = await redis_client.get(QUEUE_STATE_SNAPSHOT_KEY)
+        if raw is None:
+            return None
+        state = loads(raw)
+        if not await queue_feed.can_resume(redis_client, state["seq"]):
+            logger.warning(f"Queue event log was trimmed past snapshot {state['seq']}.")
+            return None
+        while True:
+            entries = await redis_client.xrange(
+                QUEUE_EVENTS_KEY, min=f"{state['seq'] + 1}-0", count=500
+            )
+            if not entries:
+                return state
+            apply_entries(state, entries)
+
+    async def read_database(self, redis_client: Redis, collection) -> Dict:
+        """
+        Build the state from MongoDB, as of the returned sequence number.
+        """
+        # Read the sequence first: changes after it may already be reflected,
+        # and replaying them is harmless
+        state = empty_state(int(await redis_client.get(QUEUE_EVENTS_SEQ_KEY) or 0))
+        async for party in collection.find(
+            {"status": {"$in": list(ACTIVE_STATUSES)}}, sort=[("created_at", 1)]
+        ):
+            venue_id = party.get("venue_id", settings.DEFAULT_VENUE_ID)
+            venue = state["venues"].setdefault(
+                venue_id, {"available_seats": 0, "parties": {}}
+            )
+            venue["parties"][party["_id"]] = {
+                field: value
+                for field, value in party.items()
+                if field not in ("venue_id", "seating_pass")
+            }
+        for venue_id, venue in state["venues"].items():
+            seats = await redis_client.get(venue_key(AVAILABLE_SEATS_KEY, venue_id))
+            venue["available_seats"] = int(seats or 0)
+        return state
+
+    async def restore(self, redis_client: Redis, collection) -> Dict:
+        """
+        Current state from the snapshot and event log, falling back to
+        MongoDB.
+        """
+        try:
+            state = await self.load(redis_client)
+            if state is not None:
+                return state
+        except Exception as e:
+            logger.error(f"Failed to restore queue state from the event log: {e}")
+        logger.info("Rebuilding queue state from MongoDB.")
+        return await self.read_database(redis_client, collection)
+
+    async def take(self, redis_client: Redis, collection) -> Dict:
+        """
+        Write a new snapshot of the current state.
+        """
+        state = await self.read_database(redis_client, collection)
+        state["taken_at"] = datetime.now(timezone.utc).isoformat()
+        await redis_client.set(QUEUE_STATE_SNAPSHOT_KEY, dumps(state))
+        logger.info(f"Queue state snapshot taken at sequence {state['seq']}.")
+        return state
+
+
+state_snapshotter = StateSnapshotter()
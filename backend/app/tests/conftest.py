@@ -1,6 +1,9 @@
 import pytest
 import asyncio
+import fakeredis
 from app.database import db_manager
+from app.services.seat_management_service import SeatManagementService
+from app.services.waitlist_queue_service import WaitlistQueueService
 from unittest.mock import AsyncMock, patch
 from dotenv import load_dotenv
 
@@ -22,6 +25,17 @@ async def initialize_database():
     await db_manager.close()
 
 
+@pytest.fixture
+async def fake_redis():
+    """
+    In-memory Redis that runs Lua scripts, so scripts can be tested end to
+    end rather than through a mocked ``register_script``.
+    """
+    redis_client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    yield redis_client
+    await redis_client.aclose()
+
+
 @pytest.fixture(scope="function")
 async def mock_db():
     db = db_manager._db
@@ -31,9 +45,48 @@ async def mock_db():
     await waitlist_collection.delete_many({})
 
 
+async def peek_waiting(redis_client, venue_id, window):
+    """
+    Stand-in for the Redis queue mirror that reads waiting parties from
+    MongoDB and free seats from SeatManagementService.get_available_seats.
+    """
+    parties = await (
+        db_manager.get_collection("waitlist")
+        .find({"venue_id": venue_id, "status": "waiting"}, sort=[("created_at", 1)])
+        .to_list(length=window)
+    )
+    available = await SeatManagementService.get_available_seats(redis_client, venue_id)
+    return available, [
+        {"_id": party["_id"], "party_size": party["party_size"], "status": "waiting"}
+        for party in parties
+    ]
+
+
 @pytest.fixture
 async def patch_dependencies():
     with (
+        patch(
+            "app.services.waitlist_queue_service.WaitlistQueueService.enqueue",
+            new_callable=AsyncMock,
+        ) as mock_enqueue,
+        patch(
+            "app.services.waitlist_queue_service.WaitlistQueueService.enqueue_many",
+            new_callable=AsyncMock,
+        ) as mock_enqueue_many,
+        patch(
+            "app.queue_feed.queue_feed.publish", new_callable=AsyncMock
+        ) as mock_publish_event,
+        patch(
+            "app.services.waitlist_queue_service.WaitlistQueueService.peek",
+            side_effect=peek_waiting,
+        ),
+        patch(
+            "app.services.waitlist_queue_service.WaitlistQueueService.seat",
+            side_effect=lambda redis_client, venue_id, parties, in_order=False: [
+                WaitlistQueueService.SEATED for _ in parties
+            ],
+            new_callable=AsyncMock,
+        ) as mock_seat,
         patch(
             "app.redis_client.get_redis_client", new_callable=AsyncMock
         ) as mock_get_redis_client,
@@ -41,6 +94,10 @@ async def patch_dependencies():
             "app.services.websocket_service.WebSocketService.notify_party_status",
             new_callable=AsyncMock,
         ) as mock_notify_party_status,
+        patch(
+            "app.services.websocket_service.WebSocketService.notify_parties",
+            new_callable=AsyncMock,
+        ) as mock_notify_parties,
         patch(
             "app.services.seat_management_service.SeatManagementService.acquire_seats_lock",
             return_value=True,
@@ -58,22 +115,46 @@ async def patch_dependencies():
             "app.services.seat_management_service.SeatManagementService.increment_available_seats",
             new_callable=AsyncMock,
         ) as mock_increment_seats,
-    ):
-
-        mock_get_available_seats = AsyncMock(return_value=10)
+        patch(
+            "app.services.seat_management_service.SeatManagementService.reserve_seats",
+            return_value=(SeatManagementService.RESERVED, 6),
+            new_callable=AsyncMock,
+        ) as mock_reserve_seats,
+        patch(
+            "app.services.seat_management_service.SeatManagementService.release_seats",
+            new_callable=AsyncMock,
+        ) as mock_release_seats,
+        patch(
+            "app.services.seat_management_service.SeatManagementService.reserve_parties",
+            side_effect=lambda redis_client, parties, venue_id="default": [
+                SeatManagementService.RESERVED for _ in parties
+            ],
+            new_callable=AsyncMock,
+        ) as mock_reserve_parties,
         patch(
             "app.services.seat_management_service.SeatManagementService.get_available_seats",
-            mock_get_available_seats,
-        )
+            return_value=10,
+            new_callable=AsyncMock,
+        ) as mock_get_available_seats,
+    ):
+
         mock_redis_client = mock_get_redis_client.return_value
         mock_redis_client.get.return_value = 10  # Mock available seats
 
         yield {
             "redis_client": mock_redis_client,
+            "enqueue": mock_enqueue,
+            "enqueue_many": mock_enqueue_many,
+            "publish_event": mock_publish_event,
+            "seat": mock_seat,
             "notify_party_status": mock_notify_party_status,
+            "notify_parties": mock_notify_parties,
             "acquire_lock": mock_acquire_lock,
             "release_lock": mock_release_lock,
             "increment_seats": mock_increment_seats,
             "decrement_seats": mock_decrement_seats,
+            "reserve_seats": mock_reserve_seats,
+            "reserve_parties": mock_reserve_parties,
+            "release_seats": mock_release_seats,
             "get_available_seats": mock_get_available_seats,
         }
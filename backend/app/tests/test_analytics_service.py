@@ -0,0 +1,160 @@
+import pytest
+from app.queue_feed import QUEUE_EVENTS_KEY
+from app.serialization import dumps
+from app.services.analytics_service import (
+    ANALYTICS_CURSOR_KEY,
+    ANALYTICS_PENDING_KEY,
+    AnalyticsService,
+)
+from datetime import datetime, timezone
+from pymongo.errors import BulkWriteError
+from unittest.mock import AsyncMock, MagicMock, patch
+
+MINUTE = datetime(2024, 1, 1, 19, 5, tzinfo=timezone.utc)
+
+
+def make_entry(seq, event_type, party, venue_id="default"):
+    event = {"type": event_type, "party": party}
+    return f"{seq}-0", {"venue": venue_id, "seats": "4", "event": dumps(event)}
+
+
+def party(**times):
+    return {"_id": "test_user_1", "party_size": 2, **times}
+
+
+def test_rollup_counts_events_at_their_minute():
+    entries = [
+        make_entry(1, "joined", party(created_at="2024-01-01T19:00:30+00:00")),
+        make_entry(
+            2,
+            "ready",
+            party(
+                created_at="2024-01-01T19:00:30+00:00",
+                ready_at="2024-01-01T19:05:30+00:00",
+            ),
+        ),
+        make_entry(
+            3,
+            "completed",
+            party(
+                ready_at="2024-01-01T19:05:30+00:00",
+                completed_at="2024-01-01T19:05:50+00:00",
+            ),
+        ),
+        make_entry(4, "seats", None),
+    ]
+
+    buckets = AnalyticsService.rollup(entries)
+
+    assert buckets == {
+        ("default", datetime(2024, 1, 1, 19, 0, tzinfo=timezone.utc)): {"joined": 1},
+        ("default", MINUTE): {
+            "seated": 1,
+            "by_size.2.seated": 1,
+            "by_size.2.wait_seconds": 300.0,
+            "completed": 1,
+            "seat_seconds": 40.0,
+        },
+    }
+
+
+@pytest.mark.asyncio
+async def test_apply_upserts_buckets_guarded_by_sequence():
+    collection = MagicMock()
+    collection.bulk_write = AsyncMock()
+    entries = [
+        make_entry(7, "joined", party(created_at="2024-01-01T19:05:00+00:00")),
+        make_entry(8, "joined", party(created_at="2024-01-01T19:05:10+00:00")),
+    ]
+
+    assert await AnalyticsService.apply(collection, entries) == 1
+
+    (requests,) = collection.bulk_write.call_args.args
+    assert requests[0]._filter == {"_id": "default:2024-01-01T19:05", "seq": {"$lt": 8}}
+    assert requests[0]._doc == {
+        "$setOnInsert": {"venue_id": "default", "minute": MINUTE},
+        "$set": {"seq": 8},
+        "$inc": {"joined": 2},
+    }
+    assert requests[0]._upsert
+
+
+@pytest.mark.asyncio
+async def test_apply_ignores_buckets_that_already_have_the_batch():
+    collection = MagicMock()
+    collection.bulk_write = AsyncMock(
+        side_effect=BulkWriteError({"writeErrors": [{"index": 0, "code": 11000}]})
+    )
+    entries = [make_entry(1, "joined", party(created_at="2024-01-01T19:05:00+00:00"))]
+
+    assert await AnalyticsService.apply(collection, entries) == 1
+
+
+@pytest.mark.asyncio
+async def test_consume_redoes_interrupted_batch_then_advances():
+    redis_client = AsyncMock()
+    redis_client.mget.return_value = ["3", "5"]
+    batch = [make_entry(4, "joined", party()), make_entry(5, "joined", party())]
+    redis_client.xrange.side_effect = [batch, []]
+
+    with patch.object(AnalyticsService, "apply", AsyncMock()) as mock_apply:
+        consumed = await AnalyticsService.consume(redis_client, MagicMock())
+
+    assert consumed == 2
+    mock_apply.assert_called_once()
+    assert redis_client.xrange.call_args_list[0].args == (QUEUE_EVENTS_KEY,)
+    assert redis_client.xrange.call_args_list[0].kwargs == {"min": "4-0", "max": "5-0"}
+    assert redis_client.xrange.call_args_list[1].kwargs["min"] == "6-0"
+    redis_client.set.assert_any_call(ANALYTICS_PENDING_KEY, 5)
+    redis_client.set.assert_any_call(ANALYTICS_CURSOR_KEY, 5)
+
+
+@pytest.mark.asyncio
+async def test_summary_reads_rollups():
+    buckets = [
+        {
+            "minute": datetime(2024, 1, 1, 19, 5),
+            "joined": 2,
+            "seated": 1,
+            "completed": 1,
+            "by_size": {"2": {"seated": 1, "wait_seconds": 300.0}},
+            "seat_seconds": 1800.0,
+        },
+        {
+            "minute": datetime(2024, 1, 1, 20, 30),
+            "seated": 1,
+            "by_size": {"2": {"seated": 1, "wait_seconds": 100.0}},
+        },
+    ]
+
+    async def find(query, sort):
+        assert query["venue_id"] == "default"
+        for bucket in buckets:
+            yield bucket
+
+    collection = MagicMock()
+    collection.find = find
+    start = datetime(2024, 1, 1, 19, tzinfo=timezone.utc)
+    end = datetime(2024, 1, 1, 21, tzinfo=timezone.utc)
+
+    with patch("app.services.seat_management_service.settings.AVAILABLE_SEATS", 10):
+        summary = await AnalyticsService.summary(collection, "default", start, end)
+
+    assert summary["throughput"] == [
+        {
+            "hour": datetime(2024, 1, 1, 19, tzinfo=timezone.utc),
+            "joined": 2,
+            "seated": 1,
+            "checked_in": 0,
+            "completed": 1,
+        },
+        {
+            "hour": datetime(2024, 1, 1, 20, tzinfo=timezone.utc),
+            "joined": 0,
+            "seated": 1,
+            "checked_in": 0,
+            "completed": 0,
+        },
+    ]
+    assert summary["average_wait_by_party_size"] == {"2": 200.0}
+    assert summary["seat_utilization"] == 1800.0 / (10 * 7200)
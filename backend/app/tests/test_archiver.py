@@ -0,0 +1,128 @@
+import gzip
+import pytest
+from app.archiver import PartyArchiver, archived_party
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+import orjson
+
+NOW = datetime(2024, 1, 3, 12, 0, tzinfo=timezone.utc)
+
+
+def completed(party_id, venue_id="default", completed_at="2024-01-01T20:00:00+00:00"):
+    return {
+        "_id": party_id,
+        "venue_id": venue_id,
+        "name": party_id,
+        "party_size": 2,
+        "status": "completed",
+        "created_at": "2024-01-01T19:00:00+00:00",
+        "started_at": "2024-01-01T19:30:00+00:00",
+        "completed_at": completed_at,
+    }
+
+
+def make_collection(parties):
+    collection = MagicMock()
+    collection.find.return_value.to_list = AsyncMock(return_value=parties)
+    collection.update_many = AsyncMock()
+    return collection
+
+
+def make_archiver(**kwargs):
+    options = dict(archive_after=86400, batch_size=3, max_batches=5, pause_seconds=0)
+    options.update(kwargs)
+    return PartyArchiver(**options)
+
+
+@pytest.mark.asyncio
+async def test_archive_batch_buckets_parties_by_venue_and_day():
+    parties = [
+        completed("test_user_1"),
+        completed("test_user_2", completed_at="2024-01-02T01:00:00+00:00"),
+        completed("test_user_3", venue_id="venue_2"),
+    ]
+    collection = make_collection(parties)
+    archive = MagicMock()
+    archive.bulk_write = AsyncMock()
+
+    archived = await make_archiver().archive_batch(collection, archive, now=NOW)
+
+    assert archived == 3
+    query = collection.find.call_args.args[0]
+    assert query["completed_at"] == {"$lt": "2024-01-02T12:00:00+00:00"}
+    assert query["archived_at"] == {"$exists": False}
+
+    (requests,) = archive.bulk_write.call_args.args
+    updates = {request._filter["_id"]: request._doc for request in requests}
+    assert set(updates) == {
+        "default:2024-01-01",
+        "default:2024-01-02",
+        "venue_2:2024-01-01",
+    }
+    assert updates["default:2024-01-01"] == {
+        "$setOnInsert": {"venue_id": "default", "day": "2024-01-01"},
+        "$addToSet": {"parties": {"$each": [archived_party(parties[0])]}},
+    }
+    collection.update_many.assert_called_once_with(
+        {"_id": {"$in": ["test_user_1", "test_user_2", "test_user_3"]}},
+        {"$set": {"archived_at": NOW}},
+    )
+
+
+@pytest.mark.asyncio
+async def test_archive_batch_writes_compressed_export(tmp_path):
+    collection = make_collection([completed("test_user_1")])
+    archive = MagicMock()
+    archive.bulk_write = AsyncMock()
+    archiver = make_archiver(export_dir=str(tmp_path))
+
+    await archiver.archive_batch(collection, archive, now=NOW)
+    # A crash before the parties were stamped: the next run exports them again
+    await archiver.archive_batch(collection, archive, now=NOW)
+
+    (path,) = (tmp_path / "default").iterdir()
+    assert path.name == "2024-01-01-test_user_1.jsonl.gz"
+    with gzip.open(path) as export:
+        lines = export.read().splitlines()
+    assert len(lines) == 1
+    assert orjson.loads(lines[0])["_id"] == "test_user_1"
+
+
+@pytest.mark.asyncio
+async def test_archive_batch_keeps_exports_inside_export_dir(tmp_path):
+    export_dir = tmp_path / "exports"
+    collection = make_collection([completed("test_user_1", venue_id="../outside")])
+    archive = MagicMock()
+    archive.bulk_write = AsyncMock()
+    archiver = make_archiver(export_dir=str(export_dir))
+
+    assert await archiver.archive_batch(collection, archive, now=NOW) == 1
+
+    assert not (tmp_path / "outside").exists()
+    archive.bulk_write.assert_called_once()
+    collection.update_many.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_archive_batch_does_nothing_without_due_parties():
+    collection = make_collection([])
+    archive = MagicMock()
+    archive.bulk_write = AsyncMock()
+
+    assert await make_archiver().archive_batch(collection, archive) == 0
+
+    archive.bulk_write.assert_not_called()
+    collection.update_many.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_run_stops_at_short_batch_or_batch_limit():
+    archiver = make_archiver(max_batches=3)
+
+    with patch.object(archiver, "archive_batch", AsyncMock(side_effect=[3, 1])):
+        assert await archiver.run(MagicMock(), MagicMock()) == 4
+        assert archiver.archive_batch.call_count == 2
+
+    with patch.object(archiver, "archive_batch", AsyncMock(return_value=3)):
+        assert await archiver.run(MagicMock(), MagicMock()) == 9
+        assert archiver.archive_batch.call_count == 3
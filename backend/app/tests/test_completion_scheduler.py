@@ -0,0 +1,113 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from datetime import datetime, timezone
+from app.completion_scheduler import CompletionScheduler, COMPLETIONS_KEY
+
+
+def make_scheduler():
+    return CompletionScheduler(batch_size=10, lease_seconds=30, tick_seconds=1)
+
+
+@pytest.mark.asyncio
+async def test_schedule_adds_due_time():
+    scheduler = make_scheduler()
+    redis_client = AsyncMock()
+
+    await scheduler.schedule(redis_client, "test_user_1", 1000.0)
+
+    redis_client.zadd.assert_called_once_with(COMPLETIONS_KEY, {"test_user_1": 1000.0})
+
+
+@pytest.mark.asyncio
+async def test_claim_due_uses_lease():
+    scheduler = make_scheduler()
+    redis_client = AsyncMock()
+    mock_script = AsyncMock(return_value=["test_user_1"])
+    redis_client.register_script = MagicMock(return_value=mock_script)
+
+    due = await scheduler.claim_due(redis_client, now=1000.0)
+
+    assert due == ["test_user_1"]
+    mock_script.assert_called_once_with(keys=[COMPLETIONS_KEY], args=[1000.0, 10, 30])
+
+
+@pytest.mark.asyncio
+async def test_process_due_completes_and_removes():
+    scheduler = make_scheduler()
+    redis_client = AsyncMock()
+    collection = AsyncMock()
+
+    with (
+        patch.object(
+            scheduler,
+            "claim_due",
+            AsyncMock(return_value=["test_user_1", "test_user_2"]),
+        ),
+        patch(
+            "app.services.waitlist_service.WaitlistService.complete_service",
+            new_callable=AsyncMock,
+            side_effect=[None, RuntimeError("boom")],
+        ) as mock_complete,
+    ):
+        processed = await scheduler.process_due(redis_client, collection)
+
+    assert processed == 2
+    assert mock_complete.call_count == 2
+    # The failed completion stays scheduled for a retry
+    redis_client.zrem.assert_called_once_with(COMPLETIONS_KEY, "test_user_1")
+
+
+@pytest.mark.asyncio
+async def test_recover_schedules_checked_in_parties():
+    scheduler = make_scheduler()
+    redis_client = AsyncMock()
+    redis_client.zadd.return_value = 1
+    started_at = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+    collection = MagicMock()
+    collection.find.return_value.to_list = AsyncMock(
+        return_value=[
+            {
+                "_id": "test_user_1",
+                "party_size": 2,
+                "status": "checked_in",
+                "started_at": started_at.isoformat(),
+            }
+        ]
+    )
+
+    with patch("app.completion_scheduler.settings.SERVICE_TIME_PER_PERSON", 3):
+        recovered = await scheduler.recover(redis_client, collection)
+
+    assert recovered == 1
+    redis_client.zadd.assert_called_once_with(
+        COMPLETIONS_KEY, {"test_user_1": started_at.timestamp() + 6}, nx=True
+    )
+    collection.find.assert_called_once_with({"status": "checked_in"})
+
+
+@pytest.mark.asyncio
+async def test_recover_uses_given_parties():
+    scheduler = make_scheduler()
+    redis_client = AsyncMock()
+    redis_client.zadd.return_value = 1
+    collection = MagicMock()
+    started_at = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    parties = [
+        {"_id": "test_user_1", "party_size": 2, "status": "waiting"},
+        {
+            "_id": "test_user_2",
+            "party_size": 1,
+            "status": "checked_in",
+            "started_at": started_at.isoformat(),
+        },
+    ]
+
+    with patch("app.completion_scheduler.settings.SERVICE_TIME_PER_PERSON", 3):
+        recovered = await scheduler.recover(redis_client, collection, parties)
+
+    assert recovered == 1
+    collection.find.assert_not_called()
+    redis_client.zadd.assert_called_once_with(
+        COMPLETIONS_KEY, {"test_user_2": started_at.timestamp() + 3}, nx=True
+    )
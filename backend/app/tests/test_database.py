@@ -0,0 +1,56 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from pymongo import IndexModel
+from app.database import MongoDBManager
+
+
+def make_manager(collection, indexes=None):
+    manager = MongoDBManager(uri="mongodb://test", db_name="test", indexes=indexes)
+    manager._db = {"waitlist": collection}
+    return manager
+
+
+def make_cursor(winning_plan):
+    cursor = MagicMock()
+    cursor.sort.return_value = cursor
+    cursor.explain = AsyncMock(return_value={"queryPlanner": {"winningPlan": winning_plan}})
+    collection = MagicMock()
+    collection.find.return_value = cursor
+    return collection
+
+
+@pytest.mark.asyncio
+async def test_ensure_indexes():
+    collection = MagicMock()
+    collection.create_indexes = AsyncMock(return_value=["status_created_at"])
+    index = IndexModel([("status", 1), ("created_at", 1)], name="status_created_at")
+    manager = make_manager(collection, {"waitlist": [index]})
+
+    await manager.ensure_indexes()
+
+    collection.create_indexes.assert_called_once_with([index])
+
+
+@pytest.mark.asyncio
+async def test_uses_index_for_index_scan():
+    plan = {
+        "stage": "LIMIT",
+        "inputStage": {
+            "stage": "FETCH",
+            "inputStage": {"stage": "IXSCAN", "indexName": "status_created_at"},
+        },
+    }
+    manager = make_manager(make_cursor(plan))
+
+    assert await manager.uses_index("waitlist", {"status": "waiting"}, [("created_at", 1)])
+
+
+@pytest.mark.asyncio
+async def test_uses_index_rejects_in_memory_sort():
+    plan = {
+        "stage": "SORT",
+        "inputStage": {"stage": "COLLSCAN", "filter": {"status": {"$eq": "waiting"}}},
+    }
+    manager = make_manager(make_cursor(plan))
+
+    assert not await manager.uses_index("waitlist", {"status": "waiting"}, [("created_at", 1)])
@@ -0,0 +1,99 @@
+import asyncio
+import pytest
+from app.distributed_lock import DistributedLock
+from unittest.mock import AsyncMock, MagicMock
+
+
+def make_redis(set_results, script_result=1):
+    redis_client = AsyncMock()
+    redis_client.set.side_effect = list(set_results)
+    script = AsyncMock(return_value=script_result)
+    redis_client.register_script = MagicMock(return_value=script)
+    # Pub/sub unavailable: waiters fall back to jittered polling
+    redis_client.pubsub = MagicMock(side_effect=ConnectionError("no pub/sub"))
+    return redis_client, script
+
+
+@pytest.mark.asyncio
+async def test_each_owner_has_its_own_token():
+    redis_client, _ = make_redis([True])
+
+    first = DistributedLock(redis_client, "test_lock")
+    second = DistributedLock(redis_client, "test_lock")
+
+    assert first.token != second.token
+
+
+@pytest.mark.asyncio
+async def test_acquire_waits_for_release():
+    redis_client, _ = make_redis([None, None, True])
+    lock = DistributedLock(redis_client, "test_lock", lease_seconds=5)
+
+    assert await lock.acquire(timeout=1)
+
+    assert lock.held
+    assert redis_client.set.call_count == 3
+    await lock.release()
+
+
+@pytest.mark.asyncio
+async def test_acquire_gives_up_after_timeout():
+    redis_client, _ = make_redis([None] * 1000)
+    lock = DistributedLock(redis_client, "test_lock")
+
+    assert not await lock.acquire(timeout=0.05)
+    assert not lock.held
+
+
+@pytest.mark.asyncio
+async def test_acquire_wakes_on_release_message():
+    redis_client, _ = make_redis([None, None, True])
+    pubsub = AsyncMock()
+    redis_client.pubsub = MagicMock(return_value=pubsub)
+    lock = DistributedLock(redis_client, "test_lock")
+
+    assert await lock.acquire(timeout=1)
+
+    pubsub.subscribe.assert_called_once_with("test_lock:released")
+    pubsub.get_message.assert_called_once()
+    pubsub.aclose.assert_called_once()
+    await lock.release()
+
+
+@pytest.mark.asyncio
+async def test_release_only_deletes_own_lock():
+    redis_client, script = make_redis([True], script_result=0)
+    lock = DistributedLock(redis_client, "test_lock")
+    await lock.acquire()
+
+    assert not await lock.release()
+
+    script.assert_called_once_with(
+        keys=["test_lock"], args=[lock.token, "test_lock:released"]
+    )
+    redis_client.delete.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_lease_is_renewed_while_held():
+    redis_client, script = make_redis([True])
+    lock = DistributedLock(redis_client, "test_lock", lease_seconds=0.03)
+    await lock.acquire()
+
+    await asyncio.sleep(0.05)
+
+    assert lock.held
+    script.assert_called_with(keys=["test_lock"], args=[lock.token, 30])
+    await lock.release()
+
+
+@pytest.mark.asyncio
+async def test_lost_lease_is_reported():
+    redis_client, _ = make_redis([True], script_result=0)
+    lock = DistributedLock(redis_client, "test_lock", lease_seconds=0.03)
+    await lock.acquire()
+
+    await asyncio.sleep(0.05)
+
+    assert not lock.held
+    assert not await lock.release()
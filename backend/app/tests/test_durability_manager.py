@@ -0,0 +1,28 @@
+import pytest
+from unittest.mock import AsyncMock
+from app.durability_manager import DurabilityManager
+
+
+@pytest.mark.asyncio
+async def test_bgsave_is_debounced():
+    manager = DurabilityManager(mode="bgsave", debounce_seconds=0.01)
+    redis_client = AsyncMock()
+
+    for delta in (-4, -2, 6):
+        await manager.record(redis_client, delta)
+    await manager.flush()
+
+    redis_client.bgsave.assert_called_once()
+    redis_client.save.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_aof_mode_does_not_save():
+    manager = DurabilityManager(mode="aof", debounce_seconds=0.01)
+    redis_client = AsyncMock()
+
+    await manager.record(redis_client, -4, "test_user_1")
+    await manager.flush()
+
+    redis_client.bgsave.assert_not_called()
+    redis_client.save.assert_not_called()
@@ -0,0 +1,113 @@
+import pytest
+from app.leader_election import (
+    FENCING_TOKEN_KEY,
+    LEADER_KEY,
+    LeaderElector,
+    LeadershipLost,
+)
+from unittest.mock import AsyncMock, MagicMock
+
+
+def make_redis(*script_results):
+    redis_client = AsyncMock()
+    script = AsyncMock(side_effect=list(script_results))
+    redis_client.register_script = MagicMock(return_value=script)
+    return redis_client, script
+
+
+@pytest.mark.asyncio
+async def test_campaign_elects_with_fencing_token():
+    elector = LeaderElector(lease_seconds=15, renew_seconds=5)
+    redis_client, script = make_redis([1, 7])
+
+    assert await elector.campaign(redis_client) is True
+
+    assert elector.is_leader
+    assert elector.fencing_token == 7
+    assert elector.leader_since is not None
+    script.assert_called_once_with(
+        keys=[LEADER_KEY, FENCING_TOKEN_KEY], args=[elector.node_id, 15000]
+    )
+
+
+@pytest.mark.asyncio
+async def test_renewal_keeps_term():
+    elector = LeaderElector(lease_seconds=15, renew_seconds=5)
+    redis_client, _ = make_redis([1, 7], [1, 7])
+
+    await elector.campaign(redis_client)
+    leader_since = elector.leader_since
+    await elector.campaign(redis_client)
+
+    assert elector.is_leader
+    assert elector.fencing_token == 7
+    assert elector.leader_since == leader_since
+
+
+@pytest.mark.asyncio
+async def test_steps_down_when_another_node_holds_lease():
+    elector = LeaderElector(lease_seconds=15, renew_seconds=5)
+    redis_client, _ = make_redis([1, 7], [0, 8])
+
+    await elector.campaign(redis_client)
+    assert await elector.campaign(redis_client) is False
+
+    assert not elector.is_leader
+    assert elector.leader_since is None
+
+
+@pytest.mark.asyncio
+async def test_keeps_lease_through_brief_redis_outage():
+    elector = LeaderElector(lease_seconds=15, renew_seconds=5)
+    redis_client, _ = make_redis([1, 7], ConnectionError("down"))
+
+    await elector.campaign(redis_client)
+
+    assert await elector.campaign(redis_client) is True
+
+
+@pytest.mark.asyncio
+async def test_still_leader_rejects_stale_term():
+    elector = LeaderElector(lease_seconds=15, renew_seconds=5)
+    redis_client, script = make_redis([1, 7], 0)
+
+    await elector.campaign(redis_client)
+
+    assert await elector.still_leader(redis_client) is False
+    assert not elector.is_leader
+    script.assert_called_with(
+        keys=[LEADER_KEY, FENCING_TOKEN_KEY], args=[elector.node_id, 7]
+    )
+
+
+@pytest.mark.asyncio
+async def test_check_term_raises_once_term_ends():
+    elector = LeaderElector(lease_seconds=15, renew_seconds=5)
+    redis_client, _ = make_redis([1, 7], 1, 0)
+
+    await elector.campaign(redis_client)
+    await elector.check_term(redis_client)
+
+    with pytest.raises(LeadershipLost):
+        await elector.check_term(redis_client)
+
+
+@pytest.mark.asyncio
+async def test_follower_is_never_still_leader():
+    elector = LeaderElector(lease_seconds=15, renew_seconds=5)
+    redis_client, script = make_redis()
+
+    assert await elector.still_leader(redis_client) is False
+    script.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_stop_releases_lease():
+    elector = LeaderElector(lease_seconds=15, renew_seconds=60)
+    redis_client, script = make_redis([1, 7], 1)
+
+    await elector.start(redis_client)
+    await elector.stop()
+
+    assert not elector.is_leader
+    script.assert_called_with(keys=[LEADER_KEY], args=[elector.node_id])
@@ -0,0 +1,88 @@
+import pytest
+import io
+import json
+import logging
+from app.logging_config import (
+    JsonFormatter,
+    LazyQueueHandler,
+    SamplingFilter,
+    configure_logging,
+    stop_logging,
+)
+
+
+def make_record(level=logging.INFO, event=None, **extra):
+    record = logging.makeLogRecord(
+        {"name": "Test", "levelno": level, "levelname": logging.getLevelName(level)}
+    )
+    record.msg = "Party %s joined"
+    record.args = ("test_user_1",)
+    if event is not None:
+        record.event = event
+    record.__dict__.update(extra)
+    return record
+
+
+@pytest.fixture
+def restore_root_logger():
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    yield
+    for handler in list(root.handlers):
+        if isinstance(handler, LazyQueueHandler):
+            root.removeHandler(handler)
+    for handler in handlers:
+        if handler not in root.handlers:
+            root.addHandler(handler)
+    root.setLevel(level)
+
+
+def test_json_formatter_includes_extra_fields():
+    line = JsonFormatter().format(make_record(event="party_joined", venue_id="v1"))
+
+    entry = json.loads(line)
+    assert entry["message"] == "Party test_user_1 joined"
+    assert entry["level"] == "INFO"
+    assert entry["logger"] == "Test"
+    assert entry["event"] == "party_joined"
+    assert entry["venue_id"] == "v1"
+
+
+def test_sampling_filter_keeps_one_in_n():
+    sampler = SamplingFilter({"seats_lock": 0.25})
+
+    kept = [sampler.filter(make_record(event="seats_lock")) for _ in range(8)]
+
+    assert kept == [True, False, False, False, True, False, False, False]
+
+
+def test_sampling_filter_passes_unsampled_and_warnings():
+    sampler = SamplingFilter({"seats_lock": 0.0})
+
+    assert sampler.filter(make_record())
+    assert sampler.filter(make_record(event="party_joined"))
+    assert not sampler.filter(make_record(event="seats_lock"))
+    assert sampler.filter(make_record(level=logging.WARNING, event="seats_lock"))
+
+
+def test_configure_logging_writes_json_from_listener(restore_root_logger):
+    stream = io.StringIO()
+    configure_logging(
+        level="INFO", fmt="json", sample_rates={"seat_change": 0.5}, stream=stream
+    )
+    logger = logging.getLogger("Test")
+
+    logger.info("Party %s joined", "test_user_1", extra={"event": "party_joined"})
+    for _ in range(4):
+        logger.info("Seats changed", extra={"event": "seat_change"})
+    logger.debug("Below the configured level")
+    stop_logging()
+
+    entries = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [entry["event"] for entry in entries] == [
+        "party_joined",
+        "seat_change",
+        "seat_change",
+    ]
+    assert entries[0]["message"] == "Party test_user_1 joined"
+    assert entries[1]["sampled_every"] == 2
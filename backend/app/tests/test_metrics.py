@@ -0,0 +1,154 @@
+import pytest
+import json
+import threading
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from app.metrics import (
+    MONGO_CALL_SECONDS,
+    Counter,
+    Gauge,
+    Histogram,
+    MetricsRegistry,
+    MongoCommandMetrics,
+    merge_snapshots,
+    render,
+    worker_key,
+)
+
+
+def make_registry():
+    registry = MetricsRegistry()
+    counter = registry.register(Counter("test_total", "A counter.", ["venue"]))
+    histogram = registry.register(
+        Histogram("test_seconds", "A histogram.", buckets=(0.1, 1.0))
+    )
+    return registry, counter, histogram
+
+
+def test_counter_children_are_cached_per_label():
+    counter = Counter("test_total", "A counter.", ["venue"])
+
+    counter.labels("default").inc()
+    counter.labels("default").inc(2)
+    counter.labels("venue_1").inc()
+
+    assert counter.labels("default") is counter.labels("default")
+    assert sorted(counter.snapshot()["samples"]) == [
+        [["default"], 3.0],
+        [["venue_1"], 1.0],
+    ]
+
+
+def test_gauge_inc_dec_and_set():
+    gauge = Gauge("test_gauge", "A gauge.")
+
+    gauge.inc()
+    gauge.inc()
+    gauge.dec()
+    assert gauge.snapshot()["samples"] == [[[], 1.0]]
+
+    gauge.set(7)
+    assert gauge.snapshot()["samples"] == [[[], 7]]
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry, _, histogram = make_registry()
+    histogram.observe(0.05)
+    histogram.observe(0.5)
+    histogram.observe(5)
+
+    text = render(merge_snapshots({"n1": registry.snapshot()}))
+
+    assert "# TYPE test_seconds histogram" in text
+    assert 'test_seconds_bucket{node="n1",le="0.1"} 1' in text
+    assert 'test_seconds_bucket{node="n1",le="1.0"} 2' in text
+    assert 'test_seconds_bucket{node="n1",le="+Inf"} 3' in text
+    assert 'test_seconds_count{node="n1"} 3' in text
+    assert 'test_seconds_sum{node="n1"} 5.55' in text
+
+
+def test_mongo_command_metrics_keep_every_threaded_observation():
+    listener = MongoCommandMetrics()
+    commands = [f"test_command_{i}" for i in range(200)]
+
+    def observe():
+        for command in commands * 50:
+            event = SimpleNamespace(command_name=command, duration_micros=100)
+            listener.succeeded(event)
+
+    threads = [threading.Thread(target=observe) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    # Snapshots race the driver threads adding children
+    while any(thread.is_alive() for thread in threads):
+        MONGO_CALL_SECONDS.snapshot()
+    for thread in threads:
+        thread.join()
+
+    samples = {
+        labels[0]: value
+        for labels, value in MONGO_CALL_SECONDS.snapshot()["samples"]
+        if labels[0] in commands
+    }
+    assert len(samples) == len(commands)
+    assert all(sum(value["counts"]) == 200 for value in samples.values())
+
+
+def test_merge_keeps_one_series_per_worker():
+    first, first_counter, first_histogram = make_registry()
+    second, second_counter, second_histogram = make_registry()
+    first_counter.labels("default").inc(2)
+    second_counter.labels("default").inc(3)
+    first_histogram.observe(0.05)
+
+    merged = merge_snapshots({"n1": first.snapshot(), "n2": second.snapshot()})
+
+    assert merged["test_total"]["labelnames"] == ["venue", "node"]
+    assert merged["test_total"]["samples"] == {
+        ("default", "n1"): 2.0,
+        ("default", "n2"): 3.0,
+    }
+    assert merged["test_seconds"]["samples"][("n1",)]["counts"] == [1, 0, 0]
+    assert merged["test_seconds"]["samples"][("n2",)]["counts"] == [0, 0, 0]
+
+
+@pytest.mark.asyncio
+async def test_push_expires_and_remove_deletes_worker_snapshot():
+    registry, counter, _ = make_registry()
+    counter.labels("default").inc()
+    redis_client = AsyncMock()
+
+    await registry.push(redis_client, ttl=15)
+    await registry.remove(redis_client)
+
+    key, payload = redis_client.set.call_args.args
+    assert key == worker_key(registry.node_id)
+    assert redis_client.set.call_args.kwargs == {"ex": 15}
+    assert json.loads(payload) == registry.snapshot()
+    redis_client.delete.assert_called_once_with(key)
+
+
+@pytest.mark.asyncio
+async def test_collect_reports_live_workers():
+    registry, counter, _ = make_registry()
+    counter.labels("default").inc()
+    other, other_counter, _ = make_registry()
+    other_counter.labels("default").inc(4)
+
+    async def scan_iter(match):
+        for node_id in (registry.node_id, other.node_id, "expired"):
+            yield worker_key(node_id)
+
+    redis_client = MagicMock()
+    redis_client.scan_iter = scan_iter
+    redis_client.mget = AsyncMock(return_value=[json.dumps(other.snapshot()), None])
+
+    merged = await registry.collect(redis_client)
+
+    redis_client.mget.assert_called_once_with(
+        [worker_key(other.node_id), worker_key("expired")]
+    )
+    assert merged["test_total"]["samples"] == {
+        ("default", registry.node_id): 1.0,
+        ("default", other.node_id): 4.0,
+    }
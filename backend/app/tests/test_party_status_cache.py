@@ -0,0 +1,129 @@
+import pytest
+import json
+from unittest.mock import AsyncMock, MagicMock
+from app.party_status_cache import (
+    GENERATION_TTL_SECONDS,
+    INVALIDATE_SCRIPT,
+    SET_IF_GENERATION_SCRIPT,
+    PartyStatusCache,
+    generation_key,
+    status_key,
+)
+
+
+def make_cache():
+    return PartyStatusCache(ttl=30, negative_ttl=5, local_ttl=60, max_local_entries=2)
+
+
+def make_redis(stored=1):
+    redis_client = AsyncMock()
+    script = AsyncMock(return_value=stored)
+    redis_client.register_script = MagicMock(return_value=script)
+    return redis_client, script
+
+
+@pytest.mark.asyncio
+async def test_set_then_get_from_local_cache():
+    cache = make_cache()
+    redis_client, script = make_redis()
+    status = {"status": "waiting", "party": {"_id": "test_user_1"}}
+
+    etag = await cache.set(redis_client, "test_user_1", status, "3")
+
+    redis_client.register_script.assert_called_once_with(SET_IF_GENERATION_SCRIPT)
+    assert script.call_args.kwargs["keys"] == [
+        status_key("test_user_1"),
+        generation_key("test_user_1"),
+    ]
+    generation, payload, ttl = script.call_args.kwargs["args"]
+    assert generation == "3"
+    assert ttl == 30
+    assert json.loads(payload) == {"status": status, "etag": etag}
+
+    assert await cache.get(redis_client, "test_user_1") == (status, etag)
+    redis_client.get.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_get_falls_back_to_redis():
+    cache = make_cache()
+    redis_client = AsyncMock()
+    status = {"status": "ready", "party": {"_id": "test_user_1"}}
+    redis_client.get.return_value = json.dumps({"status": status, "etag": '"abc"'})
+
+    assert await cache.get(redis_client, "test_user_1") == (status, '"abc"')
+
+    redis_client.get.return_value = None
+    assert await cache.get(redis_client, "test_user_2") is None
+
+
+@pytest.mark.asyncio
+async def test_negative_entries_use_short_ttl():
+    cache = make_cache()
+    redis_client, script = make_redis()
+
+    await cache.set(redis_client, "test_user_1", {"status": "na"}, "")
+
+    assert script.call_args.kwargs["args"][2] == 5
+
+
+@pytest.mark.asyncio
+async def test_set_skips_cache_when_invalidated_since_read():
+    cache = make_cache()
+    redis_client, _ = make_redis(stored=0)
+    redis_client.get.return_value = None
+
+    etag = await cache.set(redis_client, "test_user_1", {"status": "waiting"}, "")
+
+    assert etag == PartyStatusCache.make_etag({"status": "waiting"})
+    assert await cache.get(redis_client, "test_user_1") is None
+
+
+@pytest.mark.asyncio
+async def test_set_skips_cache_without_generation():
+    cache = make_cache()
+    redis_client, _ = make_redis()
+    redis_client.get.return_value = None
+
+    await cache.set(redis_client, "test_user_1", {"status": "waiting"}, None)
+
+    redis_client.register_script.assert_not_called()
+    assert await cache.get(redis_client, "test_user_1") is None
+
+
+@pytest.mark.asyncio
+async def test_generation_defaults_to_empty():
+    cache = make_cache()
+    redis_client = AsyncMock()
+    redis_client.get.return_value = None
+
+    assert await cache.generation(redis_client, "test_user_1") == ""
+    redis_client.get.assert_called_once_with(generation_key("test_user_1"))
+
+    redis_client.get.side_effect = ConnectionError("down")
+    assert await cache.generation(redis_client, "test_user_1") is None
+
+
+@pytest.mark.asyncio
+async def test_invalidate_drops_local_and_redis_entries():
+    cache = make_cache()
+    redis_client, script = make_redis()
+    redis_client.get.return_value = None
+
+    await cache.set(redis_client, "test_user_1", {"status": "waiting"}, "")
+    await cache.invalidate(redis_client, "test_user_1")
+
+    redis_client.register_script.assert_called_with(INVALIDATE_SCRIPT)
+    script.assert_called_with(
+        keys=[status_key("test_user_1"), generation_key("test_user_1")],
+        args=[GENERATION_TTL_SECONDS],
+    )
+    assert await cache.get(redis_client, "test_user_1") is None
+
+
+@pytest.mark.asyncio
+async def test_etag_changes_with_status():
+    waiting = PartyStatusCache.make_etag({"status": "waiting"})
+
+    assert waiting == PartyStatusCache.make_etag({"status": "waiting"})
+    assert waiting != PartyStatusCache.make_etag({"status": "ready"})
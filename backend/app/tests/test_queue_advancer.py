@@ -0,0 +1,80 @@
+import pytest
+import asyncio
+from unittest.mock import AsyncMock, patch
+from app.queue_advancer import QueueAdvancer
+
+
+@pytest.mark.asyncio
+async def test_burst_of_events_is_collapsed():
+    advancer = QueueAdvancer()
+
+    with patch(
+        "app.services.waitlist_service.WaitlistService.check_queue_readiness",
+        new_callable=AsyncMock,
+        return_value=False,
+    ) as mock_check:
+        for _ in range(10):
+            advancer.notify("default", "party_joined")
+        await advancer.advance("default", "seats_changed")
+
+        assert mock_check.call_count <= 2
+
+
+@pytest.mark.asyncio
+async def test_advance_seats_until_no_progress():
+    advancer = QueueAdvancer()
+
+    with patch(
+        "app.services.waitlist_service.WaitlistService.check_queue_readiness",
+        new_callable=AsyncMock,
+        side_effect=[True, True, False],
+    ) as mock_check:
+        await advancer.advance("default", "service_completed")
+
+        assert mock_check.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_advance_survives_evaluation_errors():
+    advancer = QueueAdvancer()
+
+    with patch(
+        "app.services.waitlist_service.WaitlistService.check_queue_readiness",
+        new_callable=AsyncMock,
+        side_effect=RuntimeError("boom"),
+    ):
+        await advancer.advance("default", "party_joined")
+
+    with patch(
+        "app.services.waitlist_service.WaitlistService.check_queue_readiness",
+        new_callable=AsyncMock,
+        return_value=False,
+    ) as mock_check:
+        await advancer.advance("default", "party_joined")
+
+        mock_check.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_venues_advance_independently():
+    advancer = QueueAdvancer()
+    started = []
+    release_busy_venue = asyncio.Event()
+
+    async def check_queue_readiness(venue_id):
+        started.append(venue_id)
+        if venue_id == "busy":
+            await release_busy_venue.wait()
+        return False
+
+    with patch(
+        "app.services.waitlist_service.WaitlistService.check_queue_readiness",
+        side_effect=check_queue_readiness,
+    ):
+        advancer.notify("busy", "party_joined")
+        # The quiet venue is evaluated while the busy one is still running
+        await asyncio.wait_for(advancer.advance("quiet", "party_joined"), timeout=1)
+        assert started == ["busy", "quiet"]
+
+        release_busy_venue.set()
+        await advancer.advance_all(["busy", "quiet"], "sweep")
@@ -0,0 +1,184 @@
+import pytest
+from app.queue_feed import (
+    ADMIN_NAMESPACE,
+    QUEUE_EVENTS_KEY,
+    QUEUE_EVENTS_SEQ_KEY,
+    QueueFeed,
+)
+from app.serialization import dumps
+from unittest.mock import AsyncMock, MagicMock
+
+
+def make_entry(seq, venue_id, event_type, party_id=None, seats=4):
+    event = {"type": event_type}
+    if party_id:
+        event["party"] = {"_id": party_id}
+    return f"{seq}-0", {"venue": venue_id, "seats": str(seats), "event": dumps(event)}
+
+
+def make_collection(parties):
+    collection = MagicMock()
+    collection.find.return_value.to_list = AsyncMock(return_value=parties)
+    return collection
+
+
+def emitted(sio):
+    return [(call.args[0], call.args[1]) for call in sio.emit.call_args_list]
+
+
+@pytest.mark.asyncio
+async def test_publish_numbers_changes_in_one_script_call():
+    feed = QueueFeed(max_events=100)
+    redis_client = AsyncMock()
+    script = AsyncMock(return_value=2)
+    redis_client.register_script = MagicMock(return_value=script)
+
+    await feed.publish(
+        redis_client,
+        "venue_2",
+        "ready",
+        [
+            {"_id": "test_user_1", "party_size": 2, "seating_pass": "x"},
+            {"_id": "test_user_2"},
+        ],
+    )
+
+    script.assert_called_once_with(
+        keys=[QUEUE_EVENTS_KEY, QUEUE_EVENTS_SEQ_KEY, "available_seats:venue_2"],
+        args=[
+            100,
+            "venue_2",
+            dumps({"type": "ready", "party": {"_id": "test_user_1", "party_size": 2}}),
+            dumps({"type": "ready", "party": {"_id": "test_user_2"}}),
+        ],
+    )
+
+
+@pytest.mark.asyncio
+async def test_subscribe_sends_snapshot_then_missed_changes():
+    feed = QueueFeed(max_events=100)
+    feed._reader_seq = 7
+    sio = AsyncMock()
+    redis_client = AsyncMock()
+    redis_client.get.side_effect = ["5", "4"]
+    redis_client.xrange.return_value = [
+        make_entry(6, "default", "joined", "test_user_2"),
+        make_entry(7, "venue_2", "joined", "test_user_3"),
+    ]
+    collection = make_collection([{"_id": "test_user_1", "status": "waiting"}])
+
+    await feed.subscribe(sio, "sid_1", redis_client, collection, "default")
+
+    assert emitted(sio) == [
+        (
+            "queue_snapshot",
+            {
+                "seq": 5,
+                "venue_id": "default",
+                "available_seats": 4,
+                "parties": [{"_id": "test_user_1", "status": "waiting"}],
+            },
+        ),
+        (
+            "queue_diff",
+            {
+                "seq": 6,
+                "venue_id": "default",
+                "available_seats": 4,
+                "type": "joined",
+                "party": {"_id": "test_user_2"},
+            },
+        ),
+    ]
+    assert sio.emit.call_args.kwargs == {"to": "sid_1", "namespace": ADMIN_NAMESPACE}
+    redis_client.xrange.assert_called_once_with(QUEUE_EVENTS_KEY, min="6-0", count=500)
+    assert feed._subscribers["sid_1"].live
+
+
+@pytest.mark.asyncio
+async def test_subscribe_resumes_without_snapshot():
+    feed = QueueFeed(max_events=100)
+    feed._reader_seq = 9
+    sio = AsyncMock()
+    redis_client = AsyncMock()
+    redis_client.get.return_value = "9"
+    redis_client.xrange.side_effect = [
+        [make_entry(3, "default", "joined", "test_user_1")],
+        [
+            make_entry(8, "default", "ready", "test_user_1"),
+            make_entry(9, "venue_2", "seats"),
+        ],
+    ]
+
+    await feed.subscribe(sio, "sid_1", redis_client, MagicMock(), "default", since=7)
+
+    assert emitted(sio) == [
+        (
+            "queue_diff",
+            {
+                "seq": 8,
+                "venue_id": "default",
+                "available_seats": 4,
+                "type": "ready",
+                "party": {"_id": "test_user_1"},
+            },
+        )
+    ]
+
+
+@pytest.mark.asyncio
+async def test_subscribe_sends_new_snapshot_when_replay_was_trimmed():
+    feed = QueueFeed(max_events=100)
+    feed._reader_seq = 12
+    sio = AsyncMock()
+    redis_client = AsyncMock()
+    redis_client.get.side_effect = ["5", "4", "12", "3"]
+    # Changes 6 to 9 were trimmed between the snapshot and the replay
+    redis_client.xrange.side_effect = [[make_entry(10, "default", "seats")]]
+    collection = make_collection([])
+
+    await feed.subscribe(sio, "sid_1", redis_client, collection, "default")
+
+    assert [event for event, _ in emitted(sio)] == ["queue_snapshot"] * 2
+    assert emitted(sio)[1][1]["seq"] == 12
+    assert feed._subscribers["sid_1"].cursor == 12
+    assert feed._subscribers["sid_1"].live
+
+
+@pytest.mark.asyncio
+async def test_cannot_resume_once_changes_are_trimmed():
+    feed = QueueFeed(max_events=100)
+    redis_client = AsyncMock()
+    redis_client.get.return_value = "50"
+    redis_client.xrange.return_value = [make_entry(20, "default", "seats")]
+
+    assert await feed.can_resume(redis_client, 19)
+    assert not await feed.can_resume(redis_client, 18)
+    assert not await feed.can_resume(redis_client, 51)
+
+
+@pytest.mark.asyncio
+async def test_deliver_skips_catching_up_and_seen_changes():
+    feed = QueueFeed(max_events=100)
+    sio = AsyncMock()
+    redis_client = AsyncMock()
+    redis_client.get.side_effect = ["5", "4"]
+    await feed.subscribe(sio, "sid_1", redis_client, make_collection([]), "default")
+    sio.emit.reset_mock()
+
+    await feed.deliver(
+        sio,
+        [
+            make_entry(5, "default", "joined", "test_user_1"),
+            make_entry(6, "venue_2", "joined", "test_user_2"),
+            make_entry(7, "default", "seats", seats=6),
+        ],
+    )
+
+    assert emitted(sio) == [
+        (
+            "queue_diff",
+            {"seq": 7, "venue_id": "default", "available_seats": 6, "type": "seats"},
+        )
+    ]
+    assert feed._reader_seq == 7
@@ -1,7 +1,7 @@
 import pytest
 from app.services.seat_management_service import SeatManagementService
 from fastapi import HTTPException
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 
 @pytest.mark.usefixtures("initialize_database")
@@ -11,11 +11,30 @@ async def test_acquire_seats_lock():
         "app.redis_client.get_redis_client", new_callable=AsyncMock
     ) as mock_get_redis_client:
         mock_redis_client = mock_get_redis_client.return_value
-        await SeatManagementService.acquire_seats_lock(mock_redis_client)
+        mock_redis_client.register_script = MagicMock(return_value=AsyncMock())
+        lock = await SeatManagementService.acquire_seats_lock(mock_redis_client)
 
+        assert lock.held
         mock_redis_client.set.assert_called_once_with(
-            "seats_lock", "locked", ex=5, nx=True
+            "seats_lock", lock.token, px=5000, nx=True
         )
+        await SeatManagementService.release_seats_lock(lock)
+
+
+@pytest.mark.usefixtures("initialize_database")
+@pytest.mark.asyncio
+async def test_acquire_seats_lock_gives_up_when_busy():
+    with patch(
+        "app.redis_client.get_redis_client", new_callable=AsyncMock
+    ) as mock_get_redis_client:
+        mock_redis_client = mock_get_redis_client.return_value
+        mock_redis_client.set.return_value = None
+
+        lock = await SeatManagementService.acquire_seats_lock(
+            mock_redis_client, timeout=0
+        )
+
+        assert lock is None
 
 
 @pytest.mark.usefixtures("initialize_database")
@@ -25,9 +44,17 @@ async def test_release_seats_lock():
         "app.redis_client.get_redis_client", new_callable=AsyncMock
     ) as mock_get_redis_client:
         mock_redis_client = mock_get_redis_client.return_value
-        await SeatManagementService.release_seats_lock(mock_redis_client)
+        mock_script = AsyncMock(return_value=1)
+        mock_redis_client.register_script = MagicMock(return_value=mock_script)
+        lock = await SeatManagementService.acquire_seats_lock(mock_redis_client)
 
-        mock_redis_client.delete.assert_called_once_with("seats_lock")
+        await SeatManagementService.release_seats_lock(lock)
+
+        assert not lock.held
+        mock_script.assert_called_once_with(
+            keys=["seats_lock"], args=[lock.token, "seats_lock:released"]
+        )
+        mock_redis_client.delete.assert_not_called()
 
 
 @pytest.mark.usefixtures("initialize_database")
@@ -70,14 +97,17 @@ async def test_decrement_available_seats():
         "app.redis_client.get_redis_client", new_callable=AsyncMock
     ) as mock_get_redis_client:
         mock_redis_client = mock_get_redis_client.return_value
-        mock_redis_client.get.return_value = 10
+        mock_script = AsyncMock(return_value=6)
+        mock_redis_client.register_script = MagicMock(return_value=mock_script)
 
         party_size = 4
         await SeatManagementService.decrement_available_seats(
             mock_redis_client, party_size
         )
 
-        mock_redis_client.decrby.assert_called_once_with("available_seats", party_size)
+        mock_script.assert_called_once_with(
+            keys=["available_seats"], args=[party_size]
+        )
 
 
 @pytest.mark.usefixtures("initialize_database")
@@ -87,9 +117,147 @@ async def test_decrement_available_seats_fail_not_enough():
         "app.redis_client.get_redis_client", new_callable=AsyncMock
     ) as mock_get_redis_client:
         mock_redis_client = mock_get_redis_client.return_value
-        mock_redis_client.get.return_value = 2  # Available seats: 2
+        mock_script = AsyncMock(return_value=-1)  # Not enough seats
+        mock_redis_client.register_script = MagicMock(return_value=mock_script)
 
-        with pytest.raises(HTTPException):
+        with pytest.raises(HTTPException) as exc_info:
             await SeatManagementService.decrement_available_seats(mock_redis_client, 4)
 
-        mock_redis_client.get.assert_called_once_with("available_seats")
+        assert exc_info.value.status_code == 400
+        mock_redis_client.decrby.assert_not_called()
+
+
+@pytest.mark.usefixtures("initialize_database")
+@pytest.mark.asyncio
+async def test_reserve_seats():
+    with patch(
+        "app.redis_client.get_redis_client", new_callable=AsyncMock
+    ) as mock_get_redis_client:
+        mock_redis_client = mock_get_redis_client.return_value
+        mock_script = AsyncMock(return_value=[1, 6])
+        mock_redis_client.register_script = MagicMock(return_value=mock_script)
+
+        result = await SeatManagementService.reserve_seats(
+            mock_redis_client, "test_user_1", 4
+        )
+
+        assert result == (SeatManagementService.RESERVED, 6)
+        mock_script.assert_called_once_with(
+            keys=["available_seats", "seat_reservations"], args=["test_user_1", 4]
+        )
+
+
+@pytest.mark.usefixtures("initialize_database")
+@pytest.mark.asyncio
+async def test_release_seats():
+    with patch(
+        "app.redis_client.get_redis_client", new_callable=AsyncMock
+    ) as mock_get_redis_client:
+        mock_redis_client = mock_get_redis_client.return_value
+        mock_script = AsyncMock(return_value=4)
+        mock_redis_client.register_script = MagicMock(return_value=mock_script)
+
+        released = await SeatManagementService.release_seats(
+            mock_redis_client, "test_user_1"
+        )
+
+        assert released == 4
+        mock_script.assert_called_once_with(
+            keys=["available_seats", "seat_reservations"], args=["test_user_1"]
+        )
+
+
+@pytest.mark.usefixtures("initialize_database")
+@pytest.mark.asyncio
+async def test_reserve_parties():
+    with patch(
+        "app.redis_client.get_redis_client", new_callable=AsyncMock
+    ) as mock_get_redis_client:
+        mock_redis_client = mock_get_redis_client.return_value
+        mock_script = AsyncMock(return_value=[1, 0, -1])
+        mock_redis_client.register_script = MagicMock(return_value=mock_script)
+
+        statuses = await SeatManagementService.reserve_parties(
+            mock_redis_client, [("user_1", 4), ("user_2", 2), ("user_3", 6)]
+        )
+
+        assert statuses == [
+            SeatManagementService.RESERVED,
+            SeatManagementService.ALREADY_RESERVED,
+            SeatManagementService.INSUFFICIENT_SEATS,
+        ]
+        mock_script.assert_called_once_with(
+            keys=["available_seats", "seat_reservations"],
+            args=["user_1", 4, "user_2", 2, "user_3", 6],
+        )
+
+
+@pytest.mark.usefixtures("initialize_database")
+@pytest.mark.asyncio
+async def test_seat_keys_are_per_venue():
+    with patch(
+        "app.redis_client.get_redis_client", new_callable=AsyncMock
+    ) as mock_get_redis_client:
+        mock_redis_client = mock_get_redis_client.return_value
+        mock_script = AsyncMock(return_value=[1, 6])
+        mock_redis_client.register_script = MagicMock(return_value=mock_script)
+
+        await SeatManagementService.reserve_seats(
+            mock_redis_client, "test_user_1", 4, venue_id="venue_2"
+        )
+        lock = await SeatManagementService.acquire_seats_lock(
+            mock_redis_client, "venue_2"
+        )
+
+        mock_script.assert_called_once_with(
+            keys=["available_seats:venue_2", "seat_reservations:venue_2"],
+            args=["test_user_1", 4],
+        )
+        mock_redis_client.set.assert_called_once_with(
+            "seats_lock:venue_2", lock.token, px=5000, nx=True
+        )
+        mock_script.return_value = 1
+        await SeatManagementService.release_seats_lock(lock)
+
+
+@pytest.mark.asyncio
+async def test_reserve_seats_twice_is_a_no_op(fake_redis):
+    await fake_redis.set("available_seats", 10)
+
+    first = await SeatManagementService.reserve_seats(fake_redis, "test_user_1", 4)
+    second = await SeatManagementService.reserve_seats(fake_redis, "test_user_1", 4)
+
+    assert first == (SeatManagementService.RESERVED, 6)
+    assert second == (SeatManagementService.ALREADY_RESERVED, 6)
+    assert await fake_redis.hgetall("seat_reservations") == {"test_user_1": "4"}
+
+    oversized = await SeatManagementService.reserve_seats(fake_redis, "test_user_2", 7)
+    assert oversized == (SeatManagementService.INSUFFICIENT_SEATS, 6)
+
+
+@pytest.mark.asyncio
+async def test_reserve_parties_skips_held_and_oversized_parties(fake_redis):
+    await fake_redis.set("available_seats", 6)
+    await SeatManagementService.reserve_seats(fake_redis, "test_user_1", 2)
+
+    statuses = await SeatManagementService.reserve_parties(
+        fake_redis, [("test_user_1", 2), ("test_user_2", 5), ("test_user_3", 3)]
+    )
+
+    assert statuses == [
+        SeatManagementService.ALREADY_RESERVED,
+        SeatManagementService.INSUFFICIENT_SEATS,
+        SeatManagementService.RESERVED,
+    ]
+    assert await fake_redis.get("available_seats") == "1"
+
+
+@pytest.mark.asyncio
+async def test_release_seats_returns_seats_once(fake_redis):
+    await fake_redis.set("available_seats", 10)
+    await SeatManagementService.reserve_seats(fake_redis, "test_user_1", 4)
+
+    assert await SeatManagementService.release_seats(fake_redis, "test_user_1") == 4
+    assert await SeatManagementService.release_seats(fake_redis, "test_user_1") == 0
+    assert await fake_redis.get("available_seats") == "10"
+    assert await fake_redis.hlen("seat_reservations") == 0
@@ -0,0 +1,97 @@
+import pytest
+from app.services.seating_policy import (
+    StrictFifoPolicy,
+    SkipAheadPolicy,
+    BestFitPolicy,
+    get_seating_policy,
+)
+
+
+def make_parties(*sizes):
+    return [{"_id": f"user_{i}", "party_size": size} for i, size in enumerate(sizes)]
+
+
+def ids(parties):
+    return [party["_id"] for party in parties]
+
+
+def test_strict_fifo_stops_at_first_party_that_does_not_fit():
+    parties = make_parties(3, 6, 2)
+
+    assert ids(StrictFifoPolicy().select(parties, 8)) == ["user_0"]
+
+
+def test_skip_ahead_seats_smaller_parties_behind():
+    parties = make_parties(3, 6, 2, 1)
+
+    assert ids(SkipAheadPolicy(max_skips=1, max_skip_wait=900).select(parties, 6)) == [
+        "user_0",
+        "user_2",
+        "user_3",
+    ]
+
+
+def test_skip_ahead_respects_skip_bound():
+    parties = make_parties(8, 9, 2)
+
+    assert SkipAheadPolicy(max_skips=1, max_skip_wait=900).select(parties, 5) == []
+    assert ids(SkipAheadPolicy(max_skips=2, max_skip_wait=900).select(parties, 5)) == [
+        "user_2"
+    ]
+
+
+def test_skip_ahead_stops_jumping_parties_that_waited_too_long():
+    parties = [
+        {**party, "joined_at": 1000.0 + i}
+        for i, party in enumerate(make_parties(8, 2, 9, 1))
+    ]
+    policy = SkipAheadPolicy(max_skips=3, max_skip_wait=600)
+
+    assert ids(policy.select(parties, 5, now=1500.0)) == ["user_1", "user_3"]
+    # The head has now waited past the limit: nobody behind it is seated
+    assert policy.select(parties, 5, now=1600.0) == []
+
+
+def test_best_fit_fills_the_most_seats():
+    parties = make_parties(4, 5, 3, 2)
+
+    chosen = BestFitPolicy(max_skip_wait=900).select(parties, 10)
+
+    assert sum(party["party_size"] for party in chosen) == 10
+    assert ids(chosen) == ["user_1", "user_2", "user_3"]
+
+
+def test_best_fit_prefers_older_parties_on_ties():
+    parties = make_parties(2, 2, 2)
+
+    assert ids(BestFitPolicy(max_skip_wait=900).select(parties, 4)) == [
+        "user_0",
+        "user_1",
+    ]
+
+
+def test_best_fit_eventually_seats_a_large_party_at_the_head():
+    def run(policy):
+        queue = [{"_id": "large", "party_size": 8, "joined_at": 0.0}]
+        available = 0
+        for now in range(0, 3600, 60):
+            # Two seats free up and a small party joins every minute
+            available += 2
+            queue.append(
+                {"_id": f"small_{now}", "party_size": 2, "joined_at": float(now)}
+            )
+            chosen = policy.select(queue, available, now=float(now))
+            available -= sum(party["party_size"] for party in chosen)
+            queue = [party for party in queue if party not in chosen]
+            if any(party["_id"] == "large" for party in chosen):
+                return now
+        return None
+
+    assert run(BestFitPolicy(max_skip_wait=float("inf"))) is None
+    # From 600s seats are held for it, and 8 are free three minutes later
+    assert run(BestFitPolicy(max_skip_wait=600)) == 780
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        get_seating_policy("random")
@@ -0,0 +1,60 @@
+import pytest
+from socketio import packet
+from app.serialization import (
+    OrjsonSocketJson,
+    client_party,
+    party_message,
+    socketio_serializer_options,
+)
+
+
+def make_party():
+    return {
+        "_id": "test_user_1",
+        "venue_id": "default",
+        "name": "Test Party",
+        "party_size": 4,
+        "status": "ready",
+        "created_at": "2024-01-01T00:00:00+00:00",
+        "seating_pass": "0f8e6c1a",
+    }
+
+
+def test_client_party_keeps_client_fields_only():
+    assert client_party(make_party()) == {
+        "_id": "test_user_1",
+        "name": "Test Party",
+        "party_size": 4,
+        "status": "ready",
+    }
+
+
+def test_party_message_trims_party():
+    message = party_message(make_party(), "ready")
+
+    assert message["status"] == "ready"
+    assert "venue_id" not in message["party"]
+    assert "seating_pass" not in message["party"]
+
+
+def test_orjson_socket_packets_round_trip():
+    original = packet.Packet.json
+    try:
+        packet.Packet.json = OrjsonSocketJson
+        message = party_message(make_party(), "ready")
+        encoded = packet.Packet(
+            packet.EVENT, data=["user_message", message], namespace="/"
+        ).encode()
+
+        decoded = packet.Packet(encoded_packet=encoded)
+        assert decoded.data == ["user_message", message]
+    finally:
+        packet.Packet.json = original
+
+
+def test_socketio_serializer_options():
+    assert socketio_serializer_options("json") == {}
+    assert socketio_serializer_options("orjson") == {"json": OrjsonSocketJson}
+    assert socketio_serializer_options("msgpack") == {"serializer": "msgpack"}
+    with pytest.raises(ValueError):
+        socketio_serializer_options("xml")
@@ -0,0 +1,49 @@
+import pytest
+from app.queue_feed import ADMIN_NAMESPACE
+from app.socket_io import setup_socketio_events
+from unittest.mock import patch
+
+
+class FakeServer:
+    """
+    Records the handlers registered on it, keyed by (event, namespace).
+    """
+
+    def __init__(self):
+        self.handlers = {}
+
+    def event(self, handler):
+        self.handlers[(handler.__name__, "/")] = handler
+        return handler
+
+    def on(self, event, namespace="/"):
+        def register(handler):
+            self.handlers[(event, namespace)] = handler
+            return handler
+
+        return register
+
+
+async def admin_connect():
+    sio = FakeServer()
+    await setup_socketio_events(sio)
+    return sio.handlers[("connect", ADMIN_NAMESPACE)]
+
+
+@pytest.mark.asyncio
+async def test_admin_connect_refused_without_configured_token():
+    connect = await admin_connect()
+
+    with patch("app.socket_io.settings.ADMIN_FEED_TOKEN", ""):
+        assert await connect("sid", {}, {"token": ""}) is False
+        assert await connect("sid", {}, None) is False
+
+
+@pytest.mark.asyncio
+async def test_admin_connect_checks_token():
+    connect = await admin_connect()
+
+    with patch("app.socket_io.settings.ADMIN_FEED_TOKEN", "secret"):
+        assert await connect("sid", {}, {"token": "wrong"}) is False
+        assert await connect("sid", {}, None) is False
+        assert await connect("sid", {}, {"token": "secret"}) is None
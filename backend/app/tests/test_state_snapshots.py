@@ -0,0 +1,180 @@
+import pytest
+from app.queue_feed import QUEUE_EVENTS_KEY
+from app.serialization import dumps, loads
+from app.state_snapshots import (
+    QUEUE_STATE_SNAPSHOT_KEY,
+    StateSnapshotter,
+    active_parties,
+    apply_entries,
+    empty_state,
+)
+from unittest.mock import AsyncMock, MagicMock
+
+
+def make_entry(seq, venue_id, event_type, party=None, seats=4):
+    event = {"type": event_type}
+    if party:
+        event["party"] = party
+    return f"{seq}-0", {"venue": venue_id, "seats": str(seats), "event": dumps(event)}
+
+
+def waiting(party_id, created_at="2024-01-01T00:00:00+00:00"):
+    return {
+        "_id": party_id,
+        "party_size": 2,
+        "status": "waiting",
+        "created_at": created_at,
+    }
+
+
+def test_apply_entries_follows_transitions():
+    state = empty_state()
+    apply_entries(
+        state,
+        [
+            make_entry(1, "default", "joined", waiting("test_user_1"), seats=4),
+            make_entry(2, "default", "joined", waiting("test_user_2"), seats=4),
+            make_entry(
+                3, "default", "ready", {"_id": "test_user_1", "status": "ready"}
+            ),
+            make_entry(
+                4,
+                "default",
+                "checked_in",
+                {"_id": "test_user_1", "status": "checked_in", "started_at": "x"},
+                seats=2,
+            ),
+            make_entry(5, "default", "completed", {"_id": "test_user_2"}, seats=2),
+            make_entry(6, "venue_2", "seats", seats=7),
+        ],
+    )
+
+    assert state == {
+        "seq": 6,
+        "venues": {
+            "default": {
+                "available_seats": 2,
+                "parties": {
+                    "test_user_1": {
+                        **waiting("test_user_1"),
+                        "status": "checked_in",
+                        "started_at": "x",
+                    }
+                },
+            },
+            "venue_2": {"available_seats": 7, "parties": {}},
+        },
+    }
+
+
+def test_apply_entries_skips_changes_already_applied():
+    state = empty_state(seq=5)
+
+    apply_entries(state, [make_entry(5, "default", "joined", waiting("test_user_1"))])
+
+    assert state == empty_state(seq=5)
+
+
+def test_active_parties_are_oldest_first_with_venue():
+    state = empty_state()
+    apply_entries(
+        state,
+        [
+            make_entry(1, "venue_2", "joined", waiting("later", "2024-01-02")),
+            make_entry(2, "default", "joined", waiting("earlier", "2024-01-01")),
+        ],
+    )
+
+    parties = active_parties(state)
+
+    assert [(party["_id"], party["venue_id"]) for party in parties] == [
+        ("earlier", "default"),
+        ("later", "venue_2"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_load_applies_log_tail_to_snapshot():
+    snapshotter = StateSnapshotter()
+    snapshot = empty_state(seq=3)
+    snapshot["venues"]["default"] = {
+        "available_seats": 4,
+        "parties": {"test_user_1": waiting("test_user_1")},
+    }
+    redis_client = AsyncMock()
+    # Snapshot, then the current sequence checked by can_resume
+    redis_client.get.side_effect = [dumps(snapshot).decode(), "4"]
+    tail = [make_entry(4, "default", "completed", {"_id": "test_user_1"}, seats=6)]
+    # Oldest logged change for can_resume, then the tail in pages
+    redis_client.xrange.side_effect = [tail, tail, []]
+
+    state = await snapshotter.load(redis_client)
+
+    assert state == {
+        "seq": 4,
+        "venues": {"default": {"available_seats": 6, "parties": {}}},
+    }
+    redis_client.get.assert_any_call(QUEUE_STATE_SNAPSHOT_KEY)
+    assert redis_client.xrange.call_args_list[1].args == (QUEUE_EVENTS_KEY,)
+    assert redis_client.xrange.call_args_list[1].kwargs["min"] == "4-0"
+
+
+@pytest.mark.asyncio
+async def test_load_gives_up_when_log_was_trimmed():
+    snapshotter = StateSnapshotter()
+    redis_client = AsyncMock()
+    redis_client.get.side_effect = [dumps(empty_state(seq=3)).decode(), "10"]
+    # The oldest change still logged is 6, so 4 and 5 are lost
+    redis_client.xrange.return_value = [make_entry(6, "default", "seats")]
+
+    assert await snapshotter.load(redis_client) is None
+
+
+@pytest.mark.asyncio
+async def test_restore_reads_database_without_snapshot():
+    snapshotter = StateSnapshotter()
+    redis_client = AsyncMock()
+    # No snapshot, then the sequence and the venue's free seats
+    redis_client.get.side_effect = [None, "8", "3"]
+
+    async def find(query, sort):
+        yield {**waiting("test_user_1"), "venue_id": "venue_2", "seating_pass": "x"}
+
+    collection = MagicMock()
+    collection.find = find
+
+    state = await snapshotter.restore(redis_client, collection)
+
+    assert state == {
+        "seq": 8,
+        "venues": {
+            "venue_2": {
+                "available_seats": 3,
+                "parties": {"test_user_1": waiting("test_user_1")},
+            }
+        },
+    }
+
+
+@pytest.mark.asyncio
+async def test_take_stores_snapshot_from_database():
+    snapshotter = StateSnapshotter()
+    redis_client = AsyncMock()
+    redis_client.get.return_value = "2"
+
+    async def find(query, sort):
+        assert query == {"status": {"$in": ["waiting", "ready", "checked_in"]}}
+        return
+        yield
+
+    collection = MagicMock()
+    collection.find = find
+
+    await snapshotter.take(redis_client, collection)
+
+    key, raw = redis_client.set.call_args.args
+    assert key == QUEUE_STATE_SNAPSHOT_KEY
+    stored = loads(raw)
+    assert stored["seq"] == 2
+    assert stored["venues"] == {}
+    assert "taken_at" in stored
@@ -0,0 +1,185 @@
+import pytest
+from app.services.seat_management_service import SeatManagementService, seat_capacity
+from app.services.table_service import (
+    INITIALIZE_TABLES_SCRIPT,
+    RELEASE_TABLES_SCRIPT,
+    SEAT_AT_TABLES_SCRIPT,
+    TableService,
+    validate_tables,
+)
+from app.services.waitlist_queue_service import WaitlistQueueService
+from unittest.mock import AsyncMock, MagicMock, patch
+
+TABLES = {
+    "venue_2": [
+        {"id": "t1", "capacity": 2},
+        {"id": "t2", "capacity": 4, "group": "patio"},
+        {"id": "t3", "capacity": 4, "group": "patio"},
+    ]
+}
+
+TABLE_KEYS = [
+    "tables:venue_2",
+    "free_tables:venue_2",
+    "free_table_groups:venue_2",
+    "free_group_capacity:venue_2",
+]
+
+
+def make_redis(script_result):
+    redis_client = AsyncMock()
+    script = AsyncMock(return_value=script_result)
+    redis_client.register_script = MagicMock(return_value=script)
+    return redis_client, script
+
+
+def test_seat_capacity_sums_tables():
+    with patch("app.config.settings.VENUE_TABLES", TABLES):
+        assert seat_capacity("venue_2") == 10
+
+
+@pytest.mark.parametrize(
+    "tables",
+    [
+        [{"id": "t1", "capacity": 2}, {"id": "t1", "capacity": 4}],
+        [{"id": "t1,t2", "capacity": 2}],
+        [{"id": "t1", "capacity": 0}],
+        [{"id": "t1", "capacity": 2, "group": "patio:east"}],
+    ],
+)
+def test_validate_tables_rejects_bad_tables(tables):
+    with pytest.raises(ValueError):
+        validate_tables(tables)
+
+
+@pytest.mark.asyncio
+async def test_initialize_loads_tables():
+    redis_client, script = make_redis(10)
+
+    with patch("app.config.settings.VENUE_TABLES", TABLES):
+        total = await TableService.initialize(redis_client, "venue_2")
+
+    assert total == 10
+    redis_client.register_script.assert_called_once_with(INITIALIZE_TABLES_SCRIPT)
+    script.assert_called_once_with(
+        keys=[*TABLE_KEYS, "table_assignments:venue_2"],
+        args=["t1", 2, "", "t2", 4, "patio", "t3", 4, "patio"],
+    )
+
+
+@pytest.mark.asyncio
+async def test_seat_allocates_tables():
+    # 6 seats reserved: a table of 4 for the first party, one of 2 for the third
+    redis_client, script = make_redis([6, 1, -1, 1])
+    parties = [
+        {"_id": "test_user_1", "party_size": 3},
+        {"_id": "test_user_2", "party_size": 9},
+        {"_id": "test_user_3", "party_size": 2},
+    ]
+
+    with (
+        patch("app.config.settings.VENUE_TABLES", TABLES),
+        patch(
+            "app.durability_manager.DurabilityManager.record", new_callable=AsyncMock
+        ) as mock_record,
+    ):
+        statuses = await WaitlistQueueService.seat(redis_client, "venue_2", parties)
+
+    assert statuses == [
+        WaitlistQueueService.SEATED,
+        WaitlistQueueService.INSUFFICIENT_SEATS,
+        WaitlistQueueService.SEATED,
+    ]
+    redis_client.register_script.assert_called_once_with(SEAT_AT_TABLES_SCRIPT)
+    script.assert_called_once_with(
+        keys=[
+            "available_seats:venue_2",
+            "seat_reservations:venue_2",
+            "waitlist_queue:venue_2",
+            "waitlist_party_sizes:venue_2",
+            *TABLE_KEYS,
+            "table_assignments:venue_2",
+        ],
+        args=[0, "test_user_1", "test_user_2", "test_user_3"],
+    )
+    mock_record.assert_called_once_with(redis_client, -6, venue_id="venue_2")
+
+
+@pytest.mark.asyncio
+async def test_release_frees_tables():
+    redis_client, script = make_redis(4)
+
+    with (
+        patch("app.config.settings.VENUE_TABLES", TABLES),
+        patch(
+            "app.durability_manager.DurabilityManager.record", new_callable=AsyncMock
+        ),
+    ):
+        released = await SeatManagementService.release_seats(
+            redis_client, "test_user_1", "venue_2"
+        )
+
+    assert released == 4
+    redis_client.register_script.assert_called_once_with(RELEASE_TABLES_SCRIPT)
+    script.assert_called_once_with(
+        keys=[
+            "available_seats:venue_2",
+            "seat_reservations:venue_2",
+            *TABLE_KEYS,
+            "table_assignments:venue_2",
+        ],
+        args=["test_user_1"],
+    )
+
+
+async def table_indexes(redis_client):
+    tables, free, groups, group_capacity = TABLE_KEYS
+    return {
+        "free_tables": await redis_client.zrange(free, 0, -1, withscores=True),
+        "free_table_groups": await redis_client.zrange(groups, 0, -1),
+        "free_group_capacity": await redis_client.zrange(
+            group_capacity, 0, -1, withscores=True
+        ),
+    }
+
+
+@pytest.mark.asyncio
+async def test_allocate_then_release_restores_free_indexes(fake_redis):
+    parties = [
+        {
+            "_id": f"test_user_{size}",
+            "venue_id": "venue_2",
+            "party_size": size,
+            "created_at": "2026-01-01T12:00:00+00:00",
+        }
+        for size in (2, 5)
+    ]
+
+    with patch("app.config.settings.VENUE_TABLES", TABLES):
+        total = await TableService.initialize(fake_redis, "venue_2")
+        await fake_redis.set("available_seats:venue_2", total)
+        initial = await table_indexes(fake_redis)
+        await WaitlistQueueService.enqueue_many(fake_redis, parties)
+
+        statuses = await WaitlistQueueService.seat(fake_redis, "venue_2", parties)
+
+        assert statuses == [WaitlistQueueService.SEATED] * 2
+        assert await fake_redis.hgetall("table_assignments:venue_2") == {
+            "test_user_2": "t1",
+            "test_user_5": "t3,t2",
+        }
+        assert await table_indexes(fake_redis) == {
+            "free_tables": [],
+            "free_table_groups": [],
+            "free_group_capacity": [("patio", 0.0)],
+        }
+        assert await fake_redis.get("available_seats:venue_2") == "0"
+
+        for party in parties:
+            await SeatManagementService.release_seats(
+                fake_redis, party["_id"], "venue_2"
+            )
+
+    assert await table_indexes(fake_redis) == initial
+    assert await fake_redis.get("available_seats:venue_2") == str(total)
+    assert await fake_redis.hlen("table_assignments:venue_2") == 0
@@ -0,0 +1,177 @@
+from datetime import datetime, timezone
+from app.config import settings
+from app.serialization import dumps
+from app.wait_time_estimator import WaitTimeEstimator, _VenueState
+
+NOW = 1000.0
+
+
+def make_estimator(push_threshold=60.0):
+    return WaitTimeEstimator(
+        push_threshold=push_threshold, push_debounce=1.0, granularity=1.0
+    )
+
+
+def make_party(user_id, party_size, status="waiting", venue_id="default"):
+    return {
+        "_id": user_id,
+        "venue_id": venue_id,
+        "name": f"Party {user_id}",
+        "party_size": party_size,
+        "status": status,
+    }
+
+
+def make_entry(seq, event_type, party=None, venue_id="default"):
+    event = {"type": event_type}
+    if party is not None:
+        event["party"] = {
+            field: value for field, value in party.items() if field != "venue_id"
+        }
+    return f"{seq}-0", {"venue": venue_id, "seats": "0", "event": dumps(event)}
+
+
+def test_estimates_follow_queue_order():
+    estimator = make_estimator()
+    for i, size in enumerate([4, 4, 4]):
+        estimator.party_joined(make_party(f"user_{i}", size))
+
+    first = estimator.estimate("user_0", now=NOW)
+    third = estimator.estimate("user_2", now=NOW)
+
+    assert first == {"position": 1, "estimated_ready_at": NOW}
+    assert third["position"] == 3
+    # 2 seats short; 10 seats turn over every 4 * SERVICE_TIME_PER_PERSON
+    expected = NOW + 2 / (10 / (settings.SERVICE_TIME_PER_PERSON * 4))
+    assert third["estimated_ready_at"] == round(expected)
+    assert estimator.estimates("default", now=NOW)["user_2"] == third
+
+
+def test_estimates_use_completion_schedule():
+    estimator = make_estimator()
+    estimator.party_checked_in(make_party("seated", 6, "checked_in"), NOW + 30)
+    estimator.party_joined(make_party("user_0", 4))
+    estimator.party_joined(make_party("user_1", 4))
+
+    assert estimator.estimate("user_0", now=NOW)["estimated_ready_at"] == NOW
+    assert estimator.estimate("user_1", now=NOW)["estimated_ready_at"] == NOW + 30
+
+    estimator.party_left("seated")
+    assert estimator.estimate("user_1", now=NOW)["estimated_ready_at"] == NOW
+
+
+def test_seating_updates_positions():
+    estimator = make_estimator()
+    for i in range(3):
+        estimator.party_joined(make_party(f"user_{i}", 2))
+
+    estimator.parties_seated("default", [make_party("user_1", 2)])
+
+    assert estimator.estimate("user_1", now=NOW) is None
+    assert estimator.estimate("user_2", now=NOW)["position"] == 2
+
+
+def test_venue_state_compacts_slots():
+    venue = _VenueState(capacity=10, initial_slots=2)
+    for i in range(5):
+        venue.add_waiting(make_party(f"user_{i}", i + 1))
+        if i % 2:
+            venue.remove_waiting(f"user_{i - 1}")
+
+    assert list(venue.waiting) == ["user_1", "user_3", "user_4"]
+    entry = venue.waiting["user_4"]
+    assert venue.counts.prefix(entry.slot) == 3
+    assert venue.seats.prefix(entry.slot) == 2 + 4 + 5
+
+
+def test_changed_estimates_respect_threshold():
+    estimator = make_estimator(push_threshold=60.0)
+    estimator.party_joined(make_party("user_0", 10))
+    estimator.party_joined(make_party("user_1", 4))
+
+    assert [
+        party["_id"] for party, _ in estimator.changed_estimates("default", NOW)
+    ] == [
+        "user_0",
+        "user_1",
+    ]
+    assert estimator.changed_estimates("default", NOW + 10) == []
+
+    # A long service ahead of the queue moves user_1 by minutes
+    estimator.parties_seated("default", [make_party("user_0", 10)])
+    estimator.party_checked_in(make_party("user_0", 10, "checked_in"), NOW + 600)
+    changed = estimator.changed_estimates("default", NOW)
+    assert [party["_id"] for party, _ in changed] == ["user_1"]
+    assert changed[0][1] == {"position": 1, "estimated_ready_at": NOW + 600}
+
+
+def test_load_rebuilds_state():
+    estimator = make_estimator()
+    started_at = datetime.fromtimestamp(NOW, timezone.utc).isoformat()
+    estimator.load(
+        [
+            {**make_party("seated", 8, "checked_in"), "started_at": started_at},
+            make_party("ready", 2, "ready"),
+            make_party("user_0", 3),
+            make_party("other", 2, venue_id="venue_1"),
+        ]
+    )
+
+    estimate = estimator.estimate("user_0", now=NOW)
+    assert estimate["position"] == 1
+    # The ready party frees 2 seats first; the third comes from the 8-seat party
+    assert estimate["estimated_ready_at"] == NOW + settings.SERVICE_TIME_PER_PERSON * 8
+    assert estimator.estimate("other", now=NOW) == {
+        "position": 1,
+        "estimated_ready_at": NOW,
+    }
+
+
+def test_apply_follows_event_log():
+    estimator = make_estimator()
+    started_at = datetime.fromtimestamp(NOW, timezone.utc).isoformat()
+    estimator.load([], seq=3)
+
+    estimator.apply(
+        [
+            make_entry(3, "joined", make_party("old", 2)),
+            make_entry(4, "joined", make_party("seated", 8)),
+            make_entry(5, "joined", make_party("user_0", 4)),
+            make_entry(6, "ready", make_party("seated", 8, "ready")),
+            make_entry(7, "seats"),
+            make_entry(
+                8,
+                "checked_in",
+                {**make_party("seated", 8, "checked_in"), "started_at": started_at},
+            ),
+        ]
+    )
+
+    assert estimator.seq == 8
+    assert not estimator.stale
+    # Entries at or before the loaded sequence number are already reflected
+    assert estimator.estimate("old", now=NOW) is None
+    assert estimator.estimate("user_0", now=NOW) == {
+        "position": 1,
+        "estimated_ready_at": NOW + settings.SERVICE_TIME_PER_PERSON * 8,
+    }
+
+    estimator.apply([make_entry(9, "completed", make_party("seated", 8, "completed"))])
+    assert estimator.estimate("user_0", now=NOW)["estimated_ready_at"] == NOW
+
+    # Replays change nothing
+    estimator.apply([make_entry(5, "joined", make_party("user_0", 4))])
+    assert estimator.estimates("default", now=NOW)["user_0"]["position"] == 1
+
+
+def test_apply_marks_gaps_stale():
+    estimator = make_estimator()
+    estimator.load([], seq=3)
+
+    estimator.apply([make_entry(6, "joined", make_party("user_0", 2))])
+
+    assert estimator.stale
+    assert estimator.estimate("user_0", now=NOW)["position"] == 1
+
+    estimator.load([], seq=6)
+    assert not estimator.stale
@@ -0,0 +1,358 @@
+import pytest
+from datetime import datetime, timezone
+from app.config import settings
+from app.services.seat_management_service import AVAILABLE_SEATS_KEY, venue_key
+from app.services.table_service import FREE_TABLES_KEY, TableService
+from app.services.waitlist_queue_service import WaitlistQueueService, queue_score
+from app.state_snapshots import empty_state
+from unittest.mock import AsyncMock, MagicMock, patch
+
+
+def make_redis(script_result):
+    redis_client = AsyncMock()
+    script = AsyncMock(return_value=script_result)
+    redis_client.register_script = MagicMock(return_value=script)
+    return redis_client, script
+
+
+@pytest.mark.asyncio
+async def test_enqueue():
+    redis_client, script = make_redis(1)
+    created_at = datetime.now(timezone.utc).isoformat()
+
+    added = await WaitlistQueueService.enqueue(
+        redis_client,
+        {
+            "_id": "test_user_1",
+            "venue_id": "venue_2",
+            "party_size": 4,
+            "created_at": created_at,
+        },
+    )
+
+    assert added is True
+    script.assert_called_once_with(
+        keys=["waitlist_queue:venue_2", "waitlist_party_sizes:venue_2"],
+        args=["test_user_1", queue_score(created_at), 4],
+    )
+
+
+@pytest.mark.asyncio
+async def test_enqueue_many_groups_by_venue():
+    redis_client, script = make_redis(2)
+    created_at = datetime.now(timezone.utc).isoformat()
+    parties = [
+        {"_id": "test_user_1", "venue_id": "default", "party_size": 4},
+        {"_id": "test_user_2", "venue_id": "venue_2", "party_size": 2},
+        {"_id": "test_user_3", "venue_id": "default", "party_size": 3},
+    ]
+
+    added = await WaitlistQueueService.enqueue_many(
+        redis_client, [{**party, "created_at": created_at} for party in parties]
+    )
+
+    score = queue_score(created_at)
+    assert added == 4
+    assert script.call_args_list[0].kwargs == {
+        "keys": ["waitlist_queue", "waitlist_party_sizes"],
+        "args": ["test_user_1", score, 4, "test_user_3", score, 3],
+    }
+    assert script.call_args_list[1].kwargs == {
+        "keys": ["waitlist_queue:venue_2", "waitlist_party_sizes:venue_2"],
+        "args": ["test_user_2", score, 2],
+    }
+
+
+@pytest.mark.asyncio
+async def test_peek():
+    redis_client, script = make_redis(
+        [6, "test_user_1", 4, "1000.5", "test_user_2", 2, "1001"]
+    )
+
+    available, parties = await WaitlistQueueService.peek(redis_client, "default", 50)
+
+    assert available == 6
+    assert parties == [
+        {
+            "_id": "test_user_1",
+            "party_size": 4,
+            "status": "waiting",
+            "joined_at": 1000.5,
+        },
+        {
+            "_id": "test_user_2",
+            "party_size": 2,
+            "status": "waiting",
+            "joined_at": 1001.0,
+        },
+    ]
+    script.assert_called_once_with(
+        keys=["available_seats", "waitlist_queue", "waitlist_party_sizes"],
+        args=[50],
+    )
+
+
+@pytest.mark.asyncio
+async def test_peek_initializes_seats():
+    redis_client, script = make_redis(None)
+    script.side_effect = [[-1], [10]]
+
+    with patch(
+        "app.services.seat_management_service.SeatManagementService.initialize_seats",
+        new_callable=AsyncMock,
+    ) as mock_initialize_seats:
+        available, parties = await WaitlistQueueService.peek(
+            redis_client, "venue_2", 50
+        )
+
+    mock_initialize_seats.assert_called_once_with(redis_client, "venue_2")
+    assert (available, parties) == (10, [])
+
+
+@pytest.mark.asyncio
+async def test_seat_records_reserved_seats():
+    redis_client, script = make_redis([1, -2, -1])
+    parties = [
+        {"_id": "test_user_1", "party_size": 4},
+        {"_id": "test_user_2", "party_size": 2},
+        {"_id": "test_user_3", "party_size": 6},
+    ]
+
+    with patch(
+        "app.durability_manager.DurabilityManager.record", new_callable=AsyncMock
+    ) as mock_record:
+        statuses = await WaitlistQueueService.seat(redis_client, "default", parties)
+
+    assert statuses == [
+        WaitlistQueueService.SEATED,
+        WaitlistQueueService.NOT_QUEUED,
+        WaitlistQueueService.INSUFFICIENT_SEATS,
+    ]
+    script.assert_called_once_with(
+        keys=[
+            "available_seats",
+            "seat_reservations",
+            "waitlist_queue",
+            "waitlist_party_sizes",
+        ],
+        args=["test_user_1", "test_user_2", "test_user_3"],
+    )
+    mock_record.assert_called_once_with(redis_client, -4, venue_id="default")
+
+
+@pytest.mark.usefixtures("initialize_database")
+@pytest.mark.asyncio
+async def test_reconcile(mock_db):
+    created_at = datetime.now(timezone.utc).isoformat()
+    for user_id in ["queued", "missing", "seated"]:
+        await mock_db.insert_one(
+            {
+                "_id": user_id,
+                "venue_id": "default",
+                "party_size": 2,
+                "status": "waiting",
+                "created_at": created_at,
+            }
+        )
+
+    async def scan_iter(match):
+        yield "waitlist_queue"
+
+    redis_client = AsyncMock()
+    redis_client.scan_iter = scan_iter
+    redis_client.zrange.return_value = ["queued", "stale"]
+    redis_client.hexists.side_effect = lambda key, party_id: party_id == "seated"
+
+    with (
+        patch.object(
+            WaitlistQueueService, "enqueue", new_callable=AsyncMock
+        ) as mock_enqueue,
+        patch.object(
+            WaitlistQueueService, "dequeue", new_callable=AsyncMock
+        ) as mock_dequeue,
+    ):
+        to_mark_ready = await WaitlistQueueService.reconcile(redis_client, mock_db)
+
+    assert to_mark_ready == {"default": ["seated"]}
+    mock_enqueue.assert_called_once()
+    assert mock_enqueue.call_args.args[1]["_id"] == "missing"
+    mock_dequeue.assert_called_once_with(redis_client, "default", ["stale"])
+
+
+@pytest.mark.usefixtures("initialize_database")
+@pytest.mark.asyncio
+async def test_reconcile_stops_when_fence_raises(mock_db):
+    await mock_db.insert_one(
+        {
+            "_id": "missing",
+            "venue_id": "default",
+            "party_size": 2,
+            "status": "waiting",
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        }
+    )
+
+    async def scan_iter(match):
+        yield "waitlist_queue"
+
+    redis_client = AsyncMock()
+    redis_client.scan_iter = scan_iter
+    redis_client.zrange.return_value = ["stale"]
+    fence = AsyncMock(side_effect=RuntimeError("term ended"))
+
+    with (
+        patch.object(
+            WaitlistQueueService, "enqueue", new_callable=AsyncMock
+        ) as mock_enqueue,
+        patch.object(
+            WaitlistQueueService, "dequeue", new_callable=AsyncMock
+        ) as mock_dequeue,
+        pytest.raises(RuntimeError),
+    ):
+        await WaitlistQueueService.reconcile(redis_client, mock_db, fence=fence)
+
+    fence.assert_awaited_once()
+    mock_enqueue.assert_not_called()
+    mock_dequeue.assert_not_called()
+
+
+@pytest.mark.usefixtures("initialize_database")
+@pytest.mark.asyncio
+async def test_reconcile_from_log_keeps_parties_mongo_still_has_waiting(mock_db):
+    created_at = datetime.now(timezone.utc).isoformat()
+    for user_id, status in [("unlogged", "waiting"), ("seated", "ready")]:
+        await mock_db.insert_one(
+            {
+                "_id": user_id,
+                "venue_id": "default",
+                "party_size": 2,
+                "status": status,
+                "created_at": created_at,
+            }
+        )
+
+    async def scan_iter(match):
+        yield "waitlist_queue"
+
+    redis_client = AsyncMock()
+    redis_client.scan_iter = scan_iter
+    redis_client.zrange.return_value = ["unlogged", "seated"]
+
+    with (
+        patch(
+            "app.services.waitlist_queue_service.state_snapshotter.restore",
+            new_callable=AsyncMock,
+            return_value=empty_state(),
+        ),
+        patch.object(
+            WaitlistQueueService, "dequeue", new_callable=AsyncMock
+        ) as mock_dequeue,
+    ):
+        await WaitlistQueueService.reconcile(redis_client, mock_db, from_log=True)
+
+    mock_dequeue.assert_called_once_with(redis_client, "default", ["seated"])
+
+
+def make_queued_party(party_id, party_size, venue_id="default"):
+    return {
+        "_id": party_id,
+        "venue_id": venue_id,
+        "party_size": party_size,
+        "status": "waiting",
+        "created_at": "2026-01-01T12:00:00+00:00",
+    }
+
+
+@pytest.mark.asyncio
+async def test_seat_drops_requeued_party_that_holds_seats(fake_redis):
+    await fake_redis.set("available_seats", 10)
+    party = make_queued_party("test_user_1", 4)
+    await WaitlistQueueService.enqueue(fake_redis, party)
+    assert await WaitlistQueueService.seat(fake_redis, "default", [party]) == [
+        WaitlistQueueService.SEATED
+    ]
+
+    # A repair queues it again before MongoDB has marked it ready
+    await WaitlistQueueService.enqueue(fake_redis, party)
+    statuses = await WaitlistQueueService.seat(fake_redis, "default", [party])
+
+    assert statuses == [WaitlistQueueService.ALREADY_SEATED]
+    assert await fake_redis.get("available_seats") == "6"
+    assert await fake_redis.hgetall("seat_reservations") == {"test_user_1": "4"}
+    assert await fake_redis.zcard("waitlist_queue") == 0
+    assert await fake_redis.hlen("waitlist_party_sizes") == 0
+
+
+@pytest.mark.asyncio
+async def test_seat_at_tables_drops_requeued_party_that_holds_seats(fake_redis):
+    tables = {"venue_t": [{"id": "t1", "capacity": 4}, {"id": "t2", "capacity": 4}]}
+    party = make_queued_party("test_user_1", 4, "venue_t")
+
+    with patch.object(settings, "VENUE_TABLES", tables):
+        total = await TableService.initialize(fake_redis, "venue_t")
+        await fake_redis.set(venue_key(AVAILABLE_SEATS_KEY, "venue_t"), total)
+        await WaitlistQueueService.enqueue(fake_redis, party)
+        await WaitlistQueueService.seat(fake_redis, "venue_t", [party])
+
+        await WaitlistQueueService.enqueue(fake_redis, party)
+        statuses = await WaitlistQueueService.seat(fake_redis, "venue_t", [party])
+
+    assert statuses == [WaitlistQueueService.ALREADY_SEATED]
+    assert await fake_redis.get(venue_key(AVAILABLE_SEATS_KEY, "venue_t")) == "4"
+    assert await fake_redis.hlen(TableService.assignments_key("venue_t")) == 1
+    assert await fake_redis.zcard(venue_key(FREE_TABLES_KEY, "venue_t")) == 1
+
+
+@pytest.mark.asyncio
+async def test_queue_scripts_enqueue_peek_and_seat(fake_redis):
+    await fake_redis.set("available_seats", 6)
+    first = make_queued_party("test_user_1", 4)
+    second = {
+        **make_queued_party("test_user_2", 4),
+        "created_at": "2026-01-01T12:01:00+00:00",
+    }
+    third = {
+        **make_queued_party("test_user_3", 2),
+        "created_at": "2026-01-01T12:02:00+00:00",
+    }
+
+    assert await WaitlistQueueService.enqueue(fake_redis, first) is True
+    assert await WaitlistQueueService.enqueue(fake_redis, first) is False
+    assert await WaitlistQueueService.enqueue_many(fake_redis, [third, second]) == 2
+
+    available, parties = await WaitlistQueueService.peek(fake_redis, "default", 2)
+    assert available == 6
+    assert parties == [
+        {
+            "_id": "test_user_1",
+            "party_size": 4,
+            "status": "waiting",
+            "joined_at": queue_score(first["created_at"]),
+        },
+        {
+            "_id": "test_user_2",
+            "party_size": 4,
+            "status": "waiting",
+            "joined_at": queue_score(second["created_at"]),
+        },
+    ]
+
+    statuses = await WaitlistQueueService.seat(
+        fake_redis, "default", [first, second, third]
+    )
+    assert statuses == [
+        WaitlistQueueService.SEATED,
+        WaitlistQueueService.INSUFFICIENT_SEATS,
+        WaitlistQueueService.SEATED,
+    ]
+    assert await fake_redis.get("available_seats") == "0"
+    assert await fake_redis.hgetall("seat_reservations") == {
+        "test_user_1": "4",
+        "test_user_3": "2",
+    }
+    assert await fake_redis.zrange("waitlist_queue", 0, -1) == ["test_user_2"]
+
+    # Another pass that picked the same parties finds them gone
+    assert await WaitlistQueueService.seat(fake_redis, "default", [first]) == [
+        WaitlistQueueService.NOT_QUEUED
+    ]
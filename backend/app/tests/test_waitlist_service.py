@@ -1,7 +1,9 @@
 import pytest
 from unittest.mock import AsyncMock, patch, ANY
 from datetime import datetime, timezone
+from fastapi import HTTPException
 from app.services.waitlist_service import WaitlistService
+from app.wait_time_estimator import wait_time_estimator
 
 
 @pytest.mark.usefixtures("initialize_database")
@@ -18,6 +20,7 @@ async def test_add_to_waitlist(mock_db, patch_dependencies):
 
         await WaitlistService.add_to_waitlist(name_1, party_size_1, user_id_1)
 
+        patch_dependencies["enqueue"].assert_called_once_with(ANY, ANY)
         result = await mock_db.find_one({"_id": user_id_1})
 
         assert result is not None
@@ -42,6 +45,125 @@ async def test_add_to_waitlist(mock_db, patch_dependencies):
     assert result["status"] == "ready"
 
 
+@pytest.mark.usefixtures("initialize_database")
+@pytest.mark.asyncio
+async def test_add_parties_to_waitlist(mock_db, patch_dependencies):
+    await mock_db.insert_one(
+        {
+            "_id": "test_user_1",
+            "venue_id": "default",
+            "name": "Existing Party",
+            "party_size": 2,
+            "status": "checked_in",
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        }
+    )
+
+    response = await WaitlistService.add_parties_to_waitlist(
+        [
+            {"name": "Test Party 1", "party_size": 2, "user_id": "test_user_1"},
+            {"name": "Test Party 2", "party_size": 4, "user_id": "test_user_2"},
+            {"name": "Test Party 3", "party_size": 11, "user_id": "test_user_3"},
+            {"name": "Test Party 4", "party_size": 3, "user_id": "test_user_2"},
+            {"name": "Test Party 5", "party_size": 6, "user_id": "test_user_5"},
+        ]
+    )
+
+    assert [result["status"] for result in response["results"]] == [
+        "duplicate",
+        "added",
+        "invalid",
+        "duplicate",
+        "added",
+    ]
+    assert response["added"] == 2
+    assert response["duplicate"] == 2
+    assert response["invalid"] == 1
+    (queued,) = patch_dependencies["enqueue_many"].call_args.args[1:]
+    assert [party["_id"] for party in queued] == ["test_user_2", "test_user_5"]
+    assert queued[0]["created_at"] < queued[1]["created_at"]
+    # One readiness pass seats both parties
+    assert (await mock_db.find_one({"_id": "test_user_2"}))["status"] == "ready"
+    assert (await mock_db.find_one({"_id": "test_user_5"}))["status"] == "ready"
+    assert (await mock_db.find_one({"_id": "test_user_1"}))["status"] == "checked_in"
+    patch_dependencies["notify_parties"].assert_called_once()
+
+
+@pytest.mark.usefixtures("initialize_database")
+@pytest.mark.asyncio
+async def test_add_parties_to_waitlist_rejects_oversized_batch(mock_db):
+    parties = [{"name": "Party", "party_size": 2, "user_id": "test_user_1"}] * 3
+
+    with patch("app.config.settings.BULK_INGEST_MAX_PARTIES", 2):
+        with pytest.raises(HTTPException) as exc_info:
+            await WaitlistService.add_parties_to_waitlist(parties)
+
+    assert exc_info.value.status_code == 413
+
+
+def test_validate_party_size_is_limited_by_venue_capacity():
+    with patch("app.config.settings.VENUE_SEATS", {"venue_2": 6}):
+        WaitlistService.validate_party_size(10)
+        WaitlistService.validate_party_size(6, "venue_2")
+        with pytest.raises(HTTPException) as exc_info:
+            WaitlistService.validate_party_size(7, "venue_2")
+        assert exc_info.value.detail == "Party size must be between 1 and 6"
+
+        with pytest.raises(HTTPException):
+            WaitlistService.validate_bulk_party(
+                {"name": "Party", "party_size": 8, "user_id": "test_user_1"},
+                "venue_2",
+            )
+        WaitlistService.validate_bulk_party(
+            {
+                "name": "Party",
+                "party_size": 8,
+                "user_id": "test_user_1",
+                "venue_id": "default",
+            },
+            "venue_2",
+        )
+
+
+def test_validate_party_size_is_limited_by_largest_table_or_group():
+    tables = [
+        {"id": "t1", "capacity": 4},
+        {"id": "t2", "capacity": 2, "group": "patio"},
+        {"id": "t3", "capacity": 3, "group": "patio"},
+        {"id": "t4", "capacity": 2},
+    ]
+    with patch("app.config.settings.VENUE_TABLES", {"venue_2": tables}):
+        WaitlistService.validate_party_size(5, "venue_2")
+        with pytest.raises(HTTPException) as exc_info:
+            WaitlistService.validate_party_size(6, "venue_2")
+        assert exc_info.value.detail == "Party size must be between 1 and 5"
+
+
+@pytest.mark.usefixtures("initialize_database")
+@pytest.mark.asyncio
+async def test_add_to_waitlist_rejects_unsafe_venue_ids(mock_db, patch_dependencies):
+    with pytest.raises(HTTPException) as exc_info:
+        await WaitlistService.add_to_waitlist("Party", 2, "test_user_1", "../x")
+    assert exc_info.value.status_code == 400
+
+    with pytest.raises(HTTPException) as exc_info:
+        await WaitlistService.add_parties_to_waitlist([], "a/b")
+    assert exc_info.value.status_code == 400
+
+    response = await WaitlistService.add_parties_to_waitlist(
+        [
+            {
+                "name": "Test Party 1",
+                "party_size": 2,
+                "user_id": "test_user_1",
+                "venue_id": "../../somewhere",
+            }
+        ]
+    )
+    assert response["results"][0]["status"] == "invalid"
+    assert await mock_db.count_documents({}) == 0
+
+
 @pytest.mark.usefixtures("initialize_database")
 @pytest.mark.asyncio
 async def test_get_party_status(mock_db):
@@ -50,6 +172,7 @@ async def test_get_party_status(mock_db):
     await mock_db.insert_one(
         {
             "_id": user_id,
+            "venue_id": "default",
             "name": "Test Party",
             "party_size": 4,
             "status": "waiting",
@@ -63,6 +186,30 @@ async def test_get_party_status(mock_db):
     assert result["party"]["_id"] == user_id
 
 
+@pytest.mark.usefixtures("initialize_database")
+@pytest.mark.asyncio
+async def test_get_party_status_includes_wait_estimate(mock_db):
+    party = {
+        "_id": "test_user_eta",
+        "venue_id": "default",
+        "name": "Test Party",
+        "party_size": 4,
+        "status": "waiting",
+        "created_at": datetime.now(timezone.utc).isoformat(),
+    }
+    await mock_db.insert_one(party)
+    wait_time_estimator.load([party])
+
+    try:
+        result = await WaitlistService.get_party_status("test_user_eta")
+    finally:
+        wait_time_estimator.load([])
+
+    assert result["status"] == "waiting"
+    assert result["wait"]["position"] == 1
+    assert result["wait"]["estimated_ready_at"] is not None
+
+
 @pytest.mark.usefixtures("initialize_database")
 @pytest.mark.asyncio
 async def test_check_queue_readiness(mock_db, patch_dependencies):
@@ -71,6 +218,7 @@ async def test_check_queue_readiness(mock_db, patch_dependencies):
     await mock_db.insert_one(
         {
             "_id": user_id_1,
+            "venue_id": "default",
             "name": "Test Party 1",
             "party_size": 4,
             "status": "waiting",
@@ -95,6 +243,7 @@ async def test_check_queue_readiness(mock_db, patch_dependencies):
     await mock_db.insert_one(
         {
             "_id": user_id_2,
+            "venue_id": "default",
             "name": "Test Party 2",
             "party_size": 4,
             "status": "waiting",
@@ -103,12 +252,105 @@ async def test_check_queue_readiness(mock_db, patch_dependencies):
     )
 
     await WaitlistService.check_queue_readiness()
-    notify_party_status = patch_dependencies["notify_party_status"]
-    notify_party_status.assert_called_with(user_id_2, ANY, "ready")
+    notify_parties = patch_dependencies["notify_parties"]
+    notify_parties.assert_called_once()
+    ready_parties, status = notify_parties.call_args.args
+    assert [party["_id"] for party in ready_parties] == [user_id_2]
+    assert status == "ready"
     party = await mock_db.find_one({"_id": user_id_2})
     assert party["status"] == "ready"
 
 
+@pytest.mark.usefixtures("initialize_database")
+@pytest.mark.asyncio
+async def test_check_queue_readiness_seats_multiple_parties(mock_db, patch_dependencies):
+    for i, party_size in enumerate([4, 3, 2]):
+        await mock_db.insert_one(
+            {
+                "_id": f"test_user_{i}",
+                "venue_id": "default",
+                "name": f"Test Party {i}",
+                "party_size": party_size,
+                "status": "waiting",
+                "created_at": datetime.now(timezone.utc).isoformat(),
+            }
+        )
+
+    with patch(
+        "app.services.seat_management_service.SeatManagementService.get_available_seats",
+        return_value=7,
+    ):
+        seated = await WaitlistService.check_queue_readiness()
+
+    assert seated == 2
+    seat = patch_dependencies["seat"]
+    seat.assert_called_once()
+    _, venue_id, chosen = seat.call_args.args
+    assert venue_id == "default"
+    assert [party["_id"] for party in chosen] == ["test_user_0", "test_user_1"]
+    notify_parties = patch_dependencies["notify_parties"]
+    ready_parties, status = notify_parties.call_args.args
+    assert [party["_id"] for party in ready_parties] == ["test_user_0", "test_user_1"]
+    assert status == "ready"
+    ready = await mock_db.find({"status": "ready"}).to_list(length=None)
+    assert sorted(party["_id"] for party in ready) == ["test_user_0", "test_user_1"]
+    party = await mock_db.find_one({"_id": "test_user_2"})
+    assert party["status"] == "waiting"
+
+
+@pytest.mark.usefixtures("initialize_database")
+@pytest.mark.asyncio
+async def test_check_queue_readiness_is_per_venue(mock_db, patch_dependencies):
+    for venue_id in ["venue_1", "venue_2"]:
+        await mock_db.insert_one(
+            {
+                "_id": f"user_at_{venue_id}",
+                "venue_id": venue_id,
+                "name": "Test Party",
+                "party_size": 4,
+                "status": "waiting",
+                "created_at": datetime.now(timezone.utc).isoformat(),
+            }
+        )
+
+    seated = await WaitlistService.check_queue_readiness("venue_1")
+
+    assert seated == 1
+    patch_dependencies["get_available_seats"].assert_called_with(ANY, "venue_1")
+    seat = patch_dependencies["seat"]
+    seat.assert_called_once_with(
+        ANY,
+        "venue_1",
+        [{"_id": "user_at_venue_1", "party_size": 4, "status": "waiting"}],
+        in_order=True,
+    )
+    party = await mock_db.find_one({"_id": "user_at_venue_2"})
+    assert party["status"] == "waiting"
+    assert await WaitlistService.get_waiting_venues() == ["venue_2"]
+
+
+@pytest.mark.usefixtures("initialize_database")
+@pytest.mark.asyncio
+async def test_get_queue_depths_counts_active_parties(mock_db):
+    await mock_db.insert_many(
+        [
+            {"_id": "test_user_1", "venue_id": "default", "status": "waiting"},
+            {"_id": "test_user_2", "venue_id": "default", "status": "waiting"},
+            {"_id": "test_user_3", "venue_id": "venue_2", "status": "checked_in"},
+            {"_id": "test_user_4", "venue_id": "venue_3", "status": "completed"},
+        ]
+    )
+
+    assert await WaitlistService.get_queue_depths() == {
+        ("default", "waiting"): 2,
+        ("default", "ready"): 0,
+        ("default", "checked_in"): 0,
+        ("venue_2", "waiting"): 0,
+        ("venue_2", "ready"): 0,
+        ("venue_2", "checked_in"): 1,
+    }
+
+
 @pytest.mark.usefixtures("initialize_database")
 @pytest.mark.asyncio
 async def test_check_in_party(mock_db, patch_dependencies):
@@ -117,6 +359,7 @@ async def test_check_in_party(mock_db, patch_dependencies):
     await mock_db.insert_one(
         {
             "_id": user_id,
+            "venue_id": "default",
             "name": "Test Party",
             "party_size": 4,
             "status": "ready",
@@ -125,28 +368,60 @@ async def test_check_in_party(mock_db, patch_dependencies):
     )
 
     with patch(
-        "app.services.waitlist_service.WaitlistService.simulate_service",
+        "app.completion_scheduler.CompletionScheduler.schedule",
         new_callable=AsyncMock,
-    ) as mock_simulate_service:
+    ) as mock_schedule:
         await WaitlistService.check_in_party(user_id)
 
         party = await mock_db.find_one({"_id": user_id})
         assert party["status"] == "checked_in"
         assert "started_at" in party
 
-        mock_simulate_service.assert_called_once_with(mock_db, ANY, party)
+        mock_schedule.assert_called_once_with(ANY, user_id, ANY)
         notify_party_status = patch_dependencies["notify_party_status"]
         notify_party_status.assert_called_with(user_id, ANY, "checked_in")
 
 
 @pytest.mark.usefixtures("initialize_database")
 @pytest.mark.asyncio
-async def test_simulate_service(mock_db, patch_dependencies):
+async def test_check_in_party_requires_ready_status(mock_db, patch_dependencies):
+    await mock_db.insert_one(
+        {
+            "_id": "test_user_1",
+            "venue_id": "default",
+            "name": "Test Party",
+            "party_size": 4,
+            "status": "waiting",
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        }
+    )
+
+    with patch(
+        "app.completion_scheduler.CompletionScheduler.schedule",
+        new_callable=AsyncMock,
+    ) as mock_schedule:
+        with pytest.raises(HTTPException) as exc_info:
+            await WaitlistService.check_in_party("test_user_1")
+        assert exc_info.value.status_code == 409
+
+        with pytest.raises(HTTPException) as exc_info:
+            await WaitlistService.check_in_party("unknown_user")
+        assert exc_info.value.status_code == 404
+
+    mock_schedule.assert_not_called()
+    party = await mock_db.find_one({"_id": "test_user_1"})
+    assert party["status"] == "waiting"
+
+
+@pytest.mark.usefixtures("initialize_database")
+@pytest.mark.asyncio
+async def test_complete_service(mock_db, patch_dependencies):
     user_id = "test_user_1"
 
     await mock_db.insert_one(
         {
             "_id": user_id,
+            "venue_id": "default",
             "name": "Test Party",
             "party_size": 4,
             "status": "checked_in",
@@ -156,13 +431,17 @@ async def test_simulate_service(mock_db, patch_dependencies):
     )
 
     redis_client = patch_dependencies["redis_client"]
-    increment_seats = patch_dependencies["increment_seats"]
+    release_seats = patch_dependencies["release_seats"]
+    notify_party_status = patch_dependencies["notify_party_status"]
 
-    party = await mock_db.find_one({"_id": user_id})
-    await WaitlistService.simulate_service(mock_db, redis_client, party)
+    await WaitlistService.complete_service(mock_db, redis_client, user_id)
     updated_party = await mock_db.find_one({"_id": user_id})
 
     assert updated_party["status"] == "completed"
     assert "completed_at" in updated_party
+    release_seats.assert_called_once_with(redis_client, user_id, "default")
+    notify_party_status.assert_called_once_with(user_id, ANY, "completed")
 
-    increment_seats.assert_called_once_with(redis_client, party["party_size"])
+    # A repeated completion does not notify again
+    await WaitlistService.complete_service(mock_db, redis_client, user_id)
+    assert notify_party_status.call_count == 1
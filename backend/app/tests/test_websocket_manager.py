@@ -0,0 +1,132 @@
+import asyncio
+import pytest
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+from app.websocket_manager import WebSocketManager, FANOUT_CHANNEL, user_room
+
+
+@pytest.mark.asyncio
+async def test_save_and_remove_user_connection():
+    manager = WebSocketManager()
+    sio = AsyncMock()
+
+    await manager.save_user_connection(sio, "sid_1", "user_1")
+    await manager.save_user_connection(sio, "sid_2", "user_1")
+    await manager.save_user_connection(sio, "sid_3", "user_2")
+
+    assert manager.user_connections == {"user_1": {"sid_1", "sid_2"}, "user_2": {"sid_3"}}
+    assert manager.sid_users["sid_2"] == "user_1"
+    sio.enter_room.assert_any_call("sid_2", user_room("user_1"))
+
+    await manager.remove_user_connection(sio, "sid_1")
+    await manager.remove_user_connection(sio, "sid_3")
+    await manager.remove_user_connection(sio, "unknown_sid")
+
+    assert manager.user_connections == {"user_1": {"sid_2"}}
+    assert manager.sid_users == {"sid_2": "user_1"}
+
+
+@pytest.mark.asyncio
+async def test_send_to_user_publishes_to_other_workers():
+    manager = WebSocketManager()
+    sio = AsyncMock()
+    manager._redis = AsyncMock()
+    message = {"status": "ready"}
+
+    await manager.save_user_connection(sio, "sid_1", "user_1")
+    await manager.save_user_connection(sio, "sid_2", "user_1")
+    await manager.send_to_user(sio, "user_1", message)
+
+    # One emit to the user's room covers every SID
+    sio.emit.assert_called_once_with("user_message", message, room=user_room("user_1"))
+    channel, data = manager._redis.publish.call_args.args
+    assert channel == FANOUT_CHANNEL
+    assert json.loads(data) == {"node": manager.node_id, "messages": {"user_1": message}}
+
+
+@pytest.mark.asyncio
+async def test_send_to_users_without_fanout_stays_local():
+    manager = WebSocketManager()
+    sio = AsyncMock()
+    manager._redis = AsyncMock()
+
+    await manager.save_user_connection(sio, "sid_1", "user_1")
+    await manager.send_to_users(sio, {"user_1": {"status": "waiting"}}, fanout=False)
+
+    sio.emit.assert_called_once()
+    manager._redis.publish.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_send_to_users_emits_once_per_local_user():
+    manager = WebSocketManager(emit_concurrency=2)
+    sio = AsyncMock()
+
+    for i in range(5):
+        await manager.save_user_connection(sio, f"sid_{i}", f"user_{i}")
+    messages = {f"user_{i}": {"status": "ready"} for i in range(6)}
+
+    await manager.send_to_users(sio, messages)
+
+    rooms = sorted(call.kwargs["room"] for call in sio.emit.call_args_list)
+    assert rooms == [user_room(f"user_{i}") for i in range(5)]
+
+
+@pytest.mark.asyncio
+async def test_fanout_message_delivered_only_from_other_nodes():
+    manager = WebSocketManager()
+    sio = AsyncMock()
+    message = {"status": "ready"}
+    await manager.save_user_connection(sio, "sid_1", "user_1")
+
+    own = json.dumps({"node": manager.node_id, "messages": {"user_1": message}})
+    await manager.handle_fanout_message(sio, own)
+    sio.emit.assert_not_called()
+
+    other = json.dumps({"node": "other_node", "messages": {"user_1": message}})
+    await manager.handle_fanout_message(sio, other)
+    sio.emit.assert_called_once_with("user_message", message, room=user_room("user_1"))
+
+
+class FakePubSub:
+    def __init__(self, items, error=None):
+        self.items, self.error = items, error
+        self.subscribe = AsyncMock()
+        self.aclose = AsyncMock()
+
+    async def listen(self):
+        for item in self.items:
+            yield item
+        if self.error:
+            raise self.error
+        # Stay subscribed
+        await asyncio.Event().wait()
+
+
+@pytest.mark.asyncio
+async def test_fanout_listener_skips_failed_messages_and_resubscribes():
+    manager = WebSocketManager()
+    sio = AsyncMock()
+    message = {"status": "ready"}
+    await manager.save_user_connection(sio, "sid_1", "user_1")
+    delivered = asyncio.Event()
+    sio.emit.side_effect = lambda *args, **kwargs: delivered.set()
+
+    other = json.dumps({"node": "other_node", "messages": {"user_1": message}})
+    first = FakePubSub(
+        [{"data": json.dumps({"node": "other_node"})}, {"data": other}],
+        error=ConnectionError("connection reset"),
+    )
+    second = FakePubSub([{"data": other}])
+    redis_client = MagicMock()
+    redis_client.pubsub.side_effect = [first, second]
+
+    with patch("app.websocket_manager.FANOUT_RETRY_SECONDS", 0):
+        await manager.start_fanout(sio, redis_client)
+        while sio.emit.call_count < 2:
+            delivered.clear()
+            await asyncio.wait_for(delivered.wait(), timeout=1)
+        await manager.stop_fanout()
+
+    first.aclose.assert_called_once()
+    second.subscribe.assert_called_once_with(FANOUT_CHANNEL)
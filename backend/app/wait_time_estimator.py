@@ -0,0 +1,397 @@
+from app.config import settings
+from app.serialization import client_party, loads
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger("WaitTimeEstimator")
+
+
+class _Fenwick:
+    """
+    Prefix sums over queue slots with O(log n) updates and queries.
+    """
+
+    def __init__(self, size: int):
+        self._tree = [0] * (size + 1)
+
+    @property
+    def size(self) -> int:
+        return len(self._tree) - 1
+
+    def add(self, index: int, delta: int) -> None:
+        tree = self._tree
+        while index < len(tree):
+            tree[index] += delta
+            index += index & -index
+
+    def prefix(self, index: int) -> int:
+        tree = self._tree
+        total = 0
+        while index > 0:
+            total += tree[index]
+            index -= index & -index
+        return total
+
+
+class _Waiting:
+    __slots__ = ("slot", "size", "party", "pushed_eta")
+
+    def __init__(self, slot: int, party: Dict):
+        self.slot = slot
+        self.size = party["party_size"]
+        self.party = client_party(party)
+        self.pushed_eta: Optional[float] = None
+
+
+class _VenueState:
+    """
+    One venue's queue and seat holders.
+
+    Waiting parties get increasing slots in join order; two Fenwick trees
+    over the slots give each party's position and the seats demanded up to
+    and including it. Seated parties (ready or checked in) are kept with
+    their release time; there are never more of them than the venue has
+    seats.
+    """
+
+    def __init__(self, capacity: int, initial_slots: int = 1024):
+        self.capacity = capacity
+        self.waiting: "OrderedDict[str, _Waiting]" = OrderedDict()
+        self.counts = _Fenwick(initial_slots)
+        self.seats = _Fenwick(initial_slots)
+        self.next_slot = 1
+        self.waiting_seats = 0
+        self.waiting_seats_squared = 0
+        # party_id -> (party_size, release time, or None while not checked in)
+        self.seated: Dict[str, Tuple[int, Optional[float]]] = {}
+
+    def add_waiting(self, party: Dict) -> None:
+        if self.next_slot > self.counts.size:
+            self._compact()
+        entry = _Waiting(self.next_slot, party)
+        self.next_slot += 1
+        self.waiting[party["_id"]] = entry
+        self.counts.add(entry.slot, 1)
+        self.seats.add(entry.slot, entry.size)
+        self.waiting_seats += entry.size
+        self.waiting_seats_squared += entry.size * entry.size
+
+    def remove_waiting(self, party_id: str) -> Optional[_Waiting]:
+        entry = self.waiting.pop(party_id, None)
+        if entry is not None:
+            self.counts.add(entry.slot, -1)
+            self.seats.add(entry.slot, -entry.size)
+            self.waiting_seats -= entry.size
+            self.waiting_seats_squared -= entry.size * entry.size
+        return entry
+
+    def _compact(self) -> None:
+        """
+        Renumber the waiting parties from slot 1 into trees sized for growth.
+        Slots only run out after as many joins as the trees hold, so the
+        O(n) rebuild is amortized across them.
+        """
+        size = max(1024, 2 * len(self.waiting))
+        self.counts = _Fenwick(size)
+        self.seats = _Fenwick(size)
+        for slot, entry in enumerate(self.waiting.values(), start=1):
+            entry.slot = slot
+            self.counts.add(slot, 1)
+            self.seats.add(slot, entry.size)
+        self.next_slot = len(self.waiting) + 1
+
+    def supply(self, now: float) -> Tuple[int, List[Tuple[float, int]], float]:
+        """
+        Seats free now, the known seat releases in time order, and the seat
+        turnover rate once those are used up.
+        """
+        held = 0
+        releases = []
+        for size, due_at in self.seated.values():
+            held += size
+            if due_at is None:
+                due_at = now + settings.SERVICE_TIME_PER_PERSON * size
+            releases.append((max(due_at, now), size))
+        releases.sort()
+
+        # A party of size s holds s seats for s * SERVICE_TIME_PER_PERSON, so
+        # seats turn over at capacity / (SERVICE_TIME * seat-weighted size)
+        mean_size = (
+            self.waiting_seats_squared / self.waiting_seats if self.waiting_seats else 1
+        )
+        rate = self.capacity / (settings.SERVICE_TIME_PER_PERSON * mean_size or 1)
+        return max(self.capacity - held, 0), releases, rate
+
+
+def _due_at(party: Dict) -> float:
+    started_at = datetime.fromisoformat(party["started_at"]).timestamp()
+    return started_at + settings.SERVICE_TIME_PER_PERSON * party["party_size"]
+
+
+def _eta(
+    demand: int,
+    free: int,
+    releases: List[Tuple[float, int]],
+    rate: float,
+    now: float,
+) -> Optional[float]:
+    if demand <= free:
+        return now
+    needed = demand - free
+    at = now
+    for due_at, size in releases:
+        at = due_at
+        needed -= size
+        if needed <= 0:
+            return at
+    if rate <= 0:
+        return None
+    return at + needed / rate
+
+
+class WaitTimeEstimator:
+    """
+    Keeps each waiting party's queue position and estimated ready time.
+
+    Joins, seatings, check-ins and completions update per-venue state in
+    O(log n); a single party's estimate is answered in O(log n) plus the
+    venue's seated parties, which are bounded by its seat count. After a
+    burst of changes one debounced pass walks the venue's queue and pushes
+    the new estimate to the parties whose time moved by at least
+    ``push_threshold`` seconds.
+
+    State is loaded at startup from the queue state snapshot and event log,
+    then kept current by following that log: the stream the admin feed
+    reads, which carries every transition made by any worker. All workers
+    apply the same changes in the same order, so they hold the same
+    estimates and each pushes only to the parties connected to it. A worker
+    that finds entries missing from the log (trimmed while it lagged) is
+    marked ``stale`` and reloaded by the next sweep. A change whose event
+    was never logged skews estimates until the worker is reloaded.
+
+    Estimates assume parties are seated in arrival order. Under the
+    ``skip_ahead`` and ``best_fit`` policies, smaller parties can be seated
+    ahead of larger ones: their estimates then run late, and those of the
+    parties they pass run early.
+    """
+
+    def __init__(self, push_threshold: float, push_debounce: float, granularity: float):
+        self.push_threshold = push_threshold
+        self.push_debounce = push_debounce
+        self.granularity = granularity
+        self._venues: Dict[str, _VenueState] = {}
+        self._party_venues: Dict[str, str] = {}
+        self._pushes: Dict[str, asyncio.TimerHandle] = {}
+        # Running pushes, held so they are not garbage collected mid-run
+        self._push_tasks: Set[asyncio.Task] = set()
+        # Sequence number of the last event log entry applied
+        self.seq = 0
+        # Set when log entries were missed and state needs reloading
+        self.stale = False
+
+    def _venue(self, venue_id: str) -> _VenueState:
+        venue = self._venues.get(venue_id)
+        if venue is None:
+            from app.services.seat_management_service import seat_capacity
+
+            venue = self._venues[venue_id] = _VenueState(seat_capacity(venue_id))
+        return venue
+
+    def _round(self, eta: Optional[float]) -> Optional[float]:
+        if eta is None:
+            return None
+        return round(eta / self.granularity) * self.granularity
+
+    def party_joined(self, party: Dict) -> None:
+        venue_id = party.get("venue_id", settings.DEFAULT_VENUE_ID)
+        self._venue(venue_id).add_waiting(party)
+        self._party_venues[party["_id"]] = venue_id
+        self._schedule_push(venue_id)
+
+    def parties_seated(self, venue_id: str, parties: List[Dict]) -> None:
+        venue = self._venue(venue_id)
+        for party in parties:
+            venue.remove_waiting(party["_id"])
+            venue.seated[party["_id"]] = (party["party_size"], None)
+            self._party_venues[party["_id"]] = venue_id
+        self._schedule_push(venue_id)
+
+    def party_checked_in(self, party: Dict, due_at: float) -> None:
+        venue_id = party.get("venue_id", settings.DEFAULT_VENUE_ID)
+        self._venue(venue_id).seated[party["_id"]] = (party["party_size"], due_at)
+        self._party_venues[party["_id"]] = venue_id
+        self._schedule_push(venue_id)
+
+    def party_left(self, party_id: str) -> None:
+        venue_id = self._party_venues.pop(party_id, None)
+        if venue_id is None:
+            return
+        venue = self._venue(venue_id)
+        venue.remove_waiting(party_id)
+        venue.seated.pop(party_id, None)
+        self._schedule_push(venue_id)
+
+    def apply(self, entries: List) -> None:
+        """
+        Apply queue event log entries (from the queue feed stream) in order,
+        skipping those already reflected.
+        """
+        from app.queue_feed import entry_seq
+
+        for entry_id, fields in entries:
+            seq = entry_seq(entry_id)
+            if seq <= self.seq:
+                continue
+            if seq > self.seq + 1:
+                logger.warning(
+                    f"Queue event log skipped from {self.seq} to {seq}; wait-time estimates are stale."
+                )
+                self.stale = True
+            self.seq = seq
+            event = loads(fields["event"])
+            party = event.get("party")
+            if party is None:
+                continue
+            party = {**party, "venue_id": fields["venue"]}
+            if event["type"] == "joined":
+                self.party_joined(party)
+            elif event["type"] == "ready":
+                self.parties_seated(fields["venue"], [party])
+            elif event["type"] == "checked_in":
+                self.party_checked_in(party, _due_at(party))
+            elif event["type"] == "completed":
+                self.party_left(party["_id"])
+
+    def estimate(self, party_id: str, now: Optional[float] = None) -> Optional[Dict]:
+        """
+        Position and estimated ready time (epoch seconds) of a waiting party.
+        """
+        venue_id = self._party_venues.get(party_id)
+        if venue_id is None:
+            return None
+        venue = self._venues[venue_id]
+        entry = venue.waiting.get(party_id)
+        if entry is None:
+            return None
+        now = time.time() if now is None else now
+        free, releases, rate = venue.supply(now)
+        demand = venue.seats.prefix(entry.slot)
+        return {
+            "position": venue.counts.prefix(entry.slot),
+            "estimated_ready_at": self._round(_eta(demand, free, releases, rate, now)),
+        }
+
+    def estimates(self, venue_id: str, now: Optional[float] = None) -> Dict[str, Dict]:
+        """
+        Estimates for every waiting party of a venue, in one pass.
+        """
+        venue = self._venues.get(venue_id)
+        if venue is None:
+            return {}
+        now = time.time() if now is None else now
+        free, releases, rate = venue.supply(now)
+        results = {}
+        demand = 0
+        for position, (party_id, entry) in enumerate(venue.waiting.items(), start=1):
+            demand += entry.size
+            results[party_id] = {
+                "position": position,
+                "estimated_ready_at": self._round(
+                    _eta(demand, free, releases, rate, now)
+                ),
+            }
+        return results
+
+    def load(self, parties: List[Dict], seq: int = 0) -> None:
+        """
+        Rebuild all state from the active waitlist documents, oldest first,
+        as of event log sequence number ``seq``.
+        """
+        pushed = {
+            party_id: entry.pushed_eta
+            for venue in self._venues.values()
+            for party_id, entry in venue.waiting.items()
+        }
+        self._venues = {}
+        self._party_venues = {}
+        self.seq = seq
+        self.stale = False
+        for party in parties:
+            venue_id = party.get("venue_id", settings.DEFAULT_VENUE_ID)
+            venue = self._venue(venue_id)
+            self._party_venues[party["_id"]] = venue_id
+            if party["status"] == "waiting":
+                venue.add_waiting(party)
+                venue.waiting[party["_id"]].pushed_eta = pushed.get(party["_id"])
+            elif party["status"] == "ready":
+                venue.seated[party["_id"]] = (party["party_size"], None)
+            elif party["status"] == "checked_in":
+                venue.seated[party["_id"]] = (party["party_size"], _due_at(party))
+        for venue_id in self._venues:
+            self._schedule_push(venue_id)
+
+    def changed_estimates(self, venue_id: str, now: Optional[float] = None):
+        """
+        Estimates that moved by at least ``push_threshold`` since they were
+        last pushed, marking them as pushed.
+        """
+        venue = self._venues.get(venue_id)
+        if venue is None:
+            return []
+        changed = []
+        for party_id, estimate in self.estimates(venue_id, now).items():
+            eta = estimate["estimated_ready_at"]
+            entry = venue.waiting[party_id]
+            if eta is None:
+                continue
+            if (
+                entry.pushed_eta is None
+                or abs(eta - entry.pushed_eta) >= self.push_threshold
+            ):
+                entry.pushed_eta = eta
+                changed.append((entry.party, estimate))
+        return changed
+
+    def _schedule_push(self, venue_id: str) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        pending = self._pushes.get(venue_id)
+        if pending is not None and pending.when() + self.push_debounce > loop.time():
+            return
+        self._pushes[venue_id] = loop.call_later(
+            self.push_debounce, self._start_push, loop, venue_id
+        )
+
+    def _start_push(self, loop: asyncio.AbstractEventLoop, venue_id: str) -> None:
+        task = loop.create_task(self.push_changes(venue_id))
+        self._push_tasks.add(task)
+        task.add_done_callback(self._push_tasks.discard)
+
+    async def push_changes(self, venue_id: str) -> None:
+        """
+        Send updated estimates to the parties connected to this worker whose
+        wait changed meaningfully.
+        """
+        self._pushes.pop(venue_id, None)
+        changed = self.changed_estimates(venue_id)
+        if not changed:
+            return
+        from app.services.websocket_service import WebSocketService
+
+        try:
+            await WebSocketService.notify_wait_times(changed)
+        except Exception as e:
+            logger.error(f"Failed to push wait times for venue {venue_id}: {e}")
+
+
+wait_time_estimator = WaitTimeEstimator(
+    push_threshold=settings.ETA_PUSH_THRESHOLD_SECONDS,
+    push_debounce=settings.ETA_PUSH_DEBOUNCE_SECONDS,
+    granularity=settings.ETA_GRANULARITY_SECONDS,
+)
@@ -1,46 +1,186 @@
-from typing import Dict, List
+from redis.asyncio import Redis
+from app.config import settings
+from app.serialization import dumps, loads
+from app.metrics import CONNECTED_SOCKETS, NOTIFICATION_EMIT_SECONDS
+from typing import Dict, Optional, Set
+import asyncio
 import logging
+import time
+import uuid
 
 logger = logging.getLogger("WebSocketManager")
 
+# Redis channel used to fan user messages out to every worker
+FANOUT_CHANNEL = "ws:user_messages"
+# Delay before resubscribing after the fan-out connection drops, doubled on
+# each failed attempt up to the maximum
+FANOUT_RETRY_SECONDS = 0.5
+FANOUT_MAX_RETRY_SECONDS = 30.0
+
+
+def user_room(user_id: str) -> str:
+    """
+    Socket.IO room holding every connection of a user.
+    """
+    return f"user:{user_id}"
+
 
 class WebSocketManager:
-    def __init__(self):
-        # Stores list of SIDs
-        self.user_connections: Dict[str, List[str]] = {}
+    def __init__(self, emit_concurrency: int = 100):
+        # Stores set of SIDs per user, and the user owning each SID
+        self.user_connections: Dict[str, Set[str]] = {}
+        self.sid_users: Dict[str, str] = {}
+        # Identifies this process on the fan-out channel
+        self.node_id = uuid.uuid4().hex
+        self._redis: Optional[Redis] = None
+        self._listener: Optional[asyncio.Task] = None
+        # Bounds how many users are emitted to at once
+        self._emit_slots = asyncio.Semaphore(emit_concurrency)
 
     async def save_user_connection(self, sio, sid: str, user_id: str):
         """
-        Save a new connection for the given user.
+        Save a new connection for the given user and join the user's room.
         """
-        if user_id not in self.user_connections:
-            self.user_connections[user_id] = []
-        self.user_connections[user_id].append(sid)
-        logger.info(f"User {user_id} connected with SID={sid}")
+        self.user_connections.setdefault(user_id, set()).add(sid)
+        self.sid_users[sid] = user_id
+        CONNECTED_SOCKETS.inc()
+        await sio.enter_room(sid, user_room(user_id))
+        logger.info("User %s connected with SID=%s", user_id, sid)
 
     async def remove_user_connection(self, sio, sid: str):
         """
         Remove a connection for a given user.
         """
-        for user_id, sids in self.user_connections.items():
-            if sid in sids:
-                sids.remove(sid)
-                if not sids:
-                    del self.user_connections[user_id]
-                logger.info(f"Removed SID={sid} for user {user_id}")
-                break
+        user_id = self.sid_users.pop(sid, None)
+        if user_id is None:
+            return
+        CONNECTED_SOCKETS.dec()
+        sids = self.user_connections.get(user_id)
+        if sids is not None:
+            sids.discard(sid)
+            if not sids:
+                del self.user_connections[user_id]
+        logger.info("Removed SID=%s for user %s", sid, user_id)
 
     async def send_to_user(self, sio, user_id: str, message: dict):
         """
-        Send a message to all connections of the given user.
+        Send a message to all connections of the given user, on this worker
+        and, when fan-out is running, on every other worker.
+        """
+        await self.send_to_users(sio, {user_id: message})
+
+    async def send_to_users(self, sio, messages: Dict[str, dict], fanout: bool = True):
+        """
+        Send one message per user, emitting to users concurrently. Without
+        ``fanout``, only users connected to this worker are sent to.
+        """
+        await self._send_local(sio, messages)
+        if fanout and self._redis is not None:
+            try:
+                payload = {"node": self.node_id, "messages": messages}
+                await self._redis.publish(FANOUT_CHANNEL, dumps(payload))
+            except Exception as e:
+                logger.error(f"Failed to publish messages for {len(messages)} users: {e}")
+
+    async def _send_local(self, sio, messages: Dict[str, dict]):
+        local = [
+            (user_id, message)
+            for user_id, message in messages.items()
+            if user_id in self.user_connections
+        ]
+        if local:
+            await asyncio.gather(
+                *(self._emit(sio, user_id, message) for user_id, message in local)
+            )
+
+    async def _emit(self, sio, user_id: str, message: dict):
+        # One emit per user: Socket.IO encodes the packet once and writes it
+        # to every SID in the room concurrently.
+        async with self._emit_slots:
+            started = time.perf_counter()
+            try:
+                await sio.emit("user_message", message, room=user_room(user_id))
+            except Exception as e:
+                logger.error(f"Failed to send message to user {user_id}: {e}")
+            finally:
+                NOTIFICATION_EMIT_SECONDS.observe(time.perf_counter() - started)
+
+    async def start_fanout(self, sio, redis_client: Redis):
+        """
+        Subscribe to the fan-out channel so messages published by other
+        workers reach the users connected to this one.
+        """
+        if self._listener is not None:
+            return
+        pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+        await pubsub.subscribe(FANOUT_CHANNEL)
+        self._redis = redis_client
+        self._listener = asyncio.create_task(self._listen(sio, redis_client, pubsub))
+        logger.info(f"Fan-out started on {FANOUT_CHANNEL} as node {self.node_id}")
+
+    async def stop_fanout(self):
+        """
+        Stop relaying messages between workers.
+        """
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+        self._listener = None
+        self._redis = None
+
+    async def _listen(self, sio, redis_client: Redis, pubsub):
+        """
+        Relay fan-out messages until cancelled. A message that fails is
+        logged and skipped; a dropped connection is resubscribed with
+        backoff.
+        """
+        retry = FANOUT_RETRY_SECONDS
+        while True:
+            try:
+                if pubsub is None:
+                    pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+                    await pubsub.subscribe(FANOUT_CHANNEL)
+                    logger.info(f"Fan-out resubscribed to {FANOUT_CHANNEL}")
+                    retry = FANOUT_RETRY_SECONDS
+                async for item in pubsub.listen():
+                    try:
+                        await self.handle_fanout_message(sio, item["data"])
+                    except Exception as e:
+                        logger.error(f"Failed to deliver fan-out message: {e}")
+                raise ConnectionError("subscription ended")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Fan-out connection lost, retrying in {retry}s: {e}")
+            finally:
+                if pubsub is not None:
+                    try:
+                        await pubsub.aclose()
+                    except Exception:
+                        pass
+                    pubsub = None
+            await asyncio.sleep(retry)
+            retry = min(retry * 2, FANOUT_MAX_RETRY_SECONDS)
+
+    async def handle_fanout_message(self, sio, data: str):
+        """
+        Deliver a message published by another worker to local connections.
         """
-        if user_id in self.user_connections:
-            for sid in self.user_connections[user_id]:
-                try:
-                    await sio.emit("user_message", message, room=sid)
-                    logger.info(f"Message sent to user {user_id}: {message}")
-                except Exception as e:
-                    logger.error(f"Failed to send message to user {user_id}: {e}")
+        try:
+            payload = loads(data)
+        except (TypeError, ValueError) as e:
+            logger.error(f"Malformed fan-out message: {e}")
+            return
+        if payload.get("node") == self.node_id:
+            return
+        messages = payload.get("messages")
+        if not isinstance(messages, dict):
+            logger.error("Malformed fan-out message: no messages")
+            return
+        await self._send_local(sio, messages)
 
 
-websocket_manager = WebSocketManager()
+websocket_manager = WebSocketManager(emit_concurrency=settings.WS_EMIT_CONCURRENCY)
@@ -0,0 +1,118 @@
+"""
+Time to add a burst of parties to the waitlist, one by one or in bulk.
+
+``single`` calls ``add_to_waitlist`` once per party, as ``POST /waitlist``
+does, each followed by its own readiness pass. ``bulk`` sends the parties to
+``add_parties_to_waitlist`` in batches of ``--batch-size``: one unordered
+insert, one queue script per venue and one readiness pass per batch.
+Notifications are not sent.
+
+Runs against the Redis and MongoDB in the environment, or against in-memory
+fakes with ``--fakes`` (requires ``fakeredis[lua]``).
+
+    python -m benchmarks.bulk_ingest --parties 10000
+"""
+
+from unittest.mock import AsyncMock, patch
+import argparse
+import asyncio
+import logging
+import time
+
+BENCH_VENUE = "bench_bulk"
+
+
+async def reset(collection, redis_client, seats: int):
+    from app.services.seat_management_service import (
+        AVAILABLE_SEATS_KEY,
+        SEAT_RESERVATIONS_KEY,
+        venue_key,
+    )
+    from app.services.waitlist_queue_service import (
+        WAITLIST_QUEUE_KEY,
+        WAITLIST_SIZES_KEY,
+    )
+    from app.wait_time_estimator import wait_time_estimator
+
+    await collection.delete_many({"venue_id": BENCH_VENUE})
+    await redis_client.delete(
+        venue_key(SEAT_RESERVATIONS_KEY, BENCH_VENUE),
+        venue_key(WAITLIST_QUEUE_KEY, BENCH_VENUE),
+        venue_key(WAITLIST_SIZES_KEY, BENCH_VENUE),
+    )
+    await redis_client.set(venue_key(AVAILABLE_SEATS_KEY, BENCH_VENUE), seats)
+    wait_time_estimator.load([])
+
+
+def make_parties(mode: str, count: int) -> list:
+    return [
+        {
+            "name": f"Party {i}",
+            "party_size": i % 6 + 1,
+            "user_id": f"bench_{mode}_{i}",
+            "venue_id": BENCH_VENUE,
+        }
+        for i in range(count)
+    ]
+
+
+async def run(mode: str, count: int, batch_size: int) -> float:
+    from app.services.waitlist_service import WaitlistService
+
+    parties = make_parties(mode, count)
+    start = time.perf_counter()
+    if mode == "single":
+        for party in parties:
+            await WaitlistService.add_to_waitlist(**party)
+    else:
+        for i in range(0, count, batch_size):
+            response = await WaitlistService.add_parties_to_waitlist(
+                parties[i : i + batch_size]
+            )
+            assert response["added"] == len(parties[i : i + batch_size]), response
+    return time.perf_counter() - start
+
+
+async def main(args):
+    from app.database import db_manager, get_collection
+    from app.redis_client import get_redis_client
+    from app.services.websocket_service import WebSocketService
+
+    await db_manager.connect()
+    collection = await get_collection("waitlist")
+    redis_client = await get_redis_client()
+    print(f"{'mode':<8}{'parties':>10}{'seconds':>10}{'parties/s':>12}")
+    with (
+        patch.object(WebSocketService, "notify_parties", AsyncMock()),
+        patch.object(WebSocketService, "notify_wait_times", AsyncMock()),
+    ):
+        for mode in args.modes:
+            await reset(collection, redis_client, args.seats)
+            elapsed = await run(mode, args.parties, args.batch_size)
+            print(
+                f"{mode:<8}{args.parties:>10}{elapsed:>10.2f}"
+                f"{args.parties / elapsed:>12.0f}"
+            )
+    await reset(collection, redis_client, args.seats)
+    await db_manager.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--parties", type=int, default=10000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--seats", type=int, default=100)
+    parser.add_argument(
+        "--modes", nargs="+", choices=["single", "bulk"], default=["single", "bulk"]
+    )
+    parser.add_argument("--fakes", action="store_true", help="use in-memory fakes")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    if args.fakes:
+        from benchmarks.lifecycle import install_fakes
+
+        install_fakes()
+    asyncio.run(main(args))
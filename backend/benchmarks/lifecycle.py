@@ -0,0 +1,265 @@
+"""
+Load test of the full waitlist lifecycle, driven in process.
+
+Each virtual user joins the waitlist, opens a Socket.IO connection, waits to
+be told it is ready, checks in and waits for its service to complete. HTTP
+calls go through the ASGI app via httpx; sockets are attached through the
+Socket.IO server's Engine.IO entry points, with outgoing packets captured
+instead of written to a network.
+
+Runs against the Redis and MongoDB in the environment, or against in-memory
+fakes with ``--fakes`` (requires ``fakeredis[lua]``). Results are printed
+and, with ``--output``, written as JSON; ``--baseline`` compares p99s with a
+previous run and exits non-zero on regressions.
+
+    python -m benchmarks.lifecycle --users 200 --fakes --output results.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import sys
+import time
+from collections import defaultdict
+
+
+def install_fakes():
+    """
+    Point the app at in-memory MongoDB and Redis.
+    """
+    import fakeredis
+    import mongomock_motor
+    import app.database
+    import app.redis_client
+    from unittest.mock import AsyncMock
+
+    server = fakeredis.FakeServer()
+    app.database.AsyncIOMotorClient = mongomock_motor.AsyncMongoMockClient
+    app.database.db_manager.uses_index = AsyncMock(return_value=True)
+    app.redis_client.aioredis.from_url = lambda url, **kwargs: fakeredis.FakeAsyncRedis(
+        server=server, **kwargs
+    )
+
+
+def percentiles(samples: list) -> dict:
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+
+    def at(pct):
+        return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))] * 1000
+
+    return {
+        "count": len(ordered),
+        "p50_ms": at(50),
+        "p95_ms": at(95),
+        "p99_ms": at(99),
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+class VirtualSockets:
+    """
+    Attaches virtual Socket.IO clients to the server and routes the packets
+    it sends to per-user queues.
+    """
+
+    def __init__(self, sio):
+        self.sio = sio
+        self.inboxes = defaultdict(asyncio.Queue)
+        self._users = {}
+        sio.eio.send = self._capture
+        sio.eio.send_packet = self._capture_packet
+
+    async def connect(self, user_id: str):
+        eio_sid = f"eio_{user_id}"
+        self._users[eio_sid] = user_id
+        await self.sio._handle_eio_connect(eio_sid, {"QUERY_STRING": f"userId={user_id}"})
+        await self.sio._handle_eio_message(eio_sid, "0")
+
+    async def disconnect(self, user_id: str):
+        await self.sio._handle_eio_disconnect(f"eio_{user_id}")
+
+    async def wait_for(self, user_id: str, status: str) -> float:
+        while True:
+            message = await self.inboxes[user_id].get()
+            if message.get("status") == status:
+                return time.perf_counter()
+
+    async def _capture_packet(self, eio_sid, pkt):
+        await self._capture(eio_sid, pkt.data)
+
+    async def _capture(self, eio_sid, data):
+        # Socket.IO event packets look like 2["user_message",{...}]
+        if not isinstance(data, str) or not data.startswith("2"):
+            return
+        event, message = json.loads(data[data.index("["):])
+        if event == "user_message":
+            self.inboxes[self._users[eio_sid]].put_nowait(message)
+
+
+async def run(users: int, venues: int, arrival_rate: float, timeout: float) -> dict:
+    from app.main import app, sio
+    from app.services.waitlist_service import WaitlistService
+    from asgi_lifespan import LifespanManager
+    from httpx import ASGITransport, AsyncClient
+
+    endpoint_latencies = defaultdict(list)
+    notification_delays = defaultdict(list)
+    seats_freed_at = []
+    completed = 0
+
+    complete_service = WaitlistService.complete_service
+
+    async def timed_complete_service(collection, redis_client, party_id):
+        await complete_service(collection, redis_client, party_id)
+        seats_freed_at.append(time.perf_counter())
+
+    WaitlistService.complete_service = staticmethod(timed_complete_service)
+
+    async with LifespanManager(app) as manager:
+        sockets = VirtualSockets(sio)
+        async with AsyncClient(
+            transport=ASGITransport(app=manager.app), base_url="http://benchmark"
+        ) as client:
+
+            async def request(name, method, url, **kwargs):
+                start = time.perf_counter()
+                response = await client.request(method, url, **kwargs)
+                endpoint_latencies[name].append(time.perf_counter() - start)
+                response.raise_for_status()
+                return response
+
+            async def virtual_user(index: int):
+                nonlocal completed
+                user_id = f"vu_{index}"
+                await asyncio.sleep(random.expovariate(arrival_rate) if arrival_rate else 0)
+                await sockets.connect(user_id)
+
+                joined_at = time.perf_counter()
+                ready = asyncio.create_task(sockets.wait_for(user_id, "ready"))
+                await request(
+                    "join",
+                    "POST",
+                    f"/api/v1/venues/venue_{index % venues}/waitlist",
+                    json={
+                        "name": f"Party {index}",
+                        "party_size": random.randint(1, 6),
+                        "user_id": user_id,
+                    },
+                )
+                ready_at = await ready
+                # Delay from the latest event that could have seated us
+                trigger = max([joined_at] + [t for t in seats_freed_at if t <= ready_at])
+                notification_delays["ready"].append(ready_at - trigger)
+                notification_delays["join_to_ready"].append(ready_at - joined_at)
+
+                await request("status", "GET", f"/api/v1/waitlist/{user_id}/status")
+
+                done = asyncio.create_task(sockets.wait_for(user_id, "completed"))
+                await request("check_in", "POST", f"/api/v1/waitlist/{user_id}/check-in")
+                await done
+                await sockets.disconnect(user_id)
+                completed += 1
+
+            start = time.perf_counter()
+            try:
+                await asyncio.wait_for(
+                    asyncio.gather(*(virtual_user(i) for i in range(users))), timeout
+                )
+            finally:
+                elapsed = time.perf_counter() - start
+                WaitlistService.complete_service = staticmethod(complete_service)
+
+    return {
+        "users": users,
+        "venues": venues,
+        "completed": completed,
+        "elapsed_s": elapsed,
+        "throughput_per_s": completed / elapsed,
+        "endpoints": {name: percentiles(samples) for name, samples in endpoint_latencies.items()},
+        "notifications": {name: percentiles(samples) for name, samples in notification_delays.items()},
+    }
+
+
+def regressions(results: dict, baseline: dict, tolerance: float) -> list:
+    found = []
+    for section in ("endpoints", "notifications"):
+        for name, stats in baseline.get(section, {}).items():
+            current = results[section].get(name, {})
+            if "p99_ms" in stats and current.get("p99_ms", 0) > stats["p99_ms"] * (1 + tolerance):
+                found.append(f"{section}.{name} p99 {current['p99_ms']:.1f}ms > {stats['p99_ms']:.1f}ms")
+    return found
+
+
+def print_results(results: dict):
+    print(
+        f"{results['completed']}/{results['users']} users in {results['elapsed_s']:.1f}s "
+        f"({results['throughput_per_s']:.1f}/s)"
+    )
+    print(f"{'':<16}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for section in ("endpoints", "notifications"):
+        for name, stats in results[section].items():
+            if stats["count"]:
+                print(
+                    f"{name:<16}{stats['count']:>8}{stats['p50_ms']:>10.1f}"
+                    f"{stats['p95_ms']:>10.1f}{stats['p99_ms']:>10.1f}"
+                )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument(
+        "--venues", type=int, default=1, help="spread users across this many venues"
+    )
+    parser.add_argument(
+        "--arrival-rate",
+        type=float,
+        default=50.0,
+        help="mean joins per second; 0 joins everyone at once",
+    )
+    parser.add_argument(
+        "--service-time", type=float, default=0.05, help="seconds of service per person"
+    )
+    parser.add_argument("--seats", type=int, default=None, help="seats per venue")
+    parser.add_argument("--timeout", type=float, default=300.0)
+    parser.add_argument("--fakes", action="store_true", help="use in-memory MongoDB and Redis")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="JSON results to compare p99 latencies against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed p99 regression, as a fraction")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--log-level", default="WARNING")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    if args.fakes:
+        install_fakes()
+
+    import app.main  # noqa: F401  (configures logging)
+    from app.config import settings
+
+    logging.getLogger().setLevel(args.log_level)
+    settings.SERVICE_TIME_PER_PERSON = args.service_time
+    if args.seats is not None:
+        settings.AVAILABLE_SEATS = args.seats
+
+    results = asyncio.run(run(args.users, args.venues, args.arrival_rate, args.timeout))
+    print_results(results)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            found = regressions(results, json.load(f), args.tolerance)
+        for line in found:
+            print(f"REGRESSION {line}")
+        sys.exit(1 if found else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Event loop stall caused by hot-path logging.
+
+Replays the log lines of ``--events`` party lifecycles (join, readiness
+ticks, seats lock, seat change, notification) on the event loop while a
+probe task measures how late its 1 ms sleeps wake up. Each write to the
+output stream sleeps ``--write-latency-ms`` to stand in for a slow or
+back-pressured stdout.
+
+``basic`` is the old pipeline: logging.basicConfig, eager f-strings and the
+party payload in the emit line. ``queued`` is app.logging_config: lazy
+arguments, sampling of high-volume events and a background writer thread.
+
+    python -m benchmarks.logging_stall --events 5000
+"""
+
+from app.logging_config import configure_logging, stop_logging, TEXT_FORMAT
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import time
+
+HOT_EVENTS = ("readiness_tick", "seats_lock", "seat_change", "notification")
+
+
+class SlowStream:
+    """
+    A text stream whose writes block for a fixed time.
+    """
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.writes = 0
+        self._sink = open(os.devnull, "w")
+
+    def write(self, text: str) -> int:
+        self.writes += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return self._sink.write(text)
+
+    def flush(self) -> None:
+        self._sink.flush()
+
+
+def log_basic(logger, i: int, party: dict):
+    user_id = party["_id"]
+    logger.info(
+        f"Party added to waitlist of venue default: {party['name']} ({party['party_size']} people)"
+    )
+    logger.info(f"Available seats at venue default: {i % 10}")
+    logger.info("Seats lock acquired.")
+    logger.info(f"Decremented available seats by {party['party_size']}.")
+    logger.info("Marked 1 parties at venue default as ready and notified.")
+    logger.info(f"Sending message to user {user_id}: {party}")
+
+
+def log_queued(logger, i: int, party: dict):
+    user_id = party["_id"]
+    logger.info(
+        "Party added to waitlist of venue %s: %s (%s people)",
+        "default",
+        party["name"],
+        party["party_size"],
+        extra={"event": "party_joined", "venue_id": "default", "party_id": user_id},
+    )
+    logger.info(
+        "Available seats at venue %s: %s",
+        "default",
+        i % 10,
+        extra={"event": "readiness_tick", "venue_id": "default"},
+    )
+    logger.info(
+        "Seats lock acquired.", extra={"event": "seats_lock", "venue_id": "default"}
+    )
+    logger.info(
+        "Decremented available seats by %s.",
+        party["party_size"],
+        extra={"event": "seat_change", "venue_id": "default"},
+    )
+    logger.info(
+        "Marked %s parties at venue %s as ready and notified.",
+        1,
+        "default",
+        extra={"event": "readiness_tick", "venue_id": "default"},
+    )
+    logger.info(
+        "Notifying party %s. Status: %s",
+        user_id,
+        "ready",
+        extra={"event": "notification"},
+    )
+
+
+def configure(mode: str, stream: SlowStream, sample_rate: float):
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    if mode == "basic":
+        logging.basicConfig(level=logging.INFO, format=TEXT_FORMAT, stream=stream)
+    else:
+        configure_logging(
+            level="INFO",
+            fmt="json",
+            sample_rates={event: sample_rate for event in HOT_EVENTS},
+            stream=stream,
+        )
+
+
+async def probe(lags: list, stop: asyncio.Event):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.001)
+        lags.append(time.perf_counter() - start - 0.001)
+
+
+async def run(mode: str, events: int, write_latency: float, sample_rate: float):
+    stream = SlowStream(write_latency)
+    configure(mode, stream, sample_rate)
+    logger = logging.getLogger("Benchmark")
+    log = log_basic if mode == "basic" else log_queued
+
+    lags = []
+    stop = asyncio.Event()
+    probe_task = asyncio.create_task(probe(lags, stop))
+    await asyncio.sleep(0)
+
+    in_logging = 0.0
+    start = time.perf_counter()
+    for i in range(events):
+        party = {
+            "_id": f"user_{i}",
+            "venue_id": "default",
+            "name": f"Party {i}",
+            "party_size": i % 6 + 1,
+            "status": "ready",
+            "created_at": "2024-01-01T00:00:00+00:00",
+        }
+        call_start = time.perf_counter()
+        log(logger, i, party)
+        in_logging += time.perf_counter() - call_start
+        await asyncio.sleep(0)
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await probe_task
+
+    drain_start = time.perf_counter()
+    if mode == "queued":
+        stop_logging()
+    drain = time.perf_counter() - drain_start
+
+    lags_ms = sorted(lag * 1000 for lag in lags) or [0.0]
+    p99 = lags_ms[min(len(lags_ms) - 1, int(len(lags_ms) * 0.99))]
+    print(
+        f"{mode:<8}{elapsed:>10.3f}{in_logging / events * 1e6:>14.1f}"
+        f"{statistics.median(lags_ms):>10.2f}{p99:>10.2f}{lags_ms[-1]:>10.2f}"
+        f"{stream.writes:>10}{drain:>10.3f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--write-latency-ms", type=float, default=0.05)
+    parser.add_argument("--sample-rate", type=float, default=0.1)
+    args = parser.parse_args()
+
+    print(
+        f"{'mode':<8}{'seconds':>10}{'us/lifecycle':>14}{'lag p50':>10}"
+        f"{'lag p99':>10}{'lag max':>10}{'writes':>10}{'drain':>10}"
+    )
+    for mode in ("basic", "queued"):
+        asyncio.run(
+            run(mode, args.events, args.write_latency_ms / 1000, args.sample_rate)
+        )
+
+
+if __name__ == "__main__":
+    main()
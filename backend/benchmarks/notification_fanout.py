@@ -0,0 +1,68 @@
+"""
+Time to deliver a notification to every connected socket.
+
+Registers ``--sockets`` in-process Socket.IO connections (``--tabs`` per
+user) and replaces the Engine.IO write with a sleep of ``--write-latency-ms``
+to stand in for the network. ``sequential`` is the old per-SID await loop;
+``rooms`` is WebSocketManager.send_to_users.
+
+    python -m benchmarks.notification_fanout --sockets 10000
+"""
+
+from app.websocket_manager import WebSocketManager
+from socketio import AsyncServer
+import argparse
+import asyncio
+import time
+
+
+async def connect_sockets(sio, manager, sockets: int, tabs: int):
+    for i in range(sockets):
+        sid = await sio.manager.connect(f"eio_{i}", "/")
+        await manager.save_user_connection(sio, sid, f"user_{i // tabs}")
+
+
+async def main(sockets: int, tabs: int, write_latency: float, concurrency: int):
+    sio = AsyncServer(async_mode="asgi")
+    manager = WebSocketManager(emit_concurrency=concurrency)
+    writes = 0
+
+    async def send_eio_packet(eio_sid, pkt):
+        nonlocal writes
+        writes += 1
+        await asyncio.sleep(write_latency)
+
+    async def send_packet(eio_sid, pkt):
+        pkt.encode()
+        await send_eio_packet(eio_sid, pkt)
+
+    sio._send_eio_packet = send_eio_packet
+    sio._send_packet = send_packet
+    await connect_sockets(sio, manager, sockets, tabs)
+
+    party = {"_id": "user_0", "name": "Party", "party_size": 4, "status": "ready"}
+    messages = {user_id: {"status": "ready", "party": party} for user_id in manager.user_connections}
+
+    print(f"{'mode':<12}{'sockets':>10}{'writes':>10}{'seconds':>10}")
+
+    writes = 0
+    start = time.perf_counter()
+    for user_id, message in messages.items():
+        for sid in manager.user_connections[user_id]:
+            await sio.emit("user_message", message, room=sid)
+    print(f"{'sequential':<12}{sockets:>10}{writes:>10}{time.perf_counter() - start:>10.3f}")
+
+    writes = 0
+    start = time.perf_counter()
+    await manager.send_to_users(sio, messages)
+    print(f"{'rooms':<12}{sockets:>10}{writes:>10}{time.perf_counter() - start:>10.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sockets", type=int, default=10000)
+    parser.add_argument("--tabs", type=int, default=2)
+    parser.add_argument("--write-latency-ms", type=float, default=0.2)
+    parser.add_argument("--concurrency", type=int, default=100)
+    args = parser.parse_args()
+    asyncio.run(main(args.sockets, args.tabs, args.write_latency_ms / 1000, args.concurrency))
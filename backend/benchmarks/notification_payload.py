@@ -0,0 +1,82 @@
+"""
+Bytes and CPU per Socket.IO notification for each serializer.
+
+Encodes ``--notifications`` ``user_message`` packets the way python-socketio
+does before handing them to Engine.IO. ``full`` sends the whole waitlist
+document as notifications used to; ``trimmed`` sends only the fields the
+client reads. msgpack rows appear when the msgpack package is installed.
+
+    python -m benchmarks.notification_payload --notifications 20000
+"""
+
+from app.serialization import OrjsonSocketJson, party_message
+from socketio import packet
+import argparse
+import json
+import time
+
+
+def make_party(i: int) -> dict:
+    return {
+        "_id": f"user_{i}",
+        "venue_id": "default",
+        "name": f"Party {i}",
+        "party_size": i % 6 + 1,
+        "status": "ready",
+        "created_at": "2024-01-01T12:00:00.000000+00:00",
+        "seating_pass": "5d0b7cf0c3f34a4f9c6a2b8e1d7f0a31",
+        "started_at": 1704110400.123456,
+    }
+
+
+def encode(packet_class, messages) -> tuple:
+    total_bytes = 0
+    start = time.process_time()
+    for message in messages:
+        encoded = packet_class(
+            packet.EVENT, data=["user_message", message], namespace="/"
+        ).encode()
+        total_bytes += len(encoded)
+    return total_bytes, time.process_time() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--notifications", type=int, default=20000)
+    args = parser.parse_args()
+
+    parties = [make_party(i) for i in range(args.notifications)]
+    payloads = {
+        "full": [{"status": "ready", "party": party} for party in parties],
+        "trimmed": [party_message(party, "ready") for party in parties],
+    }
+    packet_classes = [
+        ("json", packet.Packet, json),
+        ("orjson", packet.Packet, OrjsonSocketJson),
+    ]
+    try:
+        from socketio.msgpack_packet import MsgPackPacket
+
+        packet_classes.append(("msgpack", MsgPackPacket, None))
+    except ImportError:
+        pass
+
+    print(f"{'serializer':<12}{'payload':<10}{'bytes/msg':>12}{'us cpu/msg':>12}")
+    original = packet.Packet.json
+    try:
+        for name, packet_class, module in packet_classes:
+            if module is not None:
+                packet.Packet.json = module
+            for payload, messages in payloads.items():
+                total_bytes, cpu = encode(packet_class, messages)
+                print(
+                    f"{name:<12}{payload:<10}"
+                    f"{total_bytes / len(messages):>12.1f}"
+                    f"{cpu / len(messages) * 1e6:>12.2f}"
+                )
+    finally:
+        packet.Packet.json = original
+
+
+if __name__ == "__main__":
+    main()
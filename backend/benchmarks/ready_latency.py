@@ -0,0 +1,123 @@
+"""
+Time from seats being freed to the next party's "ready" notification.
+
+Seats the whole restaurant with one party and checks it in, queues a second
+party behind it, then completes the first party and measures how long the
+second waits to be told it is ready. ``poll`` reproduces the old behaviour (a readiness check
+every ``--poll-interval`` seconds); ``event`` uses the queue advancer.
+
+    python -m benchmarks.ready_latency --trials 10
+"""
+
+from app.database import db_manager, get_collection
+from app.redis_client import get_redis_client
+from app.config import settings
+from app.queue_advancer import queue_advancer
+from app.completion_scheduler import completion_scheduler
+from app.services.waitlist_queue_service import WaitlistQueueService
+from app.services.waitlist_service import WaitlistService
+from app.services.websocket_service import WebSocketService
+from unittest.mock import AsyncMock, patch
+from datetime import datetime, timezone
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+
+async def run_trial(mode: str, poll_interval: float) -> float:
+    collection = await get_collection("waitlist")
+    redis_client = await get_redis_client()
+    await collection.delete_many({"_id": {"$in": ["bench_first", "bench_second"]}})
+    await redis_client.set("available_seats", settings.AVAILABLE_SEATS)
+    await redis_client.delete(
+        "seat_reservations", "waitlist_queue", "waitlist_party_sizes"
+    )
+
+    ready_at = asyncio.get_running_loop().create_future()
+
+    async def record_notification(parties, status):
+        if status != "ready" or ready_at.done():
+            return
+        if any(party["_id"] == "bench_second" for party in parties):
+            ready_at.set_result(time.perf_counter())
+
+    now = datetime.now(timezone.utc).isoformat()
+    first = {
+        "_id": "bench_first",
+        "venue_id": settings.DEFAULT_VENUE_ID,
+        "name": "First",
+        "party_size": settings.AVAILABLE_SEATS,
+        "status": "waiting",
+        "created_at": now,
+    }
+    second = {
+        "_id": "bench_second",
+        "venue_id": settings.DEFAULT_VENUE_ID,
+        "name": "Second",
+        "party_size": 1,
+        "status": "waiting",
+        "created_at": now,
+    }
+
+    with (
+        patch.object(WebSocketService, "notify_parties", record_notification),
+        patch.object(WebSocketService, "notify_party_status", AsyncMock()),
+        # The benchmark completes the first party itself
+        patch.object(completion_scheduler, "schedule", AsyncMock()),
+    ):
+        await collection.insert_one(first)
+        await WaitlistQueueService.enqueue(redis_client, first)
+        await WaitlistService.check_queue_readiness()
+        # Only a checked-in party can complete and free its seats
+        await WaitlistService.check_in_party("bench_first")
+        await collection.insert_one(second)
+        await WaitlistQueueService.enqueue(redis_client, second)
+
+        poller = None
+        if mode == "poll":
+
+            async def poll():
+                # Start at a random phase of the poll cycle
+                await asyncio.sleep(random.uniform(0, poll_interval))
+                while True:
+                    await WaitlistService.check_queue_readiness()
+                    await asyncio.sleep(poll_interval)
+
+            poller = asyncio.create_task(poll())
+            notify = patch.object(
+                queue_advancer, "notify", lambda venue_id, event: None
+            )
+        else:
+            notify = patch.object(queue_advancer, "notify", queue_advancer.notify)
+
+        with notify:
+            freed_at = time.perf_counter()
+            await WaitlistService.complete_service(collection, redis_client, "bench_first")
+            latency = await ready_at - freed_at
+
+        if poller:
+            poller.cancel()
+
+    return latency
+
+
+async def main(trials: int, poll_interval: float):
+    await db_manager.connect()
+    print(f"{'mode':<8}{'trials':>8}{'mean ms':>12}{'max ms':>12}")
+    for mode in ("poll", "event"):
+        latencies = [await run_trial(mode, poll_interval) for _ in range(trials)]
+        print(
+            f"{mode:<8}{trials:>8}{statistics.mean(latencies) * 1000:>12.1f}"
+            f"{max(latencies) * 1000:>12.1f}"
+        )
+    await db_manager.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--trials", type=int, default=10)
+    parser.add_argument("--poll-interval", type=float, default=5.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.trials, args.poll_interval))
@@ -0,0 +1,85 @@
+"""
+Seat-update latency under each durability mode.
+
+Runs reserve/release pairs against the Redis configured in the environment
+and reports latency percentiles.
+The ``save`` row reproduces the old behaviour of a blocking SAVE after every
+seat change.
+
+    python -m benchmarks.seat_durability --updates 2000 --concurrency 50
+"""
+
+from app.redis_client import get_redis_client
+from app.durability_manager import durability_manager
+from app.services.seat_management_service import SeatManagementService
+import argparse
+import asyncio
+import statistics
+import time
+
+MODES = ["save", "aof", "bgsave"]
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run_mode(mode: str, updates: int, concurrency: int) -> dict:
+    redis_client = await get_redis_client()
+    await redis_client.set("available_seats", updates)
+    await redis_client.delete("seat_reservations")
+    durability_manager.mode = "aof" if mode == "save" else mode
+
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def seat_update(i: int):
+        async with semaphore:
+            party_id = f"bench_{mode}_{i}"
+            start = time.perf_counter()
+            await SeatManagementService.reserve_seats(redis_client, party_id, 1)
+            if mode == "save":
+                await redis_client.save()
+            latencies.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            await SeatManagementService.release_seats(redis_client, party_id)
+            if mode == "save":
+                await redis_client.save()
+            latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(seat_update(i) for i in range(updates)))
+    elapsed = time.perf_counter() - started
+    await durability_manager.flush()
+
+    return {
+        "mode": mode,
+        "updates": len(latencies),
+        "throughput": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "mean_ms": statistics.mean(latencies) * 1000,
+    }
+
+
+async def main(updates: int, concurrency: int, modes: list):
+    durability_manager.debounce_seconds = 0.5
+    print(f"{'mode':<8}{'updates':>10}{'ops/s':>12}{'p50 ms':>10}{'p99 ms':>10}")
+    for mode in modes:
+        result = await run_mode(mode, updates, concurrency)
+        print(
+            f"{result['mode']:<8}{result['updates']:>10}{result['throughput']:>12.0f}"
+            f"{result['p50_ms']:>10.2f}{result['p99_ms']:>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--updates", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES)
+    args = parser.parse_args()
+    asyncio.run(main(args.updates, args.concurrency, args.modes))
@@ -0,0 +1,378 @@
+"""
+Deterministic capacity-planning simulation of a venue's waitlist.
+
+Runs the real seating path against in-memory MongoDB and Redis
+(``fakeredis[lua]`` and ``mongomock_motor``) on a virtual clock. That path
+covers ``WaitlistService`` joins, readiness passes under the configured
+seating policy, check-ins and service completions, and the Redis queue and
+seat scripts. Events are taken from a heap in time order, so a day of
+traffic runs in seconds and the same inputs always give the same results.
+
+Arrivals are replayed from ``--trace``, a CSV of ``offset_seconds,
+party_size`` lines. Without a trace they are sampled as a Poisson process
+at ``--arrival-rate`` parties per hour for ``--hours``, with party sizes
+drawn using ``--size-weights``. Parties check in ``--check-in-delay``
+seconds after being told they are ready. Each is then served for
+SERVICE_TIME_PER_PERSON seconds per person, as in production.
+
+Every combination of ``--seats``, ``--service-time`` and ``--policies`` is
+simulated, and each gets a report of:
+
+- queue length
+- wait-time percentiles, overall and by party size
+- seat utilization
+
+    python -m benchmarks.simulation --hours 6 --arrival-rate 16 \\
+        --seats 30 40 --service-time 600 --policies fifo skip_ahead best_fit
+"""
+
+from datetime import datetime, timezone
+from itertools import product
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+import argparse
+import asyncio
+import csv
+import heapq
+import json
+import logging
+import random
+import statistics
+import time
+
+SIM_PREFIX = "sim"
+
+
+class VirtualClock:
+    """
+    Simulated time, in seconds since ``start``.
+    """
+
+    def __init__(self, start: datetime):
+        self.start = start
+        self.elapsed = 0.0
+
+    def time(self) -> float:
+        return self.start.timestamp() + self.elapsed
+
+    def datetime_class(self):
+        clock = self
+
+        class VirtualDatetime(datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return datetime.fromtimestamp(clock.time(), tz)
+
+        return VirtualDatetime
+
+
+def sample_arrivals(hours: float, rate: float, weights: list, seed: int) -> list:
+    """
+    Poisson arrivals at ``rate`` parties per hour, as (offset, size) pairs.
+    """
+    rng = random.Random(seed)
+    sizes = range(1, len(weights) + 1)
+    arrivals, offset = [], 0.0
+    while rate > 0:
+        offset += rng.expovariate(rate / 3600)
+        if offset >= hours * 3600:
+            return arrivals
+        arrivals.append((offset, rng.choices(sizes, weights)[0]))
+    return arrivals
+
+
+def read_trace(path: str) -> list:
+    arrivals = []
+    with open(path, newline="") as trace:
+        for row in csv.reader(trace):
+            if not row or not row[0].strip() or row[0].startswith("#"):
+                continue
+            try:
+                arrivals.append((float(row[0]), int(row[1])))
+            except ValueError:
+                continue  # header
+    return sorted(arrivals)
+
+
+def percentile(ordered: list, pct: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+
+class Simulation:
+    """
+    One run of the event loop over a fresh in-memory venue.
+    """
+
+    def __init__(self, arrivals: list, check_in_delay: float, start: datetime):
+        self.arrivals = arrivals
+        self.check_in_delay = check_in_delay
+        self.clock = VirtualClock(start)
+        self._events = []
+        self._sequence = 0
+        self._dirty = set()
+        self.joined_at = {}
+        self.sizes = {}
+        self.waits = {}
+        self.seated_at = {}
+        self.seat_seconds = 0.0
+        # (time, queue length) after every change
+        self.queue_lengths = [(0.0, 0)]
+
+    def schedule(self, at: float, action: str, party_id: str) -> None:
+        self._sequence += 1
+        heapq.heappush(self._events, (at, self._sequence, action, party_id))
+
+    def _queue_changed(self, delta: int) -> None:
+        self.queue_lengths.append(
+            (self.clock.elapsed, self.queue_lengths[-1][1] + delta)
+        )
+
+    # Stand-ins for the parts of the app that talk to clients or run on
+    # wall-clock timers
+
+    def _notify(self, venue_id: str, event: str) -> None:
+        self._dirty.add(venue_id)
+
+    async def _advance(self, venue_id: str, event: str) -> None:
+        self._dirty.add(venue_id)
+
+    async def _advance_all(self, venue_ids: list, event: str) -> None:
+        self._dirty.update(venue_ids)
+
+    async def _notify_parties(self, parties: list, status: str) -> None:
+        if status != "ready":
+            return
+        for party in parties:
+            party_id = party["_id"]
+            self.waits[party_id] = self.clock.elapsed - self.joined_at[party_id]
+            self.seated_at[party_id] = self.clock.elapsed
+            self._queue_changed(-1)
+            self.schedule(
+                self.clock.elapsed + self.check_in_delay, "check_in", party_id
+            )
+
+    async def _schedule_completion(self, redis_client, party_id: str, due_at: float):
+        self.schedule(due_at - self.clock.start.timestamp(), "complete", party_id)
+
+    async def run(self) -> dict:
+        from app.completion_scheduler import completion_scheduler
+        from app.config import settings
+        from app.database import db_manager
+        from app.queue_advancer import queue_advancer
+        from app.queue_feed import queue_feed
+        from app.redis_client import get_redis_client
+        from app.services.seat_management_service import (
+            SeatManagementService,
+            seat_capacity,
+        )
+        from app.services.waitlist_service import WaitlistService
+        from app.services.websocket_service import WebSocketService
+        from app.wait_time_estimator import wait_time_estimator
+
+        venue_id = settings.DEFAULT_VENUE_ID
+        redis_client = await get_redis_client()
+        await redis_client.flushall()
+        collection = db_manager.get_collection("waitlist")
+        await collection.delete_many({})
+        wait_time_estimator.load([])
+        await SeatManagementService.initialize_seats(redis_client, venue_id)
+
+        for index, (offset, size) in enumerate(self.arrivals):
+            party_id = f"{SIM_PREFIX}_{index}"
+            self.sizes[party_id] = size
+            self.schedule(offset, "arrive", party_id)
+
+        started = time.perf_counter()
+        with (
+            patch(
+                "app.services.waitlist_service.datetime", self.clock.datetime_class()
+            ),
+            patch(
+                "app.services.waitlist_service.time",
+                SimpleNamespace(time=self.clock.time, perf_counter=time.perf_counter),
+            ),
+            patch.object(queue_advancer, "notify", self._notify),
+            patch.object(queue_advancer, "advance", self._advance),
+            patch.object(queue_advancer, "advance_all", self._advance_all),
+            patch.object(completion_scheduler, "schedule", self._schedule_completion),
+            patch.object(queue_feed, "publish", AsyncMock()),
+            patch.object(wait_time_estimator, "_schedule_push", lambda venue_id: None),
+            patch.object(WebSocketService, "notify_parties", self._notify_parties),
+            patch.object(WebSocketService, "notify_party_status", AsyncMock()),
+        ):
+            while self._events:
+                at, _, action, party_id = heapq.heappop(self._events)
+                self.clock.elapsed = at
+                if action == "arrive":
+                    self.joined_at[party_id] = at
+                    self._queue_changed(1)
+                    await WaitlistService.add_to_waitlist(
+                        f"Party {party_id}", self.sizes[party_id], party_id, venue_id
+                    )
+                elif action == "check_in":
+                    await WaitlistService.check_in_party(party_id)
+                else:
+                    self.seat_seconds += self.sizes[party_id] * (
+                        at - self.seated_at[party_id]
+                    )
+                    await WaitlistService.complete_service(
+                        collection, redis_client, party_id
+                    )
+                while self._dirty:
+                    dirty_venue = self._dirty.pop()
+                    while await WaitlistService.check_queue_readiness(dirty_venue):
+                        pass
+
+        return self.report(
+            seat_capacity(venue_id),
+            time.perf_counter() - started,
+        )
+
+    def report(self, capacity: int, wall_seconds: float) -> dict:
+        horizon = self.clock.elapsed
+        # Time-weighted mean queue length
+        area = sum(
+            (self.queue_lengths[i + 1][0] - at) * length
+            for i, (at, length) in enumerate(self.queue_lengths[:-1])
+        )
+        waits = sorted(self.waits.values())
+        by_size = {}
+        for party_id, wait in self.waits.items():
+            by_size.setdefault(self.sizes[party_id], []).append(wait)
+        return {
+            "parties": len(self.arrivals),
+            "served": len(self.waits),
+            "simulated_hours": horizon / 3600,
+            "wall_seconds": wall_seconds,
+            "queue_length": {
+                "mean": area / horizon if horizon else 0.0,
+                "max": max(length for _, length in self.queue_lengths),
+            },
+            "wait_minutes": {
+                "mean": statistics.mean(waits) / 60 if waits else 0.0,
+                "p50": percentile(waits, 50) / 60,
+                "p90": percentile(waits, 90) / 60,
+                "p99": percentile(waits, 99) / 60,
+                "max": waits[-1] / 60 if waits else 0.0,
+            },
+            "mean_wait_minutes_by_size": {
+                size: statistics.mean(samples) / 60
+                for size, samples in sorted(by_size.items())
+            },
+            "seat_utilization": (
+                self.seat_seconds / (capacity * horizon) if horizon else 0.0
+            ),
+        }
+
+
+def print_report(scenario: dict, report: dict) -> None:
+    waits = report["wait_minutes"]
+    print(
+        f"seats={scenario['seats']} service_time={scenario['service_time']}s "
+        f"policy={scenario['policy']}: {report['served']}/{report['parties']} "
+        f"parties over {report['simulated_hours']:.1f}h "
+        f"in {report['wall_seconds']:.1f}s"
+    )
+    print(
+        f"  queue length  mean {report['queue_length']['mean']:.1f}"
+        f"  max {report['queue_length']['max']}"
+    )
+    print(
+        f"  wait (min)    mean {waits['mean']:.1f}  p50 {waits['p50']:.1f}"
+        f"  p90 {waits['p90']:.1f}  p99 {waits['p99']:.1f}  max {waits['max']:.1f}"
+    )
+    print(
+        "  by size       "
+        + "  ".join(
+            f"{size}:{wait:.1f}"
+            for size, wait in report["mean_wait_minutes_by_size"].items()
+        )
+    )
+    print(f"  utilization   {report['seat_utilization']:.1%}")
+
+
+async def main(args) -> list:
+    from app.config import settings
+    from app.database import db_manager
+
+    await db_manager.connect()
+    if args.trace:
+        arrivals = read_trace(args.trace)
+    else:
+        arrivals = sample_arrivals(
+            args.hours, args.arrival_rate, args.size_weights, args.seed
+        )
+    start = datetime.fromisoformat(args.start)
+    if start.tzinfo is None:
+        start = start.replace(tzinfo=timezone.utc)
+
+    results = []
+    for seats, service_time, policy in product(
+        args.seats, args.service_time, args.policies
+    ):
+        settings.AVAILABLE_SEATS = seats
+        settings.SERVICE_TIME_PER_PERSON = service_time
+        settings.SEATING_POLICY = policy
+        scenario = {"seats": seats, "service_time": service_time, "policy": policy}
+        report = await Simulation(arrivals, args.check_in_delay, start).run()
+        print_report(scenario, report)
+        results.append({**scenario, **report})
+    await db_manager.close()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--trace", help="CSV of offset_seconds,party_size arrivals")
+    parser.add_argument("--hours", type=float, default=6.0)
+    parser.add_argument(
+        "--arrival-rate", type=float, default=16.0, help="mean parties per hour"
+    )
+    parser.add_argument(
+        "--size-weights",
+        type=float,
+        nargs="+",
+        default=[1, 4, 2, 3, 1, 1],
+        help="relative frequency of party sizes 1, 2, ...",
+    )
+    parser.add_argument("--seats", type=int, nargs="+", default=[40])
+    parser.add_argument(
+        "--service-time",
+        type=float,
+        nargs="+",
+        default=[600.0],
+        help="seconds of service per person (SERVICE_TIME_PER_PERSON)",
+    )
+    parser.add_argument(
+        "--policies",
+        nargs="+",
+        choices=["fifo", "skip_ahead", "best_fit"],
+        default=["fifo"],
+    )
+    parser.add_argument(
+        "--check-in-delay",
+        type=float,
+        default=120.0,
+        help="seconds from being told ready to checking in",
+    )
+    parser.add_argument(
+        "--start",
+        default="2024-01-05T17:00:00+00:00",
+        help="simulated time of the first arrival window",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    from benchmarks.lifecycle import install_fakes
+
+    install_fakes()
+    results = asyncio.run(main(args))
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(results, output, indent=2)
@@ -0,0 +1,167 @@
+"""
+Table allocation cost and seat utilization on a large floor.
+
+Builds a floor of ``--tables`` tables (2 to 10 seats, in combinable groups
+of ten) and streams ``--parties`` parties of 1 to 10 through it: each party
+is queued and seated, and the longest-seated parties leave whenever a party
+finds no table or more than ``--occupancy`` of the tables are taken.
+``index`` uses the table service's sorted-set index; ``scan`` replaces the
+single-table lookup with a scan over every free table, as a list-based
+inventory would. Utilization is the share of allocated
+seats actually used by parties.
+
+Runs against the Redis in the environment, or against an in-memory fake
+with ``--fakes`` (requires ``fakeredis[lua]``).
+
+    python -m benchmarks.table_allocation --tables 500 --parties 5000
+"""
+
+from collections import deque
+from datetime import datetime, timezone
+from unittest.mock import patch
+import argparse
+import asyncio
+import logging
+import random
+import statistics
+import time
+
+BENCH_VENUE = "bench_tables"
+
+# Best-fitting single table by scanning every free table
+SCAN_LOOKUP = """
+    local single, single_capacity = nil, nil
+    local free = redis.call('ZRANGE', tkeys[2], 0, -1, 'WITHSCORES')
+    for i = 1, #free, 2 do
+        local capacity = tonumber(free[i + 1])
+        if capacity >= size and (not single_capacity or capacity < single_capacity) then
+            single, single_capacity = free[i], capacity
+        end
+    end
+"""
+
+INDEX_LOOKUP = """
+    local single = redis.call('ZRANGEBYSCORE', tkeys[2], size, '+inf', 'LIMIT', 0, 1)[1]
+    local single_capacity = single and tonumber(redis.call('ZSCORE', tkeys[2], single))
+"""
+
+
+def make_floor(count: int, seed: int) -> list:
+    rng = random.Random(seed)
+    return [
+        {
+            "id": f"t{i}",
+            "capacity": rng.choice((2, 2, 4, 4, 4, 6, 8, 10)),
+            "group": f"section{i // 10}",
+        }
+        for i in range(count)
+    ]
+
+
+async def run(mode: str, redis_client, args) -> dict:
+    from app.config import settings
+    from app.services.seat_management_service import (
+        AVAILABLE_SEATS_KEY,
+        SEAT_RESERVATIONS_KEY,
+        SeatManagementService,
+        venue_key,
+    )
+    from app.services.table_service import SEAT_AT_TABLES_SCRIPT
+    from app.services.waitlist_queue_service import WaitlistQueueService
+
+    settings.VENUE_TABLES = {BENCH_VENUE: make_floor(args.tables, args.seed)}
+    await redis_client.delete(
+        venue_key(AVAILABLE_SEATS_KEY, BENCH_VENUE),
+        venue_key(SEAT_RESERVATIONS_KEY, BENCH_VENUE),
+    )
+    await SeatManagementService.initialize_seats(redis_client, BENCH_VENUE)
+
+    script = SEAT_AT_TABLES_SCRIPT
+    if mode == "scan":
+        assert INDEX_LOOKUP in script
+        script = script.replace(INDEX_LOOKUP, SCAN_LOOKUP)
+
+    rng = random.Random(args.seed)
+    created_at = datetime.now(timezone.utc).isoformat()
+    seated = deque()
+    seat_times = []
+    used = allocated = 0
+    with patch("app.services.waitlist_queue_service.SEAT_AT_TABLES_SCRIPT", script):
+        for i in range(args.parties):
+            party = {
+                "_id": f"bench_{mode}_{i}",
+                "venue_id": BENCH_VENUE,
+                "party_size": rng.randint(1, 10),
+                "created_at": created_at,
+            }
+            await WaitlistQueueService.enqueue(redis_client, party)
+            while True:
+                started = time.perf_counter()
+                (status,) = await WaitlistQueueService.seat(
+                    redis_client, BENCH_VENUE, [party]
+                )
+                seat_times.append(time.perf_counter() - started)
+                if status == WaitlistQueueService.SEATED or not seated:
+                    break
+                for _ in range(min(len(seated), 5)):
+                    await SeatManagementService.release_seats(
+                        redis_client, seated.popleft(), BENCH_VENUE
+                    )
+            if status == WaitlistQueueService.SEATED:
+                seated.append(party["_id"])
+                if len(seated) > args.occupancy * args.tables:
+                    await SeatManagementService.release_seats(
+                        redis_client, seated.popleft(), BENCH_VENUE
+                    )
+                used += party["party_size"]
+                allocated += int(
+                    await redis_client.hget(
+                        venue_key(SEAT_RESERVATIONS_KEY, BENCH_VENUE), party["_id"]
+                    )
+                )
+    while seated:
+        await SeatManagementService.release_seats(
+            redis_client, seated.popleft(), BENCH_VENUE
+        )
+
+    seat_times.sort()
+    return {
+        "mean_us": statistics.mean(seat_times) * 1e6,
+        "p99_us": seat_times[int(len(seat_times) * 0.99)] * 1e6,
+        "utilization": used / allocated if allocated else 0.0,
+    }
+
+
+async def main(args):
+    from app.redis_client import get_redis_client
+
+    redis_client = await get_redis_client()
+    print(f"{'mode':<8}{'tables':>8}{'mean us':>10}{'p99 us':>10}{'utilization':>13}")
+    for mode in args.modes:
+        result = await run(mode, redis_client, args)
+        print(
+            f"{mode:<8}{args.tables:>8}{result['mean_us']:>10.0f}"
+            f"{result['p99_us']:>10.0f}{result['utilization']:>13.1%}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--tables", type=int, default=500)
+    parser.add_argument("--parties", type=int, default=5000)
+    parser.add_argument(
+        "--modes", nargs="+", choices=["index", "scan"], default=["index", "scan"]
+    )
+    parser.add_argument("--occupancy", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--fakes", action="store_true", help="use in-memory fakes")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    if args.fakes:
+        from benchmarks.lifecycle import install_fakes
+
+        install_fakes()
+    asyncio.run(main(args))
@@ -0,0 +1,91 @@
+"""
+Readiness query latency with and without the waitlist indexes.
+
+Seeds a scratch collection with historical (completed) parties plus a small
+waiting queue, times the readiness query, then creates the declared indexes
+and times it again.
+
+    python -m benchmarks.waitlist_indexes --parties 1000000
+"""
+
+from app.database import INDEXES, db_manager
+from datetime import datetime, timedelta, timezone
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+COLLECTION = "waitlist_index_bench"
+
+
+async def seed(
+    collection, parties: int, waiting: int, venues: int, batch_size: int = 10000
+):
+    await collection.drop()
+    start = datetime.now(timezone.utc) - timedelta(days=365)
+    for offset in range(0, parties, batch_size):
+        batch = []
+        for i in range(offset, min(offset + batch_size, parties)):
+            created_at = start + timedelta(seconds=i * 30)
+            batch.append(
+                {
+                    "_id": f"bench_{i}",
+                    "venue_id": f"venue_{i % venues}",
+                    "name": f"Party {i}",
+                    "party_size": random.randint(1, 10),
+                    "status": "waiting" if i >= parties - waiting else "completed",
+                    "created_at": created_at.isoformat(),
+                }
+            )
+        await collection.insert_many(batch, ordered=False)
+
+
+async def time_query(collection, runs: int) -> list:
+    latencies = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await collection.find(
+            {"venue_id": "venue_0", "status": "waiting"},
+            sort=[("created_at", 1)],
+            limit=50,
+        ).to_list(length=50)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def report(label: str, latencies: list, indexed: bool):
+    ordered = sorted(latencies)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    print(
+        f"{label:<10}{statistics.median(ordered) * 1000:>10.2f}{p99 * 1000:>10.2f}"
+        f"{str(indexed):>10}"
+    )
+
+
+async def main(parties: int, waiting: int, runs: int, venues: int):
+    await db_manager.connect()
+    collection = db_manager.get_collection(COLLECTION)
+    query, sort = {"venue_id": "venue_0", "status": "waiting"}, [("created_at", 1)]
+
+    print(f"Seeding {parties} parties ({waiting} waiting) across {venues} venues...")
+    await seed(collection, parties, waiting, venues)
+
+    print(f"{'indexes':<10}{'p50 ms':>10}{'p99 ms':>10}{'ixscan':>10}")
+    report("without", await time_query(collection, runs), await db_manager.uses_index(COLLECTION, query, sort))
+
+    await collection.create_indexes(INDEXES["waitlist"])
+    report("with", await time_query(collection, runs), await db_manager.uses_index(COLLECTION, query, sort))
+
+    await collection.drop()
+    await db_manager.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--parties", type=int, default=1_000_000)
+    parser.add_argument("--waiting", type=int, default=100)
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--venues", type=int, default=1)
+    args = parser.parse_args()
+    asyncio.run(main(args.parties, args.waiting, args.runs, args.venues))